@@ -12,6 +12,7 @@ from typing import Optional, List, Dict
 from contextlib import asynccontextmanager
 import sys
 import os
+import socket
 import asyncio
 
 # scripts 폴더의 크롤링 모듈 import
@@ -31,30 +32,134 @@ except ImportError as e:
 
 # 리뷰 크롤링 모듈
 try:
-    from crawl_musinsa_reviews import extract_product_no_from_url, collect_reviews
+    from crawl_musinsa_reviews import extract_product_no_from_url, collect_reviews, probe_review_count
     from crawl_zigzag_reviews import crawl_zigzag_reviews
     from crawl_29cm_reviews import extract_item_id_from_url, collect_29cm_reviews
     from crawl_wconcept_reviews import collect_wconcept_reviews
+    from review_watermark import FilterOnly
 except ImportError as e:
     print(f"리뷰 크롤링 모듈 import 실패: {e}", file=sys.stderr)
     raise
 
+# WebDriver 풀 / 스냅샷 파서
+try:
+    from driver_pool import init_driver_pool, shutdown_driver_pool
+    from html_snapshot import shutdown_parser_pool
+except ImportError as e:
+    print(f"드라이버 풀 import 실패: {e}", file=sys.stderr)
+    raise
+
+# 상품 결과 캐시 / 상품 URL 정규화
+try:
+    from product_cache import ProductCache
+    from product_key import canonicalize, canonical_url
+except ImportError as e:
+    print(f"상품 캐시 import 실패: {e}", file=sys.stderr)
+    raise
+
+# 카테고리 분류 캐시 / 로컬 분류기
+try:
+    from category_cache import warm_from_mysql
+    from category_classifier import train_from_mysql, refine_other_category, classifier_stats
+except ImportError as e:
+    print(f"카테고리 분류 모듈 import 실패: {e}", file=sys.stderr)
+    raise
+
 # DB 핸들러
 try:
-    from db_handler import get_db_connection
+    from db_handler import (
+        init_db_pool, close_db_pool, run_db, check_review_schema,
+        update_review_crawl_status,
+        load_review_watermark, complete_unchanged_review_crawl, ReviewStreamWriter,
+    )
 except ImportError as e:
     print(f"DB 핸들러 import 실패: {e}", file=sys.stderr)
     raise
 
+# 리뷰 크롤링 작업 큐
+try:
+    from crawl_job_queue import (
+        ensure_crawl_job_schema, enqueue_review_job, claim_review_job, heartbeat_review_job,
+        complete_review_job, retry_review_job, release_review_job,
+    )
+except ImportError as e:
+    print(f"작업 큐 import 실패: {e}", file=sys.stderr)
+    raise
+
 # 세미포어 (상품 크롤링 동시 실행 제한)
 MAX_CONCURRENT_CRAWLS = 2
 crawl_semaphore: Optional[asyncio.Semaphore] = None
 
+# 상품 크롤링 결과 캐시 (같은 상품 반복 요청 시 재크롤링 방지)
+product_cache: Optional[ProductCache] = None
+
+# 증분 리뷰 크롤링 (이미 저장된 리뷰에서 수집 중단, 리뷰 수가 그대로면 크롤링 생략)
+REVIEW_INCREMENTAL_CRAWL = os.getenv('REVIEW_INCREMENTAL_CRAWL', 'true').lower() == 'true'
+
+# 리뷰 크롤링 작업 큐 (MySQL crawl_job 테이블, 여러 태스크가 나눠서 처리)
+REVIEW_JOB_QUEUE = os.getenv('REVIEW_JOB_QUEUE', 'true').lower() == 'true'
+REVIEW_JOB_WORKERS = int(os.getenv('REVIEW_JOB_WORKERS', '2'))                        # 태스크당 동시 처리 작업 수
+REVIEW_JOB_LEASE_SECONDS = float(os.getenv('REVIEW_JOB_LEASE_SECONDS', '120'))        # heartbeat 없이 이 시간이 지나면 다른 워커가 가져감
+REVIEW_JOB_HEARTBEAT_SECONDS = float(os.getenv('REVIEW_JOB_HEARTBEAT_SECONDS', '30'))
+REVIEW_JOB_POLL_SECONDS = float(os.getenv('REVIEW_JOB_POLL_SECONDS', '2'))
+REVIEW_JOB_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# 서버 시작 시 MySQL의 기존 상품 카테고리로 분류 캐시 예열 + 로컬 분류기 학습
+CATEGORY_CACHE_WARM_ON_STARTUP = os.getenv('CATEGORY_CACHE_WARM_ON_STARTUP', 'true').lower() == 'true'
+
+async def _warm_category_cache():
+    # DB에 연결할 수 없어도 서버 기동은 계속 (캐시는 크롤링하면서 채워지고, 분류기는 키워드만 사용)
+    try:
+        await asyncio.to_thread(warm_from_mysql)
+    except Exception as e:
+        print(f"[WARN] 카테고리 캐시 예열 실패: {e}")
+    try:
+        await asyncio.to_thread(train_from_mysql)
+    except Exception as e:
+        print(f"[WARN] 로컬 카테고리 분류기 학습 실패: {e}")
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
-    global crawl_semaphore
+    global crawl_semaphore, product_cache
     crawl_semaphore = asyncio.Semaphore(MAX_CONCURRENT_CRAWLS)
+    product_cache = ProductCache()
+    # DB 커넥션 풀 (리뷰 작업마다 새로 연결하지 않도록)
+    await asyncio.to_thread(init_db_pool)
+    # 리뷰 저장은 review_hash 컬럼/유니크 인덱스가 있어야 하므로 없으면 시작하지 않음
+    # (마이그레이션은 배포 전에 python scripts/migrate_review_schema.py로 실행)
+    try:
+        schema_ready = await asyncio.to_thread(check_review_schema)
+    except Exception as e:
+        print(f"[WARN] review 스키마 확인 실패: {e}")
+        schema_ready = True  # DB 연결 문제는 리뷰 작업에서 다시 드러나므로 상품 크롤링은 계속 제공
+    if not schema_ready:
+        await asyncio.to_thread(close_db_pool)
+        raise RuntimeError(
+            "review_hash 컬럼/유니크 인덱스 없음 - python scripts/migrate_review_schema.py 실행 후 다시 시작"
+        )
+    warm_task = asyncio.create_task(_warm_category_cache()) if CATEGORY_CACHE_WARM_ON_STARTUP else None
+    # Chrome 미리 띄워두기 (요청마다 브라우저를 새로 실행하지 않도록)
+    await asyncio.to_thread(init_driver_pool)
+    # 리뷰 작업 큐 워커 (DB에 연결할 수 없으면 BackgroundTasks로 처리)
+    job_workers = []
+    if REVIEW_JOB_QUEUE:
+        try:
+            await asyncio.to_thread(ensure_crawl_job_schema)
+            job_workers = [asyncio.create_task(_review_job_worker(i)) for i in range(REVIEW_JOB_WORKERS)]
+            print(f"[INFO] 리뷰 작업 워커 {len(job_workers)}개 시작: {REVIEW_JOB_WORKER_ID}")
+        except Exception as e:
+            print(f"[WARN] 리뷰 작업 큐 준비 실패, BackgroundTasks 사용: {e}")
+    _app.state.review_job_queue = bool(job_workers)
     yield
+    if warm_task is not None and not warm_task.done():
+        warm_task.cancel()
+    for worker in job_workers:
+        worker.cancel()
+    await asyncio.gather(*job_workers, return_exceptions=True)
+    await asyncio.to_thread(shutdown_driver_pool)
+    shutdown_parser_pool()
+    await asyncio.to_thread(close_db_pool)
+    product_cache.close()
 
 app = FastAPI(
     title="EveryWear AI API",
@@ -113,6 +218,14 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/cache/stats")
+async def cache_stats():
+    return product_cache.stats()
+
+@app.get("/classifier/stats")
+async def category_classifier_stats():
+    return classifier_stats()
+
 # ========================================
 # 상품 크롤링 API (기존)
 # ========================================
@@ -130,87 +243,71 @@ def _normalize_star_point(result: dict) -> Optional[float]:
         return float(star_point)
     return None
 
+def _to_crawl_response(result: dict, default_mall: str, product_url: str) -> dict:
+    return CrawlResponse(
+        shoppingmall_name=result.get('shoppingmall_name', default_mall),
+        product_url=result.get('product_url', product_url),
+        category=result.get('category', '-'),
+        product_img_url=result.get('product_img_url', '-'),
+        product_name=result.get('product_name', '-'),
+        brand_name=result.get('brand_name', '-'),
+        price=result.get('price', '-'),
+        star_point=_normalize_star_point(result),
+        AI_review=result.get('AI_review'),
+        product_num=result.get('product_num')
+    ).model_dump()
+
+async def _crawl_product(mall: str, default_mall: str, crawl_fn, product_url: str) -> CrawlResponse:
+    """
+    캐시 확인 후 상품 크롤링 (캐시 키: 쇼핑몰 + 정규화된 상품번호)
+    같은 상품을 동시에 요청하면 크롤링은 한 번만 수행
+    """
+    # 단축 URL/모바일 도메인/쿼리스트링 등 URL 변형을 하나의 상품 키로 정규화
+    key = await asyncio.to_thread(canonicalize, product_url, mall)
+    if key is not None and key.mall == mall:
+        cache_key = ProductCache.make_key(key.mall, key.product_num)
+        target_url = canonical_url(key)
+    else:
+        cache_key = None
+        target_url = product_url
+
+    async def crawl():
+        async with crawl_semaphore:
+            result = await asyncio.to_thread(crawl_fn, target_url)
+        # 쇼핑몰 카테고리로 분류하지 못한 상품은 상품명으로 한 번 더 분류
+        if result.get('category', '-') in ('기타', '-'):
+            refined = refine_other_category(result.get('product_name'))
+            if refined != "기타":
+                result['category'] = refined
+        return _to_crawl_response(result, default_mall, product_url)
+
+    return CrawlResponse(**await product_cache.get_or_crawl(cache_key, crawl))
+
 @app.post("/crawl/musinsa", response_model=CrawlResponse)
 async def crawl_musinsa(request: CrawlRequest):
     try:
-        async with crawl_semaphore:
-            result = await asyncio.to_thread(crawl_musinsa_product, request.product_url)
-        star_point = _normalize_star_point(result)
-        return CrawlResponse(
-            shoppingmall_name=result.get('shoppingmall_name', '무신사'),
-            product_url=result.get('product_url', request.product_url),
-            category=result.get('category', '-'),
-            product_img_url=result.get('product_img_url', '-'),
-            product_name=result.get('product_name', '-'),
-            brand_name=result.get('brand_name', '-'),
-            price=result.get('price', '-'),
-            star_point=star_point,
-            AI_review=result.get('AI_review'),
-            product_num=result.get('product_num')
-        )
+        return await _crawl_product('musinsa', '무신사', crawl_musinsa_product, request.product_url)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"크롤링 중 오류 발생: {str(e)}")
 
 @app.post("/crawl/zigzag", response_model=CrawlResponse)
 async def crawl_zigzag(request: CrawlRequest):
     try:
-        async with crawl_semaphore:
-            result = await asyncio.to_thread(crawl_zigzag_product, request.product_url)
-        star_point = _normalize_star_point(result)
-        return CrawlResponse(
-            shoppingmall_name=result.get('shoppingmall_name', '지그재그'),
-            product_url=result.get('product_url', request.product_url),
-            category=result.get('category', '-'),
-            product_img_url=result.get('product_img_url', '-'),
-            product_name=result.get('product_name', '-'),
-            brand_name=result.get('brand_name', '-'),
-            price=result.get('price', '-'),
-            star_point=star_point,
-            AI_review=result.get('AI_review'),
-            product_num=result.get('product_num')
-        )
+        return await _crawl_product('zigzag', '지그재그', crawl_zigzag_product, request.product_url)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"크롤링 중 오류 발생: {str(e)}")
 
 @app.post("/crawl/29cm", response_model=CrawlResponse)
 async def crawl_29cm(request: CrawlRequest):
     try:
-        async with crawl_semaphore:
-            result = await asyncio.to_thread(crawl_29cm_product, request.product_url)
-        star_point = _normalize_star_point(result)
-        return CrawlResponse(
-            shoppingmall_name=result.get('shoppingmall_name', '29CM'),
-            product_url=result.get('product_url', request.product_url),
-            category=result.get('category', '-'),
-            product_img_url=result.get('product_img_url', '-'),
-            product_name=result.get('product_name', '-'),
-            brand_name=result.get('brand_name', '-'),
-            price=result.get('price', '-'),
-            star_point=star_point,
-            AI_review=result.get('AI_review'),
-            product_num=result.get('product_num')
-        )
+        return await _crawl_product('29cm', '29CM', crawl_29cm_product, request.product_url)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"크롤링 중 오류 발생: {str(e)}")
 
 @app.post("/crawl/wconcept", response_model=CrawlResponse)
 async def crawl_wconcept(request: CrawlRequest):
     try:
-        async with crawl_semaphore:
-            result = await asyncio.to_thread(crawl_wconcept_product, request.product_url)
-        star_point = _normalize_star_point(result)
-        return CrawlResponse(
-            shoppingmall_name=result.get('shoppingmall_name', 'W컨셉'),
-            product_url=result.get('product_url', request.product_url),
-            category=result.get('category', '-'),
-            product_img_url=result.get('product_img_url', '-'),
-            product_name=result.get('product_name', '-'),
-            brand_name=result.get('brand_name', '-'),
-            price=result.get('price', '-'),
-            star_point=star_point,
-            AI_review=result.get('AI_review'),
-            product_num=result.get('product_num')
-        )
+        return await _crawl_product('wconcept', 'W컨셉', crawl_wconcept_product, request.product_url)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"크롤링 중 오류 발생: {str(e)}")
 
@@ -294,8 +391,27 @@ async def crawl_reviews_unified(request: UnifiedReviewCrawlRequest, background_t
     """
     통합 리뷰 크롤링 API
     - 모든 쇼핑몰 지원
-    - 백그라운드에서 크롤링 후 DB 직접 저장
+    - crawl_job 테이블에 작업 등록 후 워커가 크롤링/DB 저장 (같은 상품이 대기/실행 중이면 기존 작업 반환)
+    - 작업 큐를 쓸 수 없으면 이 프로세스의 BackgroundTasks로 처리
     """
+    if getattr(app.state, 'review_job_queue', False):
+        try:
+            job_id, created = await run_db(
+                enqueue_review_job,
+                request.product_id,
+                request.product_url,
+                request.shoppingmall_name,
+                request.review_count
+            )
+            return {
+                "status": "started",
+                "product_id": request.product_id,
+                "job_id": job_id,
+                "duplicate": not created
+            }
+        except Exception as e:
+            print(f"[WARN] 리뷰 작업 등록 실패, BackgroundTasks로 처리: {e}")
+
     background_tasks.add_task(
         _crawl_and_save_reviews,
         request.product_id,
@@ -309,109 +425,152 @@ async def crawl_reviews_unified(request: UnifiedReviewCrawlRequest, background_t
         "product_id": request.product_id
     }
 
-async def _crawl_and_save_reviews(product_id: int, url: str, shoppingmall: str, count: int):
+async def _review_job_worker(index: int):
+    """crawl_job에서 작업을 하나씩 임대해 처리 (태스크를 늘리면 워커 수만큼 처리량 증가)"""
+    worker_id = f"{REVIEW_JOB_WORKER_ID}-{index}"
+    while True:
+        try:
+            job = await run_db(claim_review_job, worker_id, REVIEW_JOB_LEASE_SECONDS)
+        except Exception as e:
+            print(f"[WARN] 리뷰 작업 가져오기 실패: {e}")
+            await asyncio.sleep(REVIEW_JOB_POLL_SECONDS * 5)
+            continue
+        if job is None:
+            await asyncio.sleep(REVIEW_JOB_POLL_SECONDS)
+            continue
+
+        job_id = job['job_id']
+        print(f"[INFO] 리뷰 작업 시작: job_id={job_id}, product_id={job['product_id']}, 시도 {job['attempts']}/{job['max_attempts']}")
+        heartbeat = asyncio.create_task(_heartbeat_review_job(job_id, worker_id))
+        try:
+            status = await _crawl_and_save_reviews(
+                job['product_id'], job['product_url'], job['shoppingmall_name'], job['review_count']
+            )
+            error = None
+        except asyncio.CancelledError:
+            # 서버 종료: 다른 태스크가 바로 이어받도록 반납
+            heartbeat.cancel()
+            await asyncio.shield(run_db(release_review_job, job_id, worker_id))
+            raise
+        except Exception as e:
+            status, error = 'FAILED', str(e)
+        finally:
+            heartbeat.cancel()
+
+        try:
+            if status in ('COMPLETED', 'UNCHANGED'):
+                await run_db(complete_review_job, job_id, worker_id)
+            else:
+                # PARTIAL도 재시도 (다음 시도는 저장된 리뷰를 건너뛰고 이어서 수집)
+                retried = await run_db(retry_review_job, job_id, worker_id, error or status)
+                print(f"[INFO] 리뷰 작업 {status}: job_id={job_id}, {'재시도 예약' if retried else '재시도 횟수 초과'}")
+        except Exception as e:
+            # 결과 기록 실패 시 임대가 만료되면 다른 워커가 다시 가져감
+            print(f"[WARN] 리뷰 작업 결과 기록 실패: job_id={job_id}, error={e}")
+
+async def _heartbeat_review_job(job_id: int, worker_id: str):
+    while True:
+        await asyncio.sleep(REVIEW_JOB_HEARTBEAT_SECONDS)
+        try:
+            if not await run_db(heartbeat_review_job, job_id, worker_id, REVIEW_JOB_LEASE_SECONDS):
+                print(f"[WARN] 리뷰 작업 임대를 잃음: job_id={job_id}")
+                return
+        except Exception as e:
+            print(f"[WARN] 리뷰 작업 heartbeat 실패: job_id={job_id}, error={e}")
+
+async def _crawl_and_save_reviews(product_id: int, url: str, shoppingmall: str, count: int) -> str:
     """
     백그라운드에서 리뷰 크롤링 및 DB 저장
-    DB 커넥션은 필요할 때만 열고 닫음
+    DB 작업은 커넥션 풀 + DB 전용 스레드에서 실행 (이벤트 루프를 막지 않음)
+    수집기가 리뷰를 넘길 때마다 chunk 단위로 저장하므로, 타임아웃이 나도 모은 리뷰는 PARTIAL로 남음
+
+    Returns:
+        최종 상태 (COMPLETED / UNCHANGED / PARTIAL / FAILED) - 작업 큐의 재시도 판단용
     """
     
-    # 1. 상태 업데이트 (PROCESSING) - 커넥션 열고 즉시 닫음
-    connection = get_db_connection()
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                "UPDATE product SET review_crawl_status='PROCESSING' WHERE product_id=%s",
-                (product_id,)
-            )
-            connection.commit()
-            print(f"[INFO] 리뷰 크롤링 시작: product_id={product_id}, shoppingmall={shoppingmall}")
-    finally:
-        connection.close()  # 즉시 닫음
+    # 1. 상태 업데이트 (PROCESSING)
+    await run_db(update_review_crawl_status, product_id, 'PROCESSING')
+    print(f"[INFO] 리뷰 크롤링 시작: product_id={product_id}, shoppingmall={shoppingmall}")
+
+    # 이미 저장된 리뷰 기준점 (조회 실패 시 전체 수집)
+    watermark = None
+    if REVIEW_INCREMENTAL_CRAWL:
+        try:
+            watermark = await run_db(load_review_watermark, product_id)
+        except Exception as e:
+            print(f"[WARN] 리뷰 기준점 조회 실패, 전체 수집: {e}")
+    is_known = None
+    if watermark and watermark.has_reviews:
+        # 지난번이 PARTIAL이면 이미 저장된 리뷰를 만나도 멈추지 않고 이어서 수집
+        is_known = FilterOnly(watermark.is_known) if watermark.resume_partial else watermark.is_known
+    review_total = None
+    writer = ReviewStreamWriter(product_id)
     
-    # 2. 크롤링 (DB 커넥션 없이 진행)
+    # 2. 크롤링 (수집한 리뷰는 writer가 chunk 단위로 저장)
     try:
-        reviews = []
         if shoppingmall == "무신사":
-            goods_no = extract_product_no_from_url(url)
+            goods_no = await asyncio.to_thread(extract_product_no_from_url, url)
             if goods_no:
-                reviews = await asyncio.wait_for(
-                    asyncio.to_thread(collect_reviews, goods_no, count),
+                # 리뷰 수가 지난 크롤링 때와 같고 요청한 개수만큼 이미 저장돼 있으면 수집 생략
+                if watermark is not None:
+                    review_total = await asyncio.to_thread(probe_review_count, goods_no)
+                    if (review_total is not None and review_total == watermark.review_total
+                            and watermark.has_reviews and not watermark.resume_partial
+                            and watermark.stored_count >= min(count, review_total)):
+                        await run_db(complete_unchanged_review_crawl, product_id)
+                        print(f"[INFO] 리뷰 변경 없음 ({review_total}개), 크롤링 생략: product_id={product_id}")
+                        return 'UNCHANGED'
+                await asyncio.wait_for(
+                    asyncio.to_thread(collect_reviews, goods_no, count, is_known, writer.add),
                     timeout=180.0
                 )
             else:
                 raise ValueError("무신사 상품번호 추출 실패")
                 
         elif shoppingmall == "지그재그":
-            reviews = await asyncio.wait_for(
-                asyncio.to_thread(crawl_zigzag_reviews, url, count),
+            await asyncio.wait_for(
+                asyncio.to_thread(crawl_zigzag_reviews, url, count, is_known, writer.add),
                 timeout=180.0
             )
             
         elif shoppingmall == "29CM":
-            reviews = await asyncio.wait_for(
-                asyncio.to_thread(collect_29cm_reviews, url, count),
+            await asyncio.wait_for(
+                asyncio.to_thread(collect_29cm_reviews, url, count, is_known, writer.add),
                 timeout=180.0
             )
             
         elif shoppingmall == "W컨셉":
-            reviews = await asyncio.wait_for(
-                asyncio.to_thread(collect_wconcept_reviews, url, count),
+            await asyncio.wait_for(
+                asyncio.to_thread(collect_wconcept_reviews, url, count, is_known, writer.add),
                 timeout=180.0
             )
             
         else:
             raise ValueError(f"지원하지 않는 쇼핑몰: {shoppingmall}")
         
+    except asyncio.CancelledError:
+        # 서버 종료로 워커가 취소됨: 수집 스레드가 다음 리뷰를 넘길 때 멈추도록 writer를 닫음
+        # (작업은 워커가 반납하고, 다음 시도는 저장된 리뷰를 건너뛰고 이어서 수집)
+        writer.close()
+        raise
+
     except asyncio.TimeoutError:
-        print(f"⏱️ 크롤링 타임아웃 (3분 초과): product_id={product_id}")
-        # 타임아웃 시 FAILED로 업데이트
-        connection = get_db_connection()
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "UPDATE product SET review_crawl_status='FAILED' WHERE product_id=%s",
-                    (product_id,)
-                )
-                connection.commit()
-        finally:
-            connection.close()
-        return
+        print(f"⏱️ 크롤링 타임아웃 (3분 초과): product_id={product_id}, 수집 {writer.received}개")
+        # 수집 스레드는 다음 리뷰를 넘길 때 멈추고, 모은 리뷰는 PARTIAL로 저장
+        return await _finish_partial_reviews(product_id, writer)
         
     except Exception as crawl_error:
         print(f"❌ 크롤링 중 오류: product_id={product_id}, error={str(crawl_error)}")
-        # 크롤링 실패 시 FAILED로 업데이트
-        connection = get_db_connection()
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "UPDATE product SET review_crawl_status='FAILED' WHERE product_id=%s",
-                    (product_id,)
-                )
-                connection.commit()
-        finally:
-            connection.close()
-        return
+        return await _finish_partial_reviews(product_id, writer)
     
-    print(f"[INFO] 크롤링 완료: {len(reviews)}개 리뷰 수집")
+    print(f"[INFO] 크롤링 완료: {writer.received}개 {'새 ' if is_known else ''}리뷰 수집")
     
-    # 3. DB 저장 - 새로운 커넥션으로 저장
-    connection = get_db_connection()
+    # 3. 남은 리뷰 저장 + 기준점 갱신 + 상태 COMPLETED (한 트랜잭션)
+    # finish()는 DB 전용 스레드에 제출된 chunk 저장을 기다리므로 기본 스레드 풀에서 실행
     try:
-        with connection.cursor() as cursor:
-            # 리뷰 저장
-            for review in reviews:
-                _save_review_to_db(cursor, product_id, review, shoppingmall)
-            
-            connection.commit()
-            
-            # 상태 COMPLETED로 업데이트
-            cursor.execute(
-                "UPDATE product SET review_crawl_status='COMPLETED' WHERE product_id=%s",
-                (product_id,)
-            )
-            connection.commit()
-            
-            print(f"✅ 리뷰 크롤링 완료: product_id={product_id}, count={len(reviews)}")
+        saved = await asyncio.to_thread(writer.finish, 'COMPLETED', review_total)
+        print(f"✅ 리뷰 크롤링 완료: product_id={product_id}, count={saved}")
+        return 'COMPLETED'
             
     except Exception as db_error:
         print(f"❌ DB 저장 실패: product_id={product_id}, error={str(db_error)}")
@@ -420,60 +579,26 @@ async def _crawl_and_save_reviews(product_id: int, url: str, shoppingmall: str,
         
         # DB 저장 실패 시 FAILED로 업데이트
         try:
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "UPDATE product SET review_crawl_status='FAILED' WHERE product_id=%s",
-                    (product_id,)
-                )
-                connection.commit()
+            await run_db(update_review_crawl_status, product_id, 'FAILED')
         except Exception as update_error:
             print(f"❌ 상태 업데이트 실패: {str(update_error)}")
-            
-    finally:
-        connection.close()
+        return 'FAILED'
 
-def _save_review_to_db(cursor, product_id: int, review: dict, shoppingmall: str):
-    """
-    통일된 리뷰 데이터를 DB에 저장
-    Review 엔티티 구조에 맞춰 7개 필드 저장
-    """
+async def _finish_partial_reviews(product_id: int, writer: ReviewStreamWriter) -> str:
+    """중단된 크롤링: 모은 리뷰가 있으면 저장 후 PARTIAL, 없으면 FAILED"""
+    writer.close()
     try:
-        import json
-        
-        # 통일된 필드로 데이터 접근
-        rating = review.get('rating', 5)
-        content = review.get('content', '')
-        review_date = review.get('review_date', '')
-        images_list = review.get('images', [])
-        user_height = review.get('user_height')
-        user_weight = review.get('user_weight')
-        option_text = review.get('option_text', '')
-        
-        # images를 JSON 문자열로 변환
-        images_json = json.dumps(images_list, ensure_ascii=False)
-        
-        # Review 테이블에 저장
-        review_sql = """
-            INSERT INTO review (
-                product_id, rating, content, review_date,
-                images, user_height, user_weight, option_text,
-                created_at, updated_at
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
-        """
-        cursor.execute(review_sql, (
-            product_id,
-            rating,
-            content,
-            review_date,
-            images_json,
-            user_height,
-            user_weight,
-            option_text
-        ))
-                
-    except Exception as e:
-        print(f"[ERROR] 리뷰 저장 실패: {str(e)}")
-        raise
+        if writer.received:
+            saved = await asyncio.to_thread(writer.finish, 'PARTIAL')
+            print(f"⚠️ 리뷰 부분 저장: product_id={product_id}, count={saved}")
+            return 'PARTIAL'
+    except Exception as db_error:
+        print(f"❌ 부분 저장 실패: product_id={product_id}, error={str(db_error)}")
+    try:
+        await run_db(update_review_crawl_status, product_id, 'FAILED')
+    except Exception as update_error:
+        print(f"❌ 상태 업데이트 실패: {str(update_error)}")
+    return 'FAILED'
 
 if __name__ == "__main__":
     import uvicorn
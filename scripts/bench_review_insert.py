@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+##############################################
+### 리뷰 저장 벤치마크 (행별 INSERT vs 배치) ###
+##############################################
+# 로컬 MySQL에서 실행 (DB_HOST/DB_USER/DB_PASSWORD/DB_NAME 또는 DATABASE_URL)
+#   python scripts/bench_review_insert.py --product-id 1 --rows 200
+# 모든 INSERT는 트랜잭션 안에서 실행 후 롤백하므로 review 테이블에 남지 않음
+# review_hash 컬럼이 필요하므로 python scripts/migrate_review_schema.py 실행 후 사용
+
+import json
+import time
+import argparse
+from datetime import datetime
+from db_handler import get_db_connection, upsert_reviews
+
+
+def make_reviews(count: int) -> list:
+    return [
+        {
+            "rating": 5,
+            "content": f"벤치마크 리뷰 {i} - 사이즈 잘 맞고 재질도 좋아요",
+            "review_date": "2025.01.22",
+            "images": [f"https://example.com/review/{i}/1.jpg", f"https://example.com/review/{i}/2.jpg"],
+            "user_height": 170,
+            "user_weight": 60,
+            "option_text": "FREE",
+        }
+        for i in range(count)
+    ]
+
+
+# 배치 저장 이전 db_handler.save_reviews의 INSERT 문 그대로 (review_hash/ON DUPLICATE KEY 없음)
+BASELINE_REVIEW_SQL = """
+    INSERT INTO review (
+        product_id,
+        rating,
+        content,
+        review_date,
+        images,
+        user_height,
+        user_weight,
+        option_text,
+        created_at,
+        updated_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def insert_row_by_row(cursor, product_id: int, reviews: list):
+    """기존 방식: 리뷰마다 INSERT 한 번 (images JSON 변환, datetime.now()도 행마다)"""
+    for review in reviews:
+        images_json = json.dumps(review.get('images', []), ensure_ascii=False)
+        cursor.execute(BASELINE_REVIEW_SQL, (
+            product_id,
+            review.get('rating', 5),
+            review.get('content', ''),
+            review.get('review_date', ''),
+            images_json,
+            review.get('user_height'),
+            review.get('user_weight'),
+            review.get('option_text'),
+            datetime.now(),
+            datetime.now()
+        ))
+
+
+def measure(connection, label: str, insert_fn, product_id: int, reviews: list, repeat: int):
+    elapsed = []
+    for _ in range(repeat):
+        with connection.cursor() as cursor:
+            start = time.perf_counter()
+            insert_fn(cursor, product_id, reviews)
+            elapsed.append(time.perf_counter() - start)
+        connection.rollback()
+    best = min(elapsed)
+    print(f"{label:<24} {len(reviews)}행  {best * 1000:8.1f} ms  {len(reviews) / best:10.0f} rows/s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 INSERT 방식별 처리량 비교")
+    parser.add_argument('--product-id', type=int, required=True, help="review.product_id로 쓸 기존 상품 ID")
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    args = parser.parse_args()
+
+    reviews = make_reviews(args.rows)
+    connection = get_db_connection()
+    try:
+        connection.autocommit(False)
+        before = measure(connection, "행별 execute (기존)", insert_row_by_row, args.product_id, reviews, args.repeat)
+
+        def bulk(cursor, product_id, data):
+            if args.chunk_size:
+                upsert_reviews(cursor, product_id, data, chunk_size=args.chunk_size)
+            else:
+                upsert_reviews(cursor, product_id, data)
+
+        after = measure(connection, "multi-row executemany", bulk, args.product_id, reviews, args.repeat)
+        print(f"개선: {before / after:.1f}배")
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
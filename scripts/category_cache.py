@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+##############################################
+### 카테고리 분류 결과 영구 캐시 (SQLite) ###
+##############################################
+
+import os
+import re
+import time
+import sqlite3
+import threading
+import unicodedata
+from typing import Iterable, Optional, Tuple
+
+
+VALID_CATEGORIES = ("상의", "하의", "아우터", "원피스", "기타")
+
+# 캐시 설정 (환경변수로 조정 가능)
+CATEGORY_CACHE_DB_PATH = os.getenv(
+    'CATEGORY_CACHE_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'category_cache.sqlite3')
+)
+CATEGORY_CACHE_TTL = float(os.getenv('CATEGORY_CACHE_TTL', str(90 * 24 * 3600)))                # 정상 분류 결과 유지 시간(초)
+CATEGORY_CACHE_NEGATIVE_TTL = float(os.getenv('CATEGORY_CACHE_NEGATIVE_TTL', str(24 * 3600)))   # '기타' 결과는 짧게 유지 (재분류 기회)
+
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def normalize_product_name(product_name: str) -> str:
+    """캐시 키용 상품명 정규화 (전각/반각 통일, 소문자, 공백 정리)"""
+    name = unicodedata.normalize('NFKC', product_name or '')
+    return re.sub(r'\s+', ' ', name).strip().lower()
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        directory = os.path.dirname(CATEGORY_CACHE_DB_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _conn = sqlite3.connect(CATEGORY_CACHE_DB_PATH, check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS category_cache ("
+            "name_key TEXT PRIMARY KEY, category TEXT NOT NULL, "
+            "source TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        _conn.commit()
+    return _conn
+
+
+def _ttl_for(category: str) -> float:
+    return CATEGORY_CACHE_NEGATIVE_TTL if category == "기타" else CATEGORY_CACHE_TTL
+
+
+def get_cached_category(product_name: str) -> Optional[str]:
+    """캐시된 카테고리 반환 (없거나 만료되었으면 None)"""
+    key = normalize_product_name(product_name)
+    if not key:
+        return None
+    try:
+        with _lock:
+            row = _get_conn().execute(
+                "SELECT category, expires_at FROM category_cache WHERE name_key = ?", (key,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"[WARN] 카테고리 캐시 조회 실패: {e}")
+        return None
+    if row is None or row[1] <= time.time():
+        return None
+    return row[0]
+
+
+def set_cached_category(product_name: str, category: str, source: str = 'gemini'):
+    """분류 결과 저장 ('기타'는 CATEGORY_CACHE_NEGATIVE_TTL 동안만 유지)"""
+    key = normalize_product_name(product_name)
+    if not key or category not in VALID_CATEGORIES:
+        return
+    try:
+        with _lock:
+            conn = _get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO category_cache (name_key, category, source, expires_at) VALUES (?, ?, ?, ?)",
+                (key, category, source, time.time() + _ttl_for(category))
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        print(f"[WARN] 카테고리 캐시 저장 실패: {e}")
+
+
+def set_cached_categories(items: Iterable[Tuple[str, str]], source: str) -> int:
+    """(상품명, 카테고리) 여러 건을 한 트랜잭션으로 저장"""
+    now = time.time()
+    rows = []
+    for product_name, category in items:
+        key = normalize_product_name(product_name)
+        if key and category in VALID_CATEGORIES:
+            rows.append((key, category, source, now + _ttl_for(category)))
+    if not rows:
+        return 0
+    with _lock:
+        conn = _get_conn()
+        conn.executemany(
+            "INSERT OR REPLACE INTO category_cache (name_key, category, source, expires_at) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+    return len(rows)
+
+
+def warm_from_mysql(batch_size: int = 1000) -> int:
+    """
+    MySQL product 테이블의 기존 분류 결과로 캐시 미리 채우기
+    ('기타'는 다시 분류해볼 가치가 있으므로 제외)
+
+    Returns:
+        캐시에 넣은 상품 수
+    """
+    from db_handler import get_db_connection
+
+    connection = get_db_connection()
+    total = 0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT product_name, category FROM product "
+                "WHERE product_name IS NOT NULL AND category IN ('상의', '하의', '아우터', '원피스')"
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                total += set_cached_categories(
+                    ((row['product_name'], row['category']) for row in rows), source='mysql'
+                )
+    finally:
+        connection.close()
+    print(f"[INFO] 카테고리 캐시 예열 완료: {total}개")
+    return total
+
+
+def purge_expired() -> int:
+    with _lock:
+        conn = _get_conn()
+        deleted = conn.execute("DELETE FROM category_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        conn.commit()
+    return deleted
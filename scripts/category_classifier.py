@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+###################################################
+### 로컬 카테고리 분류기 (키워드 트라이 + n-gram NB) ###
+###################################################
+# 상품명만으로 카테고리를 프로세스 안에서 바로 분류하고,
+# 확신도가 LOCAL_CLASSIFIER_THRESHOLD 미만일 때만 Gemini를 호출
+
+import os
+import math
+import random
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from category_cache import get_cached_category
+from zigzag_category_ai import classify_category_with_gemini, submit_gemini_category
+
+
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv('LOCAL_CLASSIFIER_THRESHOLD', '0.8'))        # 이 이상이면 Gemini 생략
+LOCAL_CLASSIFIER_AUDIT_RATE = float(os.getenv('LOCAL_CLASSIFIER_AUDIT_RATE', '0.05'))     # 로컬로 확정한 건 중 Gemini와 비교할 비율
+LOCAL_CLASSIFIER_MIN_SAMPLES = int(os.getenv('LOCAL_CLASSIFIER_MIN_SAMPLES', '200'))      # n-gram 모델을 쓰기 위한 최소 학습 건수
+
+# 의류 키워드 (띄어쓰기를 제거한 상품명에 대해 매칭)
+GARMENT_KEYWORDS: Dict[str, List[str]] = {
+    "아우터": [
+        "자켓", "재킷", "코트", "패딩", "점퍼", "가디건", "카디건", "블레이저", "바람막이", "야상",
+        "무스탕", "플리스", "집업", "아노락", "조끼", "트렌치", "봄버", "블루종", "파카",
+        "jacket", "coat", "cardigan", "blazer", "parka", "vest",
+    ],
+    "하의": [
+        "팬츠", "슬랙스", "바지", "청바지", "데님팬츠", "조거", "레깅스", "쇼츠", "반바지", "카고",
+        "치노", "스웻팬츠", "트레이닝팬츠", "부츠컷",
+        "pants", "slacks", "jeans", "shorts", "trousers", "jogger",
+    ],
+    "원피스": [
+        "원피스", "드레스", "스커트", "치마", "점프수트", "오버롤",
+        "onepiece", "dress", "skirt", "jumpsuit",
+    ],
+    "상의": [
+        "티셔츠", "반팔", "긴팔", "셔츠", "블라우스", "니트", "스웨터", "맨투맨", "스웨트셔츠", "후드티",
+        "후디", "탑", "나시", "슬리브리스", "폴로", "카라티", "터틀넥", "크롭티",
+        "tshirt", "shirt", "blouse", "knit", "sweater", "sweatshirt", "hoodie",
+    ],
+}
+
+
+class Prediction(NamedTuple):
+    category: str
+    confidence: float
+    source: str
+
+
+def normalize_for_match(product_name: str) -> str:
+    """매칭용 정규화 (전각/반각 통일, 소문자, 공백/기호 제거)"""
+    name = unicodedata.normalize('NFKC', product_name or '').lower()
+    return ''.join(ch for ch in name if ch.isalnum())
+
+
+class KeywordTrie:
+    """
+    의류 키워드 트라이
+    한국어 상품명은 마지막에 오는 명사가 상품 종류인 경우가 많으므로
+    ('셔츠 원피스', '후드 집업') 가장 뒤에서 끝나는 키워드를 우선
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        self.root: dict = {}
+        for category, words in keywords.items():
+            for word in words:
+                node = self.root
+                for ch in normalize_for_match(word):
+                    node = node.setdefault(ch, {})
+                node['$'] = category
+
+    def matches(self, text: str) -> List[Tuple[int, int, str]]:
+        """(끝 위치, 길이, 카테고리) 목록 - 시작 위치마다 가장 긴 키워드"""
+        found = []
+        for start in range(len(text)):
+            node = self.root
+            longest = None
+            for end in range(start, len(text)):
+                node = node.get(text[end])
+                if node is None:
+                    break
+                if '$' in node:
+                    longest = (end + 1, end + 1 - start, node['$'])
+            if longest:
+                found.append(longest)
+        return found
+
+    def predict(self, product_name: str) -> Optional[Prediction]:
+        found = self.matches(normalize_for_match(product_name))
+        if not found:
+            return None
+        _, _, category = max(found, key=lambda m: (m[0], m[1]))
+        # 다른 카테고리 키워드가 섞여 있으면 확신도를 낮춤
+        agreed = all(m[2] == category for m in found)
+        return Prediction(category, 0.9 if agreed else 0.7, 'keyword')
+
+
+class NgramNaiveBayes:
+    """문자 2~3-gram 나이브 베이즈 (MySQL product 테이블의 분류 결과로 학습)"""
+
+    def __init__(self, ngram_range: Tuple[int, int] = (2, 3)):
+        self.ngram_range = ngram_range
+        self.class_counts: Counter = Counter()
+        self.feature_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.feature_totals: Counter = Counter()
+        self.vocabulary: set = set()
+
+    @property
+    def samples(self) -> int:
+        return sum(self.class_counts.values())
+
+    def _features(self, product_name: str) -> List[str]:
+        text = normalize_for_match(product_name)
+        low, high = self.ngram_range
+        return [text[i:i + n] for n in range(low, high + 1) for i in range(len(text) - n + 1)]
+
+    def fit(self, rows: List[Tuple[str, str]]):
+        for product_name, category in rows:
+            features = self._features(product_name)
+            if not features:
+                continue
+            self.class_counts[category] += 1
+            self.feature_counts[category].update(features)
+            self.feature_totals[category] += len(features)
+            self.vocabulary.update(features)
+        return self
+
+    def predict(self, product_name: str) -> Optional[Prediction]:
+        features = [f for f in self._features(product_name) if f in self.vocabulary]
+        if not features or not self.class_counts:
+            return None
+        total = self.samples
+        vocab_size = len(self.vocabulary)
+        scores = {}
+        for category, count in self.class_counts.items():
+            counts = self.feature_counts[category]
+            denominator = self.feature_totals[category] + vocab_size
+            scores[category] = math.log(count / total) + sum(
+                math.log((counts[f] + 1) / denominator) for f in features
+            )
+        best = max(scores, key=scores.get)
+        # 로그 점수를 확률로 변환 (softmax)
+        top = scores[best]
+        probability = 1.0 / sum(math.exp(score - top) for score in scores.values())
+        return Prediction(best, probability, 'ngram')
+
+
+class LocalCategoryClassifier:
+    """키워드 트라이와 n-gram 모델을 합친 분류기 + Gemini 일치율 통계"""
+
+    def __init__(self):
+        self.trie = KeywordTrie(GARMENT_KEYWORDS)
+        self.model: Optional[NgramNaiveBayes] = None
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def train(self, rows: List[Tuple[str, str]]) -> int:
+        model = NgramNaiveBayes().fit(rows)
+        if model.samples < LOCAL_CLASSIFIER_MIN_SAMPLES:
+            print(f"[WARN] 학습 데이터 부족으로 n-gram 모델 미사용: {model.samples}개")
+            return model.samples
+        self.model = model
+        return model.samples
+
+    def predict(self, product_name: str) -> Prediction:
+        keyword = self.trie.predict(product_name)
+        ngram = self.model.predict(product_name) if self.model else None
+        if keyword and ngram:
+            if keyword.category == ngram.category:
+                confidence = 1 - (1 - keyword.confidence) * (1 - ngram.confidence)
+                return Prediction(keyword.category, confidence, 'keyword+ngram')
+            chosen, other = (keyword, ngram) if keyword.confidence >= ngram.confidence else (ngram, keyword)
+            return Prediction(chosen.category, chosen.confidence * (1 - other.confidence / 2), chosen.source)
+        return keyword or ngram or Prediction("기타", 0.0, 'none')
+
+    def record(self, name: str, value: int = 1):
+        with self._lock:
+            self._stats[name] += value
+
+    def record_comparison(self, local_category: str, gemini_category: Optional[str]):
+        if gemini_category is None:
+            return
+        self.record('compared')
+        if local_category == gemini_category:
+            self.record('agreed')
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        compared = stats.get('compared', 0)
+        stats['agreement_rate'] = round(stats.get('agreed', 0) / compared, 4) if compared else None
+        stats['trained_samples'] = self.model.samples if self.model else 0
+        stats['threshold'] = LOCAL_CLASSIFIER_THRESHOLD
+        return stats
+
+
+_classifier = LocalCategoryClassifier()
+
+
+def predict_category(product_name: str) -> Prediction:
+    """로컬 분류만 수행 (Gemini 호출 없음)"""
+    return _classifier.predict(product_name)
+
+
+def classify_product_category(product_name: str) -> str:
+    """
+    상품명으로 카테고리 분류
+    캐시 -> 로컬 분류기 -> (확신도 부족 시) Gemini 순서
+    """
+    if not product_name or product_name == "-":
+        return "기타"
+
+    cached = get_cached_category(product_name)
+    if cached:
+        _classifier.record('cache_hits')
+        return cached
+
+    prediction = _classifier.predict(product_name)
+    if prediction.confidence >= LOCAL_CLASSIFIER_THRESHOLD:
+        _classifier.record('local')
+        # 일부는 백그라운드로 Gemini에도 물어서 로컬 분류 정확도(일치율) 측정
+        if LOCAL_CLASSIFIER_AUDIT_RATE > 0 and random.random() < LOCAL_CLASSIFIER_AUDIT_RATE:
+            _classifier.record('audited')
+            try:
+                future = submit_gemini_category(product_name)
+                future.add_done_callback(
+                    lambda f: None if f.exception() else _classifier.record_comparison(prediction.category, f.result())
+                )
+            except Exception as e:
+                print(f"[WARN] Gemini 비교 요청 실패: {e}")
+        return prediction.category
+
+    _classifier.record('gemini')
+    try:
+        category = classify_category_with_gemini(product_name)
+    except Exception as e:
+        print(f"카테고리 분류 중 오류 발생: {str(e)}, 로컬 분류 결과 사용")
+        return prediction.category
+    if category is None:
+        # Gemini 호출 실패 - 확신도가 낮아도 로컬 분류 결과가 '기타' 고정값보다 나음
+        _classifier.record('gemini_failed')
+        return prediction.category
+    if prediction.confidence > 0:
+        _classifier.record_comparison(prediction.category, category)
+    return category
+
+
+def refine_other_category(product_name: str) -> str:
+    """
+    쇼핑몰 카테고리 매핑이 '기타'로 끝난 상품을 상품명으로 다시 분류
+    (로컬 분류기가 확신할 때만 바꾸고, Gemini는 호출하지 않음)
+    """
+    if not product_name or product_name == "-":
+        return "기타"
+    prediction = _classifier.predict(product_name)
+    if prediction.confidence >= LOCAL_CLASSIFIER_THRESHOLD:
+        _classifier.record('refined')
+        return prediction.category
+    return "기타"
+
+
+def train_from_mysql() -> int:
+    """MySQL product 테이블의 분류 결과('기타' 포함)로 n-gram 모델 학습"""
+    from db_handler import get_db_connection
+
+    connection = get_db_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT product_name, category FROM product "
+                "WHERE product_name IS NOT NULL AND category IN ('상의', '하의', '아우터', '원피스', '기타')"
+            )
+            rows = [(row['product_name'], row['category']) for row in cursor.fetchall()]
+    finally:
+        connection.close()
+
+    samples = _classifier.train(rows)
+    print(f"[INFO] 로컬 카테고리 분류기 학습 완료: {samples}개")
+    return samples
+
+
+def classifier_stats() -> dict:
+    return _classifier.stats()
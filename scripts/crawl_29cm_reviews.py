@@ -5,47 +5,21 @@
 ### 29cm 리뷰 크롤링 (통일 형식) ###
 ####################################
 
-from selenium import webdriver
+from driver_pool import acquire_driver, release_driver
+from page_ready import wait_for_page_ready
+from product_key import canonicalize
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
 import re
-from typing import List, Dict, Optional
-
-def setup_driver():
-    """Chrome WebDriver 설정"""
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless=new')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument('user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
-    
-    driver = webdriver.Chrome(options=options)
-    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-        'source': '''
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            })
-        '''
-    })
-    
-    return driver
+from typing import Callable, List, Dict, Optional
+from review_watermark import KnownReviewTracker
 
 def extract_item_id_from_url(url: str) -> Optional[str]:
     """URL에서 item_id 추출 (예: /products/3437237 -> 3437237)"""
-    try:
-        match = re.search(r'/products/(\d+)', url)
-        if match:
-            return match.group(1)
-        return None
-    except Exception as e:
-        print(f"[ERROR] item_id 추출 실패: {e}")
-        return None
+    key = canonicalize(url, default_mall='29cm')
+    return key.native_id if key and key.mall == '29cm' else None
 
 def parse_height_weight(text: str) -> tuple:
     """키/몸무게 텍스트에서 숫자 추출"""
@@ -80,84 +54,106 @@ def normalize_date(date_str: str) -> str:
     
     return date_str
 
-def extract_review_data(review_element) -> Dict:
-    """개별 리뷰 요소에서 데이터 추출 (통일 형식)"""
-    try:
-        # 별점
-        try:
-            star_elements = review_element.find_elements(By.CSS_SELECTOR, "i.absolute svg")
-            filled_stars = 0
-            for star in star_elements:
-                parent = star.find_element(By.XPATH, "..")
-                style = parent.get_attribute('style')
-                if style and 'width: 100%' in style:
-                    filled_stars += 1
-            rating = filled_stars if filled_stars > 0 else 5
-        except:
-            rating = 5
-        
-        # 작성일
-        try:
-            date_spans = review_element.find_elements(By.CSS_SELECTOR, "span.text-s.text-tertiary")
-            review_date = date_spans[-1].text.strip() if date_spans else ""
-            review_date = normalize_date(review_date)  # 날짜 형식 통일
-        except:
-            review_date = ""
-        
-        # 리뷰 내용
-        try:
-            content_element = review_element.find_element(By.CSS_SELECTOR, "p.text-l.text-primary")
-            content = content_element.text.strip()
-        except:
-            content = ""
-        
-        # 이미지
-        images = []
-        try:
-            img_element = review_element.find_element(By.CSS_SELECTOR, "img[src*='img.29cm.co.kr']")
-            img_src = img_element.get_attribute('src')
-            if img_src:
-                img_src = img_src.split('?')[0]
-                images.append(img_src)
-        except:
-            pass
-        
-        # 옵션 및 체형 정보
-        option_text = ""
-        user_height = None
-        user_weight = None
-        
-        try:
-            info_elements = review_element.find_elements(By.CSS_SELECTOR, "p.text-s.text-tertiary span")
-            for elem in info_elements:
-                text = elem.text.strip()
-                if text.startswith('옵션 :'):
-                    option_text = text.replace('옵션 :', '').strip()
-                elif text.startswith('체형 :'):
-                    # "158cm, 47kg" 형식 파싱
-                    body_text = text.replace('체형 :', '').strip()
-                    user_height, user_weight = parse_height_weight(body_text)
-        except:
-            pass
-        
-        # 통일 형식으로 반환
+# 리뷰 카드 선택자 후보 (처음으로 요소가 잡히는 선택자 사용)
+REVIEW_SELECTORS = ["li[data-review-id]", "div[data-review-id]"]
+
+COUNT_REVIEWS_JS = "return document.querySelectorAll(arguments[0]).length;"
+
+SCROLL_TO_LAST_REVIEW_JS = """
+    const items = document.querySelectorAll(arguments[0]);
+    if (items.length) items[items.length - 1].scrollIntoView({block: 'end'});
+    window.scrollBy(0, 600);
+"""
+
+# 모든 리뷰 카드를 한 번에 JSON으로 추출 (arguments[0]: 선택자, arguments[1]: 최대 개수)
+EXTRACT_REVIEWS_JS = """
+    const cards = Array.from(document.querySelectorAll(arguments[0])).slice(0, arguments[1]);
+    return cards.map(card => {
+        // 별점: 부모 style이 width: 100%인 별 개수
+        let filledStars = 0;
+        card.querySelectorAll("i.absolute svg").forEach(star => {
+            const style = star.parentElement ? star.parentElement.getAttribute("style") : null;
+            if (style && style.includes("width: 100%")) filledStars += 1;
+        });
+
+        const dateSpans = card.querySelectorAll("span.text-s.text-tertiary");
+        const contentEl = card.querySelector("p.text-l.text-primary");
+        const imageEl = card.querySelector("img[src*='img.29cm.co.kr']");
+
         return {
-            'rating': rating,
-            'content': content,
-            'review_date': review_date,
-            'images': images,
-            'user_height': user_height,
-            'user_weight': user_weight,
-            'option_text': option_text
-        }
-        
-    except Exception as e:
-        print(f"리뷰 데이터 추출 중 오류: {str(e)}")
-        return None
+            stars: filledStars,
+            date: dateSpans.length ? dateSpans[dateSpans.length - 1].innerText.trim() : "",
+            content: contentEl ? contentEl.innerText.trim() : "",
+            image: imageEl ? imageEl.getAttribute("src") : null,
+            info: Array.from(card.querySelectorAll("p.text-s.text-tertiary span")).map(span => span.innerText.trim())
+        };
+    });
+"""
+
+def _normalize_review(raw: dict) -> Dict:
+    """스크립트가 반환한 리뷰 카드 JSON을 통일 형식으로 변환"""
+    # 옵션 및 체형 정보
+    option_text = ""
+    user_height = None
+    user_weight = None
+    for text in raw.get('info') or []:
+        if text.startswith('옵션 :'):
+            option_text = text.replace('옵션 :', '').strip()
+        elif text.startswith('체형 :'):
+            # "158cm, 47kg" 형식 파싱
+            body_text = text.replace('체형 :', '').strip()
+            user_height, user_weight = parse_height_weight(body_text)
+
+    images = []
+    if raw.get('image'):
+        images.append(raw['image'].split('?')[0])
 
-def collect_29cm_reviews(url: str, target_total: int = 20) -> List[Dict]:
+    # 통일 형식으로 반환
+    return {
+        'rating': raw.get('stars') or 5,
+        'content': raw.get('content') or "",
+        'review_date': normalize_date(raw.get('date') or ""),  # 날짜 형식 통일
+        'images': images,
+        'user_height': user_height,
+        'user_weight': user_weight,
+        'option_text': option_text
+    }
+
+def _load_review_list(driver, selector: str, target_total: int, max_rounds: int = 20, settle_timeout: float = 2.0) -> int:
+    """
+    리뷰 목록을 한 번에 lazy-load
+    목표 개수에 도달하거나 스크롤해도 개수가 더 늘지 않으면 중단하고 현재 개수 반환
+    """
+    count = driver.execute_script(COUNT_REVIEWS_JS, selector)
+    stalled_rounds = 0
+    rounds = 0
+
+    while count < target_total and stalled_rounds < 2 and rounds < max_rounds:
+        driver.execute_script(SCROLL_TO_LAST_REVIEW_JS, selector)
+
+        # 새 카드가 붙을 때까지만 짧게 폴링
+        new_count = count
+        deadline = time.monotonic() + settle_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.2)
+            new_count = driver.execute_script(COUNT_REVIEWS_JS, selector)
+            if new_count > count:
+                break
+
+        stalled_rounds = 0 if new_count > count else stalled_rounds + 1
+        count = new_count
+        rounds += 1
+
+    return count
+
+def collect_29cm_reviews(url: str, target_total: int = 20,
+                         is_known: Optional[Callable[[Dict], bool]] = None,
+                         on_review: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
     """
     29cm 리뷰 수집 (통일 형식)
+    is_known이 있으면 이미 저장된 리뷰는 결과에서 제외
+    (상품 페이지 리뷰 목록은 정렬을 바꿀 수 없어 걸러내기만 함)
+    on_review가 있으면 카드를 파싱할 때마다 넘김 (False를 반환하면 중단)
     
     Returns:
         [
@@ -172,7 +168,7 @@ def collect_29cm_reviews(url: str, target_total: int = 20) -> List[Dict]:
             }
         ]
     """
-    driver = setup_driver()
+    driver = acquire_driver('29cm_review')
     
     try:
         item_id = extract_item_id_from_url(url)
@@ -184,47 +180,38 @@ def collect_29cm_reviews(url: str, target_total: int = 20) -> List[Dict]:
         driver.get(url)
         
         WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.TAG_NAME, "main")))
-        time.sleep(3)
-        
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight / 2);")
-        time.sleep(2)
-        
-        reviews = []
-        
-        review_selectors = ["li[data-review-id]", "div[data-review-id]"]
-        review_elements = []
-        
-        for selector in review_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    review_elements = elements
-                    print(f"[INFO] 리뷰 선택자 '{selector}'로 {len(elements)}개 발견")
-                    break
-            except:
-                continue
+        # 페이지 준비 + 페이지를 훑어 lazy loading 리뷰 영역 활성화
+        wait_for_page_ready(driver, '29cm_review', lazy_load=True, restore_scroll=False)
+        
+        review_selector = None
+        for selector in REVIEW_SELECTORS:
+            count = driver.execute_script(COUNT_REVIEWS_JS, selector)
+            if count:
+                review_selector = selector
+                print(f"[INFO] 리뷰 선택자 '{selector}'로 {count}개 발견")
+                break
         
-        if not review_elements:
+        if not review_selector:
             print("[ERROR] 리뷰를 찾을 수 없습니다.")
             return []
         
-        #print(f"총 {len(review_elements)}개의 리뷰 발견")
+        # 목표 개수까지 목록을 먼저 모두 불러온 뒤 (더 안 늘어나면 있는 만큼만)
+        loaded = _load_review_list(driver, review_selector, target_total)
+        if loaded < target_total:
+            print(f"[INFO] 리뷰 목록 로딩 중단: {loaded}개만 로드됨")
         
-        for i, review_element in enumerate(review_elements[:target_total]):
-            if i >= target_total:
-                break
-            
-            try:
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", review_element)
-                time.sleep(0.5)
-                
-                review_data = extract_review_data(review_element)
-                if review_data and review_data.get('content'):
-                    reviews.append(review_data)
-                    #print(f"리뷰 {len(reviews)} 수집 완료")
-            except Exception as e:
-                print(f"리뷰 {i+1} 처리 중 오류: {str(e)}")
-                continue
+        # 한 번의 스크립트 호출로 전체 카드 추출
+        raw_reviews = driver.execute_script(EXTRACT_REVIEWS_JS, review_selector, target_total) or []
+        tracker = KnownReviewTracker(is_known, stop_streak=None)
+        reviews = []
+        for raw in raw_reviews:
+            review_data = _normalize_review(raw)
+            if review_data.get('content') and not tracker.check(review_data):
+                reviews.append(review_data)
+                if on_review is not None and not on_review(review_data):
+                    break
+        if tracker.known:
+            print(f"[INFO] 이미 저장된 리뷰 {tracker.known}개 제외")
         
         #print(f"총 {len(reviews)}개의 리뷰를 수집했습니다.")
         return reviews
@@ -234,4 +221,4 @@ def collect_29cm_reviews(url: str, target_total: int = 20) -> List[Dict]:
         return []
         
     finally:
-        driver.quit()
\ No newline at end of file
+        release_driver(driver)
\ No newline at end of file
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+##########################################
+### 리뷰 크롤링 작업 큐 (MySQL crawl_job) ###
+##########################################
+# 여러 ECS 태스크가 같은 테이블에서 SELECT ... FOR UPDATE SKIP LOCKED로 작업을 나눠 가짐
+# (MySQL 8.0 이상 필요, 로컬 테스트: docker run -e MYSQL_ROOT_PASSWORD=... -p 3306:3306 mysql:8)
+#
+# 상태: PENDING -> RUNNING -> DONE
+#                         -> PENDING (실패 시 backoff 후 재시도) -> ... -> FAILED
+# available_at: PENDING이면 실행 가능 시각, RUNNING이면 임대(lease) 만료 시각
+#               (임대가 끝나도 heartbeat가 없으면 워커가 죽은 것으로 보고 다른 워커가 가져감)
+
+import os
+from typing import Optional, Tuple
+from db_handler import db_connection
+
+
+CRAWL_JOB_MAX_ATTEMPTS = int(os.getenv('CRAWL_JOB_MAX_ATTEMPTS', '3'))
+CRAWL_JOB_BACKOFF_BASE = float(os.getenv('CRAWL_JOB_BACKOFF_BASE', '30'))    # 첫 재시도 대기(초), 이후 2배씩
+CRAWL_JOB_BACKOFF_MAX = float(os.getenv('CRAWL_JOB_BACKOFF_MAX', '1800'))
+
+# active_product_id는 PENDING/RUNNING일 때만 값이 있어 상품당 진행 중인 작업은 하나만 허용
+# (DONE/FAILED 작업은 NULL이라 유니크 인덱스에 걸리지 않음)
+CRAWL_JOB_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS crawl_job (
+        job_id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        product_id BIGINT NOT NULL,
+        product_url VARCHAR(2048) NOT NULL,
+        shoppingmall_name VARCHAR(50) NOT NULL,
+        review_count INT NOT NULL DEFAULT 20,
+        status VARCHAR(20) NOT NULL DEFAULT 'PENDING',
+        attempts INT NOT NULL DEFAULT 0,
+        max_attempts INT NOT NULL DEFAULT 3,
+        available_at DATETIME(3) NOT NULL,
+        locked_by VARCHAR(128) NULL,
+        last_error TEXT NULL,
+        active_product_id BIGINT GENERATED ALWAYS AS (
+            IF(status IN ('PENDING', 'RUNNING'), product_id, NULL)
+        ) STORED,
+        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        UNIQUE KEY uk_crawl_job_active_product (active_product_id),
+        KEY idx_crawl_job_claim (status, available_at)
+    )
+"""
+
+# 같은 상품이 이미 대기/실행 중이면 새로 만들지 않고 기존 작업 id 반환 (LAST_INSERT_ID 트릭)
+ENQUEUE_SQL = """
+    INSERT INTO crawl_job (product_id, product_url, shoppingmall_name, review_count, max_attempts, available_at)
+    VALUES (%s, %s, %s, %s, %s, NOW(3))
+    ON DUPLICATE KEY UPDATE
+        job_id = LAST_INSERT_ID(job_id),
+        review_count = GREATEST(review_count, VALUES(review_count))
+"""
+
+# 실행 가능한 PENDING 작업 + 임대가 만료된 RUNNING 작업 중 가장 오래 기다린 것
+CLAIM_SQL = """
+    SELECT job_id, product_id, product_url, shoppingmall_name, review_count, status, attempts, max_attempts
+    FROM crawl_job
+    WHERE status IN ('PENDING', 'RUNNING') AND available_at <= NOW(3)
+    ORDER BY available_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+"""
+
+
+def ensure_crawl_job_schema():
+    """서버 시작 시 crawl_job 테이블 생성"""
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(CRAWL_JOB_TABLE_SQL)
+        connection.commit()
+
+
+def enqueue_review_job(product_id: int, product_url: str, shoppingmall_name: str,
+                       review_count: int = 20) -> Tuple[int, bool]:
+    """
+    리뷰 크롤링 작업 등록
+
+    Returns:
+        (job_id, 새로 등록했는지) - 같은 상품이 이미 대기/실행 중이면 (기존 job_id, False)
+    """
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            affected = cursor.execute(
+                ENQUEUE_SQL,
+                (product_id, product_url, shoppingmall_name, review_count, CRAWL_JOB_MAX_ATTEMPTS)
+            )
+            job_id = cursor.lastrowid
+        connection.commit()
+    # affected rows: 새 행 1, 기존 행 변경 2, 변경 없음 0
+    return job_id, affected == 1
+
+
+def claim_review_job(worker_id: str, lease_seconds: float) -> Optional[dict]:
+    """
+    작업 하나를 임대 (다른 워커가 잠근 행은 건너뜀)
+    임대가 만료된 작업이 마지막 시도였으면 FAILED 처리 후 다음 작업을 찾음
+
+    Returns:
+        작업 dict / 실행할 작업이 없으면 None
+    """
+    with db_connection() as connection:
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(CLAIM_SQL)
+                job = cursor.fetchone()
+                if job is None:
+                    connection.rollback()
+                    return None
+
+                if job['status'] == 'RUNNING' and job['attempts'] >= job['max_attempts']:
+                    cursor.execute(
+                        "UPDATE crawl_job SET status='FAILED', locked_by=NULL, "
+                        "last_error='lease expired on last attempt' WHERE job_id=%s",
+                        (job['job_id'],)
+                    )
+                    cursor.execute(
+                        "UPDATE product SET review_crawl_status='FAILED' "
+                        "WHERE product_id=%s AND review_crawl_status='PROCESSING'",
+                        (job['product_id'],)
+                    )
+                    connection.commit()
+                    print(f"[WARN] 리뷰 작업 임대 만료로 실패 처리: job_id={job['job_id']}")
+                    continue
+
+                if job['status'] == 'RUNNING':
+                    print(f"[INFO] 임대 만료된 리뷰 작업 다시 가져옴: job_id={job['job_id']}")
+                cursor.execute(
+                    "UPDATE crawl_job SET status='RUNNING', locked_by=%s, attempts=attempts+1, "
+                    "available_at=NOW(3) + INTERVAL %s SECOND WHERE job_id=%s",
+                    (worker_id, lease_seconds, job['job_id'])
+                )
+            connection.commit()
+            job['attempts'] += 1
+            return job
+
+
+def heartbeat_review_job(job_id: int, worker_id: str, lease_seconds: float) -> bool:
+    """임대 연장 (False면 임대를 잃음 - 만료되어 다른 워커가 가져감)"""
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            extended = cursor.execute(
+                "UPDATE crawl_job SET available_at=NOW(3) + INTERVAL %s SECOND "
+                "WHERE job_id=%s AND status='RUNNING' AND locked_by=%s",
+                (lease_seconds, job_id, worker_id)
+            )
+        connection.commit()
+    return extended > 0
+
+
+def complete_review_job(job_id: int, worker_id: str):
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE crawl_job SET status='DONE', locked_by=NULL, last_error=NULL "
+                "WHERE job_id=%s AND locked_by=%s",
+                (job_id, worker_id)
+            )
+        connection.commit()
+
+
+def retry_review_job(job_id: int, worker_id: str, error: str) -> bool:
+    """
+    실패한 작업을 backoff 후 다시 PENDING으로 (시도 횟수를 다 쓰면 FAILED)
+
+    Returns:
+        재시도 예약 여부
+    """
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE crawl_job SET "
+                "    status = IF(attempts < max_attempts, 'PENDING', 'FAILED'), "
+                "    available_at = NOW(3) + INTERVAL LEAST(%s * POW(2, attempts - 1), %s) SECOND, "
+                "    locked_by = NULL, last_error = %s "
+                "WHERE job_id=%s AND locked_by=%s",
+                (CRAWL_JOB_BACKOFF_BASE, CRAWL_JOB_BACKOFF_MAX, error[:2000], job_id, worker_id)
+            )
+            cursor.execute("SELECT status FROM crawl_job WHERE job_id=%s", (job_id,))
+            row = cursor.fetchone()
+        connection.commit()
+    return bool(row) and row['status'] == 'PENDING'
+
+
+def release_review_job(job_id: int, worker_id: str):
+    """서버 종료 등으로 중단된 작업을 시도 횟수를 돌려놓고 바로 다시 대기열로"""
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE crawl_job SET status='PENDING', attempts=GREATEST(attempts - 1, 0), "
+                "available_at=NOW(3), locked_by=NULL WHERE job_id=%s AND locked_by=%s",
+                (job_id, worker_id)
+            )
+        connection.commit()
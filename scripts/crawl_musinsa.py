@@ -5,81 +5,245 @@
 ### 무신사 상품 상세 페이지 크롤링 ###
 ####################################
 
-from selenium import webdriver
+from driver_pool import acquire_driver, release_driver
+from selector_wait import extract_by_xpath, extract_by_xpath_with_fallback, wait_for_fields
+from page_ready import wait_for_page_ready
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
+import os
 import re
-import time
+import json
 import requests
+import html_snapshot
+from product_key import canonicalize
+import http_client
 
 
-# Chrome WebDriver 설정
-def setup_driver():
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-    
-    driver = webdriver.Chrome(options=options)
-    return driver
+# 상품 URL에서 product_num 추출
+def extract_product_num(url):
+    # 단축 URL 해석, 모바일 도메인/쿼리스트링 정규화, 15자리 변환은 product_key에서 처리
+    key = canonicalize(url, default_mall='musinsa')
+    return key.product_num if key and key.mall == 'musinsa' else None
 
 
-# XPath로 요소를 찾아 텍스트 또는 속성값 추출
-def extract_text_by_xpath(driver, xpath, wait_time=10, is_attribute=False, attribute_name='src'):
-    try:
-        element = WebDriverWait(driver, wait_time).until(
-            EC.presence_of_element_located((By.XPATH, xpath))
-        )
-        if is_attribute:
-            value = element.get_dom_attribute(attribute_name)
-            return value if value is not None else "-"
-        else:
-            return element.text.strip()
-    except (TimeoutException, NoSuchElementException):
+# 상품 정보 XPath (라이브 추출/스냅샷 파싱 공용)
+CATEGORY_XPATH = "//*[@data-category-name]"
+IMAGE_XPATH = "//*[@id='root']/div[1]/div[1]/div[1]/div[1]/div[1]/div/div[1]/img"
+PRODUCT_NAME_XPATH = "//span[contains(@class, 'text-title_18px_med') and contains(@class, 'font-pretendard') and @data-mds='Typography']"
+BRAND_XPATHS = [
+    "//*[@id='root']/div[1]/div[1]/div[5]/div[2]/div/div[1]/div/span",
+    "//*[@id='root']/div[1]/div[1]/div[6]/div[1]/div[1]/div/div[1]/a/div[2]/span[1]",
+]
+PRICE_XPATH = "//span[contains(@class, 'text-title_18px_semi') and contains(@class, 'font-pretendard') and @data-mds='Typography']"
+STARPOINT_XPATH = "//span[contains(@class, 'text-body_13px_med') and contains(@class, 'font-pretendard') and @data-mds='Typography']"
+
+
+# data-category-name 목록에서 카테고리 선택
+def select_category(category_names):
+    if not category_names:
         return "-"
 
+    # 우선순위에 따라 카테고리 선택
+    # 우선순위: 아우터 > 바지 > 하의 > 상의 > 원피스/스커트 > 기타
+    priority_categories = ["아우터", "바지", "하의", "상의", "원피스/스커트"]
 
-# 상품 URL에서 product_num 추출
-def extract_product_num(url):
-    # onelink.me 또는 단축 URL 리다이렉트 처리
-    if 'onelink.me' in url or 'musinsa.link' in url:
+    selected_category_name = None
+    for priority_cat in priority_categories:
+        if priority_cat in category_names:
+            selected_category_name = priority_cat
+            break
+
+    # 우선순위 카테고리가 없으면 첫 번째 기타 카테고리 사용
+    if selected_category_name is None:
+        selected_category_name = category_names[0]
+
+    # 카테고리 값에 따라 처리
+    if selected_category_name == "아우터":
+        return "아우터"
+    elif selected_category_name == "바지":
+        return "하의"
+    elif selected_category_name == "하의":
+        return "하의"
+    elif selected_category_name == "상의":
+        return "상의"
+    elif selected_category_name == "원피스/스커트":
+        return "원피스"
+    else:
+        return "기타"
+
+
+# 별점 후보 텍스트 중 0~5 사이 숫자 선택
+def select_starpoint(starpoint_texts):
+    for text in starpoint_texts:
         try:
-            response = requests.get(url, allow_redirects=True, timeout=10)
-            url = response.url
-        except Exception as e:
-            print(f"[오류] URL 리다이렉트 실패: {e}")
-            return None
-
-    # URL에서 /products/ 다음의 숫자 추출
-    match = re.search(r'/products/(\d+)', url)
+            # 텍스트 전체가 숫자와 소수점만으로 구성되어 있는지 확인
+            text_stripped = text.strip()
+            if re.match(r'^\d+\.?\d*$', text_stripped):
+                value = float(text_stripped)
+                if 0 <= value <= 5:
+                    return value
+        except (ValueError, AttributeError):
+            continue
+    return None
+
+
+# HTML 스냅샷에서 상품 필드 추출 (워커 프로세스에서 실행)
+def parse_product_snapshot(page_source):
+    tree = html_snapshot.parse_html(page_source)
+    fields = {}
+
+    category_names = [el.get('data-category-name') for el in html_snapshot.find_all(tree, CATEGORY_XPATH)]
+    fields['category'] = select_category([name for name in category_names if name])
+
+    image_url = html_snapshot.extract_by_xpath(tree, IMAGE_XPATH, is_attribute=True, attribute_name='src')
+    fields['product_img_url'] = image_url if image_url else "-"
+
+    product_name_texts = html_snapshot.texts_by_xpath(tree, PRODUCT_NAME_XPATH)
+    fields['product_name'] = product_name_texts[-1] if product_name_texts else "-"
+
+    brand_name = html_snapshot.extract_by_xpath_with_fallback(tree, BRAND_XPATHS)
+    fields['brand_name'] = brand_name if brand_name else "-"
+
+    price_texts = html_snapshot.texts_by_xpath(tree, PRICE_XPATH)
+    fields['price'] = price_texts[-1] if price_texts else "-"
+
+    fields['star_point'] = select_starpoint(html_snapshot.texts_by_xpath(tree, STARPOINT_XPATH))
+    return fields
+
+
+# HTTP 빠른 경로 사용 여부 (브라우저 없이 서버 렌더링된 상품 JSON 파싱)
+HTTP_FAST_PATH = os.getenv('MUSINSA_HTTP_FAST_PATH', 'true').lower() == 'true'
+MUSINSA_IMAGE_HOST = "https://image.msscdn.net"
+
+# 상품 페이지에 내장된 상태 JSON 위치
+NEXT_DATA_PATTERN = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+MSS_STATE_PATTERN = re.compile(r'window\.__MSS__\.product\.state\s*=\s*')
+
+
+# JSON 트리에서 상품 정보(goodsNm 포함) 객체 찾기
+def _find_goods_object(node):
+    if isinstance(node, dict):
+        if 'goodsNm' in node:
+            return node
+        for value in node.values():
+            found = _find_goods_object(value)
+            if found is not None:
+                return found
+    elif isinstance(node, list):
+        for value in node:
+            found = _find_goods_object(value)
+            if found is not None:
+                return found
+    return None
+
+
+# 상품 페이지 HTML에서 내장 상품 JSON 추출
+def extract_product_state(page_source):
+    match = NEXT_DATA_PATTERN.search(page_source)
     if match:
-        product_num = match.group(1)
-        # 총 15자리로 포맷팅: 맨 앞에 1, 중간은 0으로 채움, 끝에 추출한 상품 번호
-        total_length = 15
-        prefix = "1"
-        zeros_needed = total_length - len(prefix) - len(product_num)
-        if zeros_needed < 0:
-            # 상품 번호가 너무 길면 그대로 반환 (예외 처리)
-            try:
-                return int(product_num)
-            except ValueError:
-                return None
-        formatted_num = prefix + "0" * zeros_needed + product_num
         try:
-            return int(formatted_num)
+            goods = _find_goods_object(json.loads(match.group(1)))
+            if goods is not None:
+                return goods
         except ValueError:
-            return None
-    
+            pass
+
+    match = MSS_STATE_PATTERN.search(page_source)
+    if match:
+        try:
+            state, _ = json.JSONDecoder().raw_decode(page_source, match.end())
+            return _find_goods_object(state)
+        except ValueError:
+            pass
+
     return None
 
 
+# 가격 숫자를 "12,345원" 형태로 변환
+def format_price(value):
+    try:
+        return f"{int(value):,}원"
+    except (TypeError, ValueError):
+        return "-"
+
+
+# 상품 JSON에서 결과 필드 추출
+def parse_product_state(goods):
+    fields = {}
+
+    category = goods.get('category') or {}
+    category_names = [
+        category.get(key) for key in ('categoryDepth1Name', 'categoryDepth2Name')
+        if category.get(key)
+    ]
+    fields['category'] = select_category(category_names)
+
+    image_url = goods.get('thumbnailImageUrl') or "-"
+    if image_url.startswith('//'):
+        image_url = "https:" + image_url
+    elif image_url.startswith('/'):
+        image_url = MUSINSA_IMAGE_HOST + image_url
+    fields['product_img_url'] = image_url
+
+    fields['product_name'] = (goods.get('goodsNm') or "-").strip()
+
+    brand_info = goods.get('brandInfo') or {}
+    fields['brand_name'] = (brand_info.get('brandName') or goods.get('brandName') or "-").strip()
+
+    goods_price = goods.get('goodsPrice') or {}
+    fields['price'] = format_price(goods_price.get('salePrice') or goods_price.get('normalPrice'))
+
+    review = goods.get('goodsReview') or {}
+    star_point = None
+    try:
+        score = review.get('satisfactionScore')
+        if score is not None and 0 <= float(score) <= 5:
+            star_point = float(score)
+    except (TypeError, ValueError):
+        star_point = None
+    fields['star_point'] = star_point
+    return fields
+
+
+# 브라우저 없이 상품 페이지를 받아 상품 정보 추출 (필수 필드가 없으면 None)
+def crawl_product_details_via_http(url):
+    try:
+        response = http_client.get_session().get(url, timeout=(3, 5))
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"[정보] 무신사 HTTP 요청 실패, 브라우저로 재시도: {e}")
+        return None
+
+    goods = extract_product_state(response.text)
+    if goods is None:
+        return None
+
+    fields = parse_product_state(goods)
+    if "-" in (fields['product_name'], fields['brand_name'], fields['price']):
+        return None
+
+    final_url = response.url
+    result = {
+        'shoppingmall_name': "무신사",
+        'product_url': final_url,
+        'product_num': extract_product_num(final_url),
+    }
+    result.update(fields)
+    result['AI_review'] = None
+    return result
+
+
 # 무신사 상품 상세 페이지에서 크롤링
 def crawl_product_details(url):
-    driver = setup_driver()
+    # 서버 렌더링된 JSON으로 충분하면 브라우저를 띄우지 않음
+    if HTTP_FAST_PATH:
+        result = crawl_product_details_via_http(url)
+        if result is not None:
+            return result
+
+    driver = acquire_driver('musinsa')
     
     try:
         #print(f"페이지 로딩 중: {url}")
@@ -90,8 +254,8 @@ def crawl_product_details(url):
             EC.presence_of_element_located((By.XPATH, "//*[@id='root']"))
         )
         
-        # 추가 대기 (동적 콘텐츠 로딩)
-        time.sleep(2)
+        # 동적 콘텐츠 로딩 대기 (네트워크 유휴 + DOM 안정, 준비되면 바로 진행)
+        wait_for_page_ready(driver, 'musinsa')
         
         result = {}
         
@@ -106,106 +270,60 @@ def crawl_product_details(url):
         product_num = extract_product_num(final_url)
         result['product_num'] = product_num
         
-        # 4. 카테고리 추출
-        category_xpath = "//*[@data-category-name]"
-        
         # 카테고리 크롤링이 안 되는 경우가 있어 추가.
         # 카테고리 요소가 나타날 때까지 대기 (headless 모드에서 더 오래 걸릴 수 있음)
         try:
             WebDriverWait(driver, 15).until(
-                lambda d: len(d.find_elements(By.XPATH, category_xpath)) > 0
+                lambda d: len(d.find_elements(By.XPATH, CATEGORY_XPATH)) > 0
             )
         except TimeoutException:
             pass  # 카테고리 요소가 없을 수도 있으므로 계속 진행
         
-        category_elements = driver.find_elements(By.XPATH, category_xpath)
-        
-        category = "-"
-        if category_elements:
-            # 모든 카테고리 이름 수집
-            category_names = []
-            for element in category_elements:
-                category_name = element.get_dom_attribute('data-category-name')
-                if category_name:
-                    category_names.append(category_name)
-            
-            if category_names:
-                # 우선순위에 따라 카테고리 선택
-                # 우선순위: 아우터 > 바지 > 하의 > 상의 > 원피스/스커트 > 기타
-                priority_categories = ["아우터", "바지", "하의", "상의", "원피스/스커트"]
-                
-                selected_category_name = None
-                for priority_cat in priority_categories:
-                    if priority_cat in category_names:
-                        selected_category_name = priority_cat
-                        break
-                
-                # 우선순위 카테고리가 없으면 첫 번째 기타 카테고리 사용
-                if selected_category_name is None:
-                    selected_category_name = category_names[0]
-                
-                # 카테고리 값에 따라 처리
-                if selected_category_name == "아우터":
-                    category = "아우터"
-                elif selected_category_name == "바지":
-                    category = "하의"
-                elif selected_category_name == "하의":
-                    category = "하의"
-                elif selected_category_name == "상의":
-                    category = "상의"
-                elif selected_category_name == "원피스/스커트":
-                    category = "원피스"
-                else:
-                    category = "기타"
-        
-        result['category'] = category
+        # 스냅샷 모드: HTML만 받아두고 드라이버는 바로 반납
+        if html_snapshot.SNAPSHOT_MODE:
+            # 상품명/가격이 렌더링된 뒤에 스냅샷 (페이지 준비 신호만으로는 필드가 비어 있을 수 있음)
+            if not wait_for_fields(driver, [[PRODUCT_NAME_XPATH], [PRICE_XPATH]]):
+                print("[WARN] 상품명/가격 대기 시간 초과 - 현재 페이지로 스냅샷")
+            page_source = driver.page_source
+            release_driver(driver)
+            driver = None
+            result.update(html_snapshot.run_parser(parse_product_snapshot, page_source))
+            result['AI_review'] = None
+            return result
+        
+        # 4. 카테고리 추출
+        category_elements = driver.find_elements(By.XPATH, CATEGORY_XPATH)
+        category_names = []
+        for element in category_elements:
+            category_name = element.get_dom_attribute('data-category-name')
+            if category_name:
+                category_names.append(category_name)
+        result['category'] = select_category(category_names)
         
         # 5. 대표 이미지 추출
-        image_xpath = "//*[@id='root']/div[1]/div[1]/div[1]/div[1]/div[1]/div/div[1]/img"
-        image_url = extract_text_by_xpath(driver, image_xpath, is_attribute=True, attribute_name='src')
+        image_url = extract_by_xpath(driver, IMAGE_XPATH, is_attribute=True, attribute_name='src')
         result['product_img_url'] = image_url if image_url else "-"
         
         # 6. 상품명 추출
-        product_name_xpath = "//span[contains(@class, 'text-title_18px_med') and contains(@class, 'font-pretendard') and @data-mds='Typography']"
-        product_name_elements = driver.find_elements(By.XPATH, product_name_xpath)
+        product_name_elements = driver.find_elements(By.XPATH, PRODUCT_NAME_XPATH)
         product_name_texts = [elem.text.strip() for elem in product_name_elements if elem.text.strip()]
         product_name = product_name_texts[-1] if product_name_texts else "-"
         result['product_name'] = product_name
         
         # 7. 브랜드명 추출
-        brand_xpath_1 = "//*[@id='root']/div[1]/div[1]/div[5]/div[2]/div/div[1]/div/span"
-        brand_xpath_2 = "//*[@id='root']/div[1]/div[1]/div[6]/div[1]/div[1]/div/div[1]/a/div[2]/span[1]"
-        brand_name = extract_text_by_xpath(driver, brand_xpath_1)
-        if not brand_name or brand_name == "-":
-            brand_name = extract_text_by_xpath(driver, brand_xpath_2)
+        brand_name = extract_by_xpath_with_fallback(driver, BRAND_XPATHS)
         result['brand_name'] = brand_name if brand_name else "-"
         
         # 8. 가격 추출
-        price_xpath = "//span[contains(@class, 'text-title_18px_semi') and contains(@class, 'font-pretendard') and @data-mds='Typography']"
-        price_elements = driver.find_elements(By.XPATH, price_xpath)
+        price_elements = driver.find_elements(By.XPATH, PRICE_XPATH)
         price_texts = [elem.text.strip() for elem in price_elements if elem.text.strip()]
         price = price_texts[-1] if price_texts else "-"
         result['price'] = price
         
         # 9. 별점 추출
-        starpoint_xpath = "//span[contains(@class, 'text-body_13px_med') and contains(@class, 'font-pretendard') and @data-mds='Typography']"
-        starpoint_elements = driver.find_elements(By.XPATH, starpoint_xpath)
+        starpoint_elements = driver.find_elements(By.XPATH, STARPOINT_XPATH)
         starpoint_texts = [elem.text.strip() for elem in starpoint_elements if elem.text.strip()]
-        
-        starpoint = None
-        for text in starpoint_texts:
-            try:
-                # 텍스트 전체가 숫자와 소수점만으로 구성되어 있는지 확인
-                text_stripped = text.strip()
-                if re.match(r'^\d+\.?\d*$', text_stripped):
-                    value = float(text_stripped)
-                    if 0 <= value <= 5:
-                        starpoint = value
-                        break
-            except (ValueError, AttributeError):
-                continue
-
-        result['star_point'] = starpoint
+        result['star_point'] = select_starpoint(starpoint_texts)
         
         # 10. AI 리뷰
         result['AI_review'] = None
@@ -223,4 +341,4 @@ def crawl_product_details(url):
         return {"shoppingmall_name": "무신사", "product_url": fallback_url, "product_num": product_num, "category": "-", "product_img_url": "-", "product_name": "-", "brand_name": "-", "price": "-", "star_point": None, "AI_review": None}
         
     finally:
-        driver.quit()
+        release_driver(driver)
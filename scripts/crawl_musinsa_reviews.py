@@ -4,44 +4,23 @@
 import random
 import time
 import re
-import requests  # 리다이렉트 처리를 위해 필수
-from typing import List, Dict, Optional
-from selenium import webdriver
+import requests
+from typing import Callable, List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+from product_key import canonicalize
+from review_watermark import KnownReviewTracker, StreamedOnce
+from driver_pool import acquire_driver, release_driver
+from page_ready import wait_for_page_ready
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import StaleElementReferenceException, NoSuchElementException
 
-def setup_driver():
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
-    
-    driver = webdriver.Chrome(options=options)
-    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-        'source': 'Object.defineProperty(navigator, "webdriver", {get: () => undefined})'
-    })
-    return driver
-
 def extract_product_no_from_url(url: str) -> Optional[str]:
     """단축 URL(onelink, musinsa.link) 리다이렉트 처리 및 상품번호 추출"""
-    if 'onelink.me' in url or 'musinsa.link' in url:
-        try:
-            # allow_redirects=True를 통해 실제 상품 상세 페이지 URL을 획득
-            response = requests.get(url, allow_redirects=True, timeout=10)
-            url = response.url
-        except Exception as e:
-            print(f"[오류] URL 리다이렉트 실패: {e}")
-            return None
-    
-    match = re.search(r'/products/(\d+)', url)
-    return match.group(1) if match else None
+    key = canonicalize(url, default_mall='musinsa')
+    return key.native_id if key and key.mall == 'musinsa' else None
 
 def normalize_date(date_str: str) -> str:
     if not date_str: return ""
@@ -60,11 +39,294 @@ def parse_height_weight(text: str) -> tuple:
     if wm: w = int(wm.group(1))
     return h, w
 
-def collect_reviews(goods_no: str, target_total: int = 20) -> List[Dict]:
-    driver = setup_driver()
-    review_url = f"https://www.musinsa.com/review/goods/{goods_no}?sort=up_cnt_desc"
+# 리뷰 목록 JSON API (리뷰 페이지가 내부적으로 호출하는 엔드포인트)
+REVIEW_API_URL = "https://goods.musinsa.com/api2/review/v1/view/list"
+REVIEW_API_PAGE_SIZE = 30
+REVIEW_API_WORKERS = 4
+MUSINSA_IMAGE_HOST = "https://image.msscdn.net"
+
+# 리뷰 정렬 (기본: 추천순 / 증분 수집: 최신순)
+REVIEW_SORT_DEFAULT = 'up_cnt_desc'
+REVIEW_SORT_NEWEST = 'new'
+
+
+def _fetch_review_page(goods_no: str, page: int, sort: str = REVIEW_SORT_DEFAULT,
+                       page_size: int = REVIEW_API_PAGE_SIZE) -> dict:
+    """리뷰 JSON 한 페이지 요청 (page는 0부터 시작)"""
+    params = {
+        'page': page,
+        'pageSize': page_size,
+        'goodsNo': goods_no,
+        'sort': sort,
+        'myFilter': 'false',
+        'hasPhoto': 'false',
+        'isExperience': 'false',
+    }
+    response = http_client.get_session().get(
+        REVIEW_API_URL,
+        params=params,
+        headers={'Referer': f"https://www.musinsa.com/review/goods/{goods_no}"},
+        timeout=(3, 5)
+    )
+    response.raise_for_status()
+    return response.json().get('data') or {}
+
+
+def _to_image_url(path: str) -> str:
+    if path.startswith('//'):
+        return "https:" + path
+    if path.startswith('/'):
+        return MUSINSA_IMAGE_HOST + path
+    return path
+
+
+def _parse_api_date(date_str: str) -> str:
+    """2025-01-22T10:00:00 형식 -> 2025.01.22"""
+    if not date_str:
+        return ""
+    match = re.match(r'^(\d{4})-(\d{2})-(\d{2})', date_str)
+    if match:
+        return ".".join(match.groups())
+    return normalize_date(date_str)
+
+
+def _parse_api_review(item: dict) -> Dict:
+    """리뷰 JSON 항목 -> 통일된 7개 필드"""
+    try:
+        rating = int(float(item.get('grade') or 5))
+    except (TypeError, ValueError):
+        rating = 5
+
+    images = []
+    for image in item.get('images') or []:
+        path = image.get('imageUrl') if isinstance(image, dict) else image
+        if path:
+            images.append(_to_image_url(path))
+
+    profile = item.get('userProfileInfo') or {}
+    h, w = None, None
+    try:
+        h = int(profile['userHeight']) if profile.get('userHeight') else None
+        w = int(profile['userWeight']) if profile.get('userWeight') else None
+    except (TypeError, ValueError):
+        pass
+
+    return {
+        'rating': rating,
+        'content': (item.get('content') or '').strip(),
+        'review_date': _parse_api_date(item.get('createDate') or ''),
+        'images': images,
+        'user_height': h,
+        'user_weight': w,
+        'option_text': (item.get('goodsOption') or '').strip()
+    }
+
+
+def probe_review_count(goods_no: str) -> Optional[int]:
+    """
+    리뷰 총 개수만 확인 (1건짜리 페이지 요청)
+    이전 크롤링 때와 같으면 리뷰 수집을 건너뜀
+
+    Returns:
+        리뷰 총 개수 / 확인 실패 시 None
+    """
+    try:
+        data = _fetch_review_page(goods_no, 0, page_size=1)
+    except (requests.RequestException, ValueError) as e:
+        print(f"[정보] 무신사 리뷰 개수 확인 실패: {e}")
+        return None
+    total = data.get('total')
+    if total is None:
+        total = (data.get('page') or {}).get('totalElements')
+    try:
+        return int(total) if total is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def collect_reviews_via_api(goods_no: str, target_total: int = 20,
+                            is_known: Optional[Callable[[Dict], bool]] = None,
+                            on_review: Optional[Callable[[Dict], bool]] = None,
+                            tracker: Optional[KnownReviewTracker] = None) -> List[Dict]:
+    """
+    리뷰 JSON API로 수집 (브라우저 없음)
+    첫 페이지로 전체 페이지 수를 확인한 뒤 필요한 나머지 페이지는 동시에 요청
+    is_known이 있으면 최신순으로 한 페이지씩 요청하다가 이미 저장된 리뷰가 이어지면 중단
+    on_review가 있으면 리뷰를 모을 때마다 넘김 (False를 반환하면 중단)
+    tracker를 넘기면 호출한 쪽에서 이미 저장된 리뷰를 몇 개 만났는지 확인 가능
+    """
+    if is_known is not None:
+        if tracker is None:
+            tracker = KnownReviewTracker(is_known)
+        return _collect_new_reviews_via_api(goods_no, target_total, tracker, on_review)
+
+    first_page = _fetch_review_page(goods_no, 0)
+    total_pages = int((first_page.get('page') or {}).get('totalPages') or 1)
+
+    collected_reviews = {}
+    collected_contents = set()  # content 기반 중복 체크
+    pages = [first_page]
+    next_page = 1
+    with ThreadPoolExecutor(max_workers=REVIEW_API_WORKERS) as executor:
+        while True:
+            for page in pages:
+                for item in page.get('list') or []:
+                    review_id = str(item.get('no') or '')
+                    review = _parse_api_review(item)
+                    if not review['content'] or review_id in collected_reviews or review['content'] in collected_contents:
+                        continue
+                    collected_reviews[review_id or str(len(collected_reviews))] = review
+                    collected_contents.add(review['content'])
+                    if on_review is not None and not on_review(review):
+                        return list(collected_reviews.values())
+                    if len(collected_reviews) >= target_total:
+                        return list(collected_reviews.values())
+
+            if next_page >= total_pages:
+                return list(collected_reviews.values())
+            # 내용 없음/중복으로 빠진 만큼 다음 페이지들을 더 요청 (남은 개수만큼만 동시에)
+            remaining = target_total - len(collected_reviews)
+            needed_pages = min(total_pages - next_page, -(-remaining // REVIEW_API_PAGE_SIZE))
+            pages = list(executor.map(lambda page: _fetch_review_page(goods_no, page),
+                                      range(next_page, next_page + needed_pages)))
+            next_page += needed_pages
+
+
+def _collect_new_reviews_via_api(goods_no: str, target_total: int, tracker: KnownReviewTracker,
+                                 on_review: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+    """최신순 페이지를 차례로 요청 (다음 페이지가 필요한지는 앞 페이지를 봐야 알 수 있으므로 순차)"""
+    collected_reviews = {}
+    collected_contents = set()
+    page = 0
+    total_pages = 1
+    while page < total_pages and len(collected_reviews) < target_total:
+        data = _fetch_review_page(goods_no, page, sort=REVIEW_SORT_NEWEST)
+        total_pages = int((data.get('page') or {}).get('totalPages') or 1)
+        for item in data.get('list') or []:
+            review_id = str(item.get('no') or '')
+            review = _parse_api_review(item)
+            if not review['content'] or review_id in collected_reviews or review['content'] in collected_contents:
+                continue
+            if tracker.check(review):
+                if tracker.stopped:
+                    print(f"[정보] 이미 저장된 리뷰까지 도달, 새 리뷰 {len(collected_reviews)}개")
+                    return list(collected_reviews.values())
+                continue
+            collected_reviews[review_id or str(len(collected_reviews))] = review
+            collected_contents.add(review['content'])
+            if on_review is not None and not on_review(review):
+                return list(collected_reviews.values())
+            if len(collected_reviews) >= target_total:
+                return list(collected_reviews.values())
+        page += 1
+
+    return list(collected_reviews.values())
+
+
+def collect_reviews(goods_no: str, target_total: int = 20,
+                    is_known: Optional[Callable[[Dict], bool]] = None,
+                    on_review: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+    """
+    JSON API로 먼저 수집하고, 실패하거나 결과가 없을 때만 브라우저로 수집
+    is_known이 있으면 최신순으로 새 리뷰만 수집 (증분 크롤링)
+    on_review가 있으면 리뷰를 모을 때마다 넘김 (스트리밍 저장, False를 반환하면 중단)
+    """
+    if on_review is not None:
+        # API로 일부 넘긴 뒤 브라우저로 재시도해도 같은 리뷰는 다시 넘기지 않음
+        on_review = StreamedOnce(on_review)
+    tracker = KnownReviewTracker(is_known)
+    try:
+        reviews = collect_reviews_via_api(goods_no, target_total, is_known, on_review, tracker)
+        if reviews or tracker.all_known:
+            # 응답에 리뷰가 있었고 전부 이미 저장된 리뷰면 새 리뷰가 없다는 뜻
+            return reviews
+        print("[정보] 무신사 리뷰 API 결과 없음, 브라우저로 재시도")
+    except (requests.RequestException, ValueError) as e:
+        print(f"[정보] 무신사 리뷰 API 실패, 브라우저로 재시도: {e}")
+    return collect_reviews_from_browser(goods_no, target_total, is_known, on_review)
+
+
+# 수집하지 않은 리뷰 카드들을 한 번에 JSON으로 추출 (arguments[0]: 이미 수집한 data-content-id 목록)
+EXTRACT_NEW_REVIEWS_JS = """
+    const seen = new Set(arguments[0]);
+    const text = el => el ? el.textContent.trim() : null;
+    const reviews = [];
+    document.querySelectorAll("div.gtm-impression-content").forEach(item => {
+        const id = item.getAttribute("data-content-id");
+        if (!id || seen.has(id)) return;
+
+        // 내용 (더보기 버튼 텍스트 제거)
+        const contentEl = item.querySelector("div[class*='ExpandableContent'] span[class*='text-black']");
+        if (!contentEl) return;
+        const clone = contentEl.cloneNode(true);
+        const moreBtn = clone.querySelector("[class*='MoreButton']");
+        if (moreBtn) moreBtn.remove();
+
+        // 구매옵션/체형정보 행 (첫 번째 span: 라벨, 두 번째 span: 값)
+        const options = [];
+        item.querySelectorAll("div[class*='OptionRow__Container']").forEach(row => {
+            const spans = row.querySelectorAll("span");
+            if (spans.length >= 2) options.push({label: text(spans[0]), value: text(spans[1])});
+        });
+
+        reviews.push({
+            id: id,
+            content: clone.textContent.trim(),
+            score: text(item.querySelector("div[class*='StarsScore'] span")),
+            date: text(item.querySelector("span[class*='PurchaseDate']")),
+            images: Array.from(item.querySelectorAll("div[class*='ExpandableImageGroup'] img")).map(img => img.getAttribute("src")),
+            options: options
+        });
+    });
+    return reviews;
+"""
+
+SCROLL_TO_LAST_REVIEW_JS = """
+    const items = document.querySelectorAll("div.gtm-impression-content");
+    if (items.length) items[items.length - 1].scrollIntoView({block: 'center'});
+    else window.scrollBy(0, 1000);
+"""
+
+def _normalize_review(raw: dict) -> Optional[Dict]:
+    """스크립트가 반환한 리뷰 카드 JSON을 통일 형식으로 변환 (날짜가 없는 카드는 제외)"""
+    if raw.get('date') is None:
+        return None
+
+    try:
+        rating = int(raw.get('score'))
+    except (TypeError, ValueError):
+        rating = 5
+
+    # 옵션/체형 파싱
+    opt_text, h, w = "", None, None
+    for opt in raw.get('options') or []:
+        lbl, val = opt['label'], opt['value']
+        if "구매옵션" in lbl: opt_text = val
+        elif "체형정보" in lbl:
+            parts = [p.strip() for p in val.split('·')]
+            if len(parts) >= 2: h, _ = parse_height_weight(parts[1])
+            if len(parts) >= 3: _, w = parse_height_weight(parts[2])
+
+    return {
+        'rating': rating,
+        'content': raw['content'],
+        'review_date': normalize_date(raw['date']),
+        'images': raw.get('images') or [],
+        'user_height': h,
+        'user_weight': w,
+        'option_text': opt_text
+    }
+
+def collect_reviews_from_browser(goods_no: str, target_total: int = 20,
+                                 is_known: Optional[Callable[[Dict], bool]] = None,
+                                 on_review: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+    driver = acquire_driver('musinsa_review')
+    tracker = KnownReviewTracker(is_known)
+    sort = REVIEW_SORT_NEWEST if tracker.enabled else REVIEW_SORT_DEFAULT
+    review_url = f"https://www.musinsa.com/review/goods/{goods_no}?sort={sort}"
     collected_reviews = {}
     collected_contents = set()  # content 기반 중복 체크 추가
+    known_ids = []  # 이미 저장된 리뷰 카드 (다시 추출하지 않도록)
     
     try:
         driver.get(review_url)
@@ -73,7 +335,7 @@ def collect_reviews(goods_no: str, target_total: int = 20) -> List[Dict]:
         except:
             pass
         
-        time.sleep(1.5)
+        wait_for_page_ready(driver, 'musinsa_review')
 
         scroll_attempts = 0
         no_new_review_count = 0
@@ -89,66 +351,31 @@ def collect_reviews(goods_no: str, target_total: int = 20) -> List[Dict]:
             """)
             time.sleep(0.6) 
 
-            items = driver.find_elements(By.CSS_SELECTOR, "div.gtm-impression-content")
+            # 아직 수집하지 않은 리뷰 카드만 한 번의 스크립트 호출로 일괄 추출
+            batch = driver.execute_script(EXTRACT_NEW_REVIEWS_JS, list(collected_reviews.keys()) + known_ids) or []
             new_found_this_round = 0
 
-            for item in items:
-                try:
-                    review_id = item.get_dom_attribute("data-content-id")
-                    if not review_id or review_id in collected_reviews:
-                        continue
+            for raw in batch:
+                review = _normalize_review(raw)
+                # content 기반 중복 체크
+                if review is None or review['content'] in collected_contents:
+                    continue
+                if tracker.check(review):
+                    known_ids.append(raw['id'])
+                    new_found_this_round += 1
+                    if tracker.stopped: break
+                    continue
 
-                    content_element = item.find_element(By.CSS_SELECTOR, "div[class*='ExpandableContent'] span[class*='text-black']")
-                    full_content = driver.execute_script("""
-                        var el = arguments[0];
-                        var clone = el.cloneNode(true);
-                        var moreBtn = clone.querySelector("[class*='MoreButton']");
-                        if(moreBtn) moreBtn.remove();
-                        return clone.textContent.trim();
-                    """, content_element)
-                    
-                    # content 기반 중복 체크 추가
-                    if full_content in collected_contents:
-                        continue
+                collected_reviews[raw['id']] = review
+                collected_contents.add(review['content'])  # content 추가
+                new_found_this_round += 1
+                if on_review is not None and not on_review(review):
+                    return list(collected_reviews.values())[:target_total]
+                if len(collected_reviews) >= target_total: break
 
-                    # 별점/날짜
-                    try:
-                        score_text = item.find_element(By.CSS_SELECTOR, "div[class*='StarsScore'] span").get_attribute('textContent').strip()
-                        rating = int(score_text)
-                    except: rating = 5
-                    
-                    date_raw = item.find_element(By.CSS_SELECTOR, "span[class*='PurchaseDate']").get_attribute('textContent').strip()
-                    review_date = normalize_date(date_raw)
-
-                    # 이미지
-                    images = [img.get_dom_attribute("src") for img in item.find_elements(By.CSS_SELECTOR, "div[class*='ExpandableImageGroup'] img")]
-
-                    # 옵션/체형 파싱
-                    opt_text, h, w = "", None, None
-                    options = item.find_elements(By.CSS_SELECTOR, "div[class*='OptionRow__Container']")
-                    for opt in options:
-                        spans = opt.find_elements(By.TAG_NAME, "span")
-                        if len(spans) < 2: continue
-                        lbl, val = spans[0].get_attribute('textContent').strip(), spans[1].get_attribute('textContent').strip()
-                        if "구매옵션" in lbl: opt_text = val
-                        elif "체형정보" in lbl:
-                            parts = [p.strip() for p in val.split('·')]
-                            if len(parts) >= 2: h, _ = parse_height_weight(parts[1])
-                            if len(parts) >= 3: _, w = parse_height_weight(parts[2])
-
-                    collected_reviews[review_id] = {
-                        'rating': rating,
-                        'content': full_content,
-                        'review_date': review_date,
-                        'images': images,
-                        'user_height': h,
-                        'user_weight': w,
-                        'option_text': opt_text
-                    }
-                    collected_contents.add(full_content)  # content 추가
-                    new_found_this_round += 1
-                    if len(collected_reviews) >= target_total: break
-                except: continue
+            if tracker.stopped:
+                print(f"[정보] 이미 저장된 리뷰까지 도달, 새 리뷰 {len(collected_reviews)}개")
+                break
 
             # 조기 종료 로직
             current_count = len(collected_reviews)
@@ -167,15 +394,12 @@ def collect_reviews(goods_no: str, target_total: int = 20) -> List[Dict]:
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                 time.sleep(1.5)
             else:
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", items[-1])
-                    time.sleep(1.0)
-                except:
-                    driver.execute_script("window.scrollBy(0, 1000);")
+                driver.execute_script(SCROLL_TO_LAST_REVIEW_JS)
+                time.sleep(1.0)
 
             scroll_attempts += 1
 
         return list(collected_reviews.values())[:target_total]
 
     finally:
-        driver.quit()
\ No newline at end of file
+        release_driver(driver)
\ No newline at end of file
@@ -2,95 +2,152 @@
 ### W컨셉 상품 상세 페이지 크롤링 ###
 ####################################
 
-from selenium import webdriver
+from driver_pool import acquire_driver, release_driver
+from selector_wait import extract_by_xpath_with_fallback, wait_for_fields
+from page_ready import wait_for_page_ready
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import re
-import time
+import html_snapshot
+from product_key import canonicalize
 
 
-# Chrome WebDriver 설정
-def setup_driver():
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+# 상품 URL에서 product_num 추출
+def extract_product_num(url):
+    # 단축 URL 해석, 모바일 도메인/쿼리스트링 정규화, 15자리 변환은 product_key에서 처리
+    key = canonicalize(url, default_mall='wconcept')
+    return key.product_num if key and key.mall == 'wconcept' else None
+
+
+# 상품 정보 XPath 후보 (라이브 추출/스냅샷 파싱 공용)
+CATEGORY_XPATHS = [
+    "//*[@id='cateDepth3']/button",
+    "//div[@id='cateDepth3']//button | //button[contains(@class, 'category') or contains(@class, 'cate')]",
+]
+IMAGE_XPATHS = [
+    "//*[@id='img_01']",
+    "//img[@id='img_01'] | //div[@id='img_01']//img[1] | //img[contains(@class, 'main') or contains(@class, 'product')][1]",
+]
+PRODUCT_NAME_XPATHS = [
+    "//*[@id='frmproduct']/div[1]/div/h3",
+    "//form[@id='frmproduct']//div[1]//h3 | //div[contains(@class, 'product')]//h3[1]",
+]
+BRAND_XPATHS = [
+    "//*[@id='frmproduct']/div[1]/h2/a",
+    "//form[@id='frmproduct']//h2//a | //div[contains(@class, 'product')]//h2//a[1]",
+]
+PRICE_XPATHS = [
+    "//*[@id='frmproduct']/div[3]/dl/dd[2]/em",
+    "//*[@id='frmproduct']/div[3]/dl/dd/em",
+    "//form[@id='frmproduct']//div[3]//dl//dd//em | //div[contains(@class, 'price')]//em | //dl[contains(@class, 'price')]//em",
+]
+STARPOINT_XPATHS = [
+    "//*[@id='frmproduct']/div[2]/p[2]",
+    "//form[@id='frmproduct']//div[2]//p[2] | //div[contains(@class, 'rating') or contains(@class, 'star') or contains(@class, 'review')]//p",
+]
+
+
+# W컨셉 카테고리를 서비스 카테고리로 매핑
+def map_category(category):
+    final_category = "기타"  # 기본값
+
+    if category and category != "-":
+        category = category.strip()
+
+        if category == "아우터":
+            final_category = "아우터"
+        elif category == "원피스":
+            final_category = "원피스"
+        elif category == "블라우스":
+            final_category = "상의"
+        elif category == "상의":
+            final_category = "상의"
+        elif category == "셔츠":
+            final_category = "상의"
+        elif category == "티셔츠":
+            final_category = "상의"
+        elif category == "니트":
+            final_category = "상의"
+        elif category == "스커트":
+            final_category = "원피스"
+        elif category == "팬츠":
+            final_category = "하의"
+        elif category == "데님":
+            final_category = "하의"
+        elif category == "라운지웨어":
+            final_category = "기타"
+        elif category == "언더웨어":
+            final_category = "기타"
+        else:
+            final_category = "기타"
 
-    driver = webdriver.Chrome(options=options)
-    return driver
+    return final_category
 
 
-# 여러 XPath를 순차적으로 시도하여 요소 추출 (fallback 처리)
-def extract_by_xpath_with_fallback(driver, xpath_list, wait_time=10, is_attribute=False, attribute_name='src'):
-    for xpath in xpath_list:
-        try:
-            element = WebDriverWait(driver, wait_time).until(
-                EC.presence_of_element_located((By.XPATH, xpath))
-            )
-            if is_attribute:
-                value = element.get_dom_attribute(attribute_name)
-            else:
-                value = element.text.strip()
+# 이미지 URL에 스킴이 없으면 https 붙이기
+def normalize_image_url(image_url):
+    if image_url and image_url != "-":
+        if not image_url.startswith("http://") and not image_url.startswith("https://"):
+            image_url = "https:" + image_url if image_url.startswith("//") else "https://" + image_url
+    return image_url if image_url and image_url != "-" else "-"
 
-            if value:
-                return value
-        except (TimeoutException, NoSuchElementException):
-            continue
 
+# 가격에 "원" 단위 추가 (이미 "원"이 포함되어 있지 않은 경우)
+def normalize_price(price):
+    if price and price != "-":
+        price = price.strip()
+        numbers = re.findall(r'[\d,]+', price)
+        if numbers:
+            price_value = max(numbers, key=len)
+            if not price_value.endswith('원'):
+                price = price_value + '원'
+            else:
+                price = price_value
+        else:
+            if not price.endswith('원'):
+                price = price + '원'
+        return price
     return "-"
 
 
-# 단일 XPath로 요소 추출
-def extract_by_xpath(driver, xpath, wait_time=10, is_attribute=False, attribute_name='src'):
+# 별점이 "-"이거나 없으면 None, 있으면 float로 변환 시도
+def parse_starpoint(starpoint):
+    if not starpoint or starpoint == "-":
+        return None
     try:
-        element = WebDriverWait(driver, wait_time).until(
-            EC.presence_of_element_located((By.XPATH, xpath))
-        )
-        if is_attribute:
-            value = element.get_dom_attribute(attribute_name)
-            return value if value is not None else "-"
-        else:
-            return element.text.strip()
-    except (TimeoutException, NoSuchElementException):
-        return "-"
+        # 숫자 문자열인 경우 float로 변환
+        return float(starpoint)
+    except (ValueError, TypeError):
+        return None
 
 
-# 상품 URL에서 product_num 추출
-def extract_product_num(url):
-    # 모바일 도메인을 PC 도메인으로 변환
-    if 'm.wconcept.co.kr' in url:
-        url = url.replace('m.wconcept.co.kr', 'www.wconcept.co.kr')
-
-    # URL에서 /Product/ 다음의 숫자 추출
-    match = re.search(r'/Product/(\d+)', url)
-    if match:
-        product_num = match.group(1)
-        # 총 15자리로 포맷팅: 맨 앞에 4, 중간은 0으로 채움, 끝에 추출한 상품 번호
-        total_length = 15
-        prefix = "4"
-        zeros_needed = total_length - len(prefix) - len(product_num)
-        if zeros_needed < 0:
-            # 상품 번호가 너무 길면 그대로 반환 (예외 처리)
-            try:
-                return int(product_num)
-            except ValueError:
-                return None
-        formatted_num = prefix + "0" * zeros_needed + product_num
-        try:
-            return int(formatted_num)
-        except ValueError:
-            return None
-    
-    return None
+# HTML 스냅샷에서 상품 필드 추출 (워커 프로세스에서 실행)
+def parse_product_snapshot(page_source):
+    tree = html_snapshot.parse_html(page_source)
+    fields = {}
+
+    fields['category'] = map_category(html_snapshot.extract_by_xpath_with_fallback(tree, CATEGORY_XPATHS))
+
+    image_url = html_snapshot.extract_by_xpath_with_fallback(tree, IMAGE_XPATHS, is_attribute=True, attribute_name='src')
+    if not image_url or image_url == "-":
+        image_url = html_snapshot.extract_by_xpath_with_fallback(tree, IMAGE_XPATHS, is_attribute=True, attribute_name='data-src')
+    fields['product_img_url'] = normalize_image_url(image_url)
+
+    product_name = html_snapshot.extract_by_xpath_with_fallback(tree, PRODUCT_NAME_XPATHS)
+    fields['product_name'] = product_name if product_name else "-"
+
+    brand_name = html_snapshot.extract_by_xpath_with_fallback(tree, BRAND_XPATHS)
+    fields['brand_name'] = brand_name if brand_name else "-"
+
+    fields['price'] = normalize_price(html_snapshot.extract_by_xpath_with_fallback(tree, PRICE_XPATHS))
+    fields['star_point'] = parse_starpoint(html_snapshot.extract_by_xpath_with_fallback(tree, STARPOINT_XPATHS))
+    return fields
 
 
 # W컨셉 상품 상세 페이지에서 모든 정보 크롤링
 def crawl_product_details(url):
-    driver = setup_driver()
+    driver = acquire_driver('wconcept')
 
     try:
         #print(f"페이지 로딩 중: {url}")
@@ -100,8 +157,8 @@ def crawl_product_details(url):
             EC.presence_of_element_located((By.XPATH, "//*[@id='frmproduct']"))
         )
 
-        # 추가 대기 (동적 콘텐츠 로딩)
-        time.sleep(2)
+        # 동적 콘텐츠 로딩 대기 (네트워크 유휴 + DOM 안정, 준비되면 바로 진행)
+        wait_for_page_ready(driver, 'wconcept')
 
         result = {}
 
@@ -116,57 +173,26 @@ def crawl_product_details(url):
         product_num = extract_product_num(final_url)
         result['product_num'] = product_num
 
-        # 4. 카테고리 추출
-        category_xpath_absolute = "//*[@id='cateDepth3']/button"
-        category_xpath_relative = "//div[@id='cateDepth3']//button | //button[contains(@class, 'category') or contains(@class, 'cate')]"
-
-        category = extract_by_xpath_with_fallback(
-            driver,
-            [category_xpath_absolute, category_xpath_relative]
-        )
+        # 스냅샷 모드: HTML만 받아두고 드라이버는 바로 반납
+        if html_snapshot.SNAPSHOT_MODE:
+            # 상품명/가격이 렌더링된 뒤에 스냅샷 (페이지 준비 신호만으로는 필드가 비어 있을 수 있음)
+            if not wait_for_fields(driver, [PRODUCT_NAME_XPATHS, PRICE_XPATHS]):
+                print("[WARN] 상품명/가격 대기 시간 초과 - 현재 페이지로 스냅샷")
+            page_source = driver.page_source
+            release_driver(driver)
+            driver = None
+            result.update(html_snapshot.run_parser(parse_product_snapshot, page_source))
+            result['AI_review'] = None
+            return result
 
-        # 카테고리 분류 로직
-        final_category = "기타"  # 기본값
-
-        if category and category != "-":
-            category = category.strip()
-
-            if category == "아우터":
-                final_category = "아우터"
-            elif category == "원피스":
-                final_category = "원피스"
-            elif category == "블라우스":
-                final_category = "상의"
-            elif category == "상의":
-                final_category = "상의"
-            elif category == "셔츠":
-                final_category = "상의"
-            elif category == "티셔츠":
-                final_category = "상의"
-            elif category == "니트":
-                final_category = "상의"
-            elif category == "스커트":
-                final_category = "원피스"
-            elif category == "팬츠":
-                final_category = "하의"
-            elif category == "데님":
-                final_category = "하의"
-            elif category == "라운지웨어":
-                final_category = "기타"
-            elif category == "언더웨어":
-                final_category = "기타"
-            else:
-                final_category = "기타"
-
-        result['category'] = final_category
+        # 4. 카테고리 추출
+        category = extract_by_xpath_with_fallback(driver, CATEGORY_XPATHS)
+        result['category'] = map_category(category)
 
         # 5. 대표 이미지 추출
-        image_xpath_absolute = "//*[@id='img_01']"
-        image_xpath_relative = "//img[@id='img_01'] | //div[@id='img_01']//img[1] | //img[contains(@class, 'main') or contains(@class, 'product')][1]"
-
         image_url = extract_by_xpath_with_fallback(
             driver,
-            [image_xpath_absolute, image_xpath_relative],
+            IMAGE_XPATHS,
             is_attribute=True,
             attribute_name='src'
         )
@@ -174,80 +200,27 @@ def crawl_product_details(url):
         if not image_url or image_url == "-":
             image_url = extract_by_xpath_with_fallback(
                 driver,
-                [image_xpath_absolute, image_xpath_relative],
+                IMAGE_XPATHS,
                 is_attribute=True,
                 attribute_name='data-src'
             )
-        if image_url and image_url != "-":
-            if not image_url.startswith("http://") and not image_url.startswith("https://"):
-                image_url = "https:" + image_url if image_url.startswith("//") else "https://" + image_url
-        result['product_img_url'] = image_url if image_url and image_url != "-" else "-"
+        result['product_img_url'] = normalize_image_url(image_url)
 
         # 6. 상품명 추출
-        product_name_xpath_absolute = "//*[@id='frmproduct']/div[1]/div/h3"
-        product_name_xpath_relative = "//form[@id='frmproduct']//div[1]//h3 | //div[contains(@class, 'product')]//h3[1]"
-
-        product_name = extract_by_xpath_with_fallback(
-            driver,
-            [product_name_xpath_absolute, product_name_xpath_relative]
-        )
+        product_name = extract_by_xpath_with_fallback(driver, PRODUCT_NAME_XPATHS)
         result['product_name'] = product_name if product_name else "-"
 
         # 7. 브랜드명 추출
-        brand_xpath_absolute = "//*[@id='frmproduct']/div[1]/h2/a"
-        brand_xpath_relative = "//form[@id='frmproduct']//h2//a | //div[contains(@class, 'product')]//h2//a[1]"
-
-        brand_name = extract_by_xpath_with_fallback(
-            driver,
-            [brand_xpath_absolute, brand_xpath_relative]
-        )
+        brand_name = extract_by_xpath_with_fallback(driver, BRAND_XPATHS)
         result['brand_name'] = brand_name if brand_name else "-"
 
         # 8. 가격 추출 (두 가지 케이스)
-        price_xpath_case1 = "//*[@id='frmproduct']/div[3]/dl/dd[2]/em"
-        price_xpath_case2 = "//*[@id='frmproduct']/div[3]/dl/dd/em"
-        price_xpath_relative = "//form[@id='frmproduct']//div[3]//dl//dd//em | //div[contains(@class, 'price')]//em | //dl[contains(@class, 'price')]//em"
-
-        price = extract_by_xpath_with_fallback(
-            driver,
-            [price_xpath_case1, price_xpath_case2, price_xpath_relative]
-        )
-
-        # 가격에 "원" 단위 추가 (이미 "원"이 포함되어 있지 않은 경우)
-        if price and price != "-":
-            price = price.strip()
-            numbers = re.findall(r'[\d,]+', price)
-            if numbers:
-                price_value = max(numbers, key=len)
-                if not price_value.endswith('원'):
-                    price = price_value + '원'
-                else:
-                    price = price_value
-            else:
-                if not price.endswith('원'):
-                    price = price + '원'
-        else:
-            price = "-"
-
-        result['price'] = price
+        price = extract_by_xpath_with_fallback(driver, PRICE_XPATHS)
+        result['price'] = normalize_price(price)
 
         # 9. 별점 추출
-        starpoint_xpath_absolute = "//*[@id='frmproduct']/div[2]/p[2]"
-        starpoint_xpath_relative = "//form[@id='frmproduct']//div[2]//p[2] | //div[contains(@class, 'rating') or contains(@class, 'star') or contains(@class, 'review')]//p"
-
-        starpoint = extract_by_xpath_with_fallback(
-            driver,
-            [starpoint_xpath_absolute, starpoint_xpath_relative]
-        )
-        # 별점이 "-"이거나 없으면 None, 있으면 float로 변환 시도
-        if not starpoint or starpoint == "-":
-            result['star_point'] = None
-        else:
-            try:
-                # 숫자 문자열인 경우 float로 변환
-                result['star_point'] = float(starpoint)
-            except (ValueError, TypeError):
-                result['star_point'] = None
+        starpoint = extract_by_xpath_with_fallback(driver, STARPOINT_XPATHS)
+        result['star_point'] = parse_starpoint(starpoint)
 
         # 10. AI 리뷰
         result['AI_review'] = None
@@ -267,4 +240,4 @@ def crawl_product_details(url):
         return {"shoppingmall_name": "W컨셉", "product_url": fallback_url, "product_num": product_num, "category": "-", "product_img_url": "-", "product_name": "-", "brand_name": "-", "price": "-", "star_point": None, "AI_review": None}
 
     finally:
-        driver.quit()
\ No newline at end of file
+        release_driver(driver)
@@ -5,27 +5,16 @@
 ### W컨셉 리뷰 크롤링 (통일 형식) ###
 ####################################
 
-from selenium import webdriver
+from driver_pool import acquire_driver, release_driver
+from page_ready import wait_for_page_ready
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import time
+from selenium.common.exceptions import TimeoutException
 import re
-from typing import List, Dict
-
-def setup_driver():
-    """Chrome WebDriver 설정"""
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless=new')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_argument('user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
-    
-    driver = webdriver.Chrome(options=options)
-    return driver
+from typing import Callable, List, Dict, Optional
+import html_snapshot
+from review_watermark import KnownReviewTracker
 
 def parse_height_weight(text: str) -> tuple:
     """키/몸무게 텍스트에서 숫자 추출"""
@@ -60,59 +49,96 @@ def normalize_date(date_str: str) -> str:
     
     return date_str
 
-def extract_wconcept_review_data(review_element) -> Dict:
-    """개별 리뷰 요소에서 데이터 추출 (통일 형식)"""
+# 리뷰 행/필드 XPath (lxml로 리뷰 테이블 HTML 파싱)
+REVIEW_ROW_XPATH = "//tr[descendant::p[@class='pdt_review_text']]"
+STAR_XPATH = ".//*[contains(concat(' ', normalize-space(@class), ' '), ' star-grade ')]//strong"
+DATE_XPATH = ".//*[contains(concat(' ', normalize-space(@class), ' '), ' product_review_info_right ')]//span"
+CONTENT_XPATH = ".//*[contains(concat(' ', normalize-space(@class), ' '), ' pdt_review_text ')]"
+IMAGE_XPATH = ".//*[contains(concat(' ', normalize-space(@class), ' '), ' pdt_review_photo ')]//img"
+OPTION_XPATH = ".//*[contains(concat(' ', normalize-space(@class), ' '), ' pdt_review_option ')]//p"
+
+# 브라우저 페이지 전환 대기 최대 시간 (ms)
+PAGE_CHANGE_TIMEOUT_MS = 5000
+
+# 현재 리뷰 테이블 HTML (테이블만 가져와서 전송량 최소화)
+REVIEW_TABLE_HTML_JS = """
+    const row = document.querySelector("p.pdt_review_text");
+    const table = row ? row.closest("table") : null;
+    return table ? table.outerHTML : "";
+"""
+
+# 리뷰 테이블 전체(행마다 작성일 + 내용)로 현재 페이지 식별
+# (첫 리뷰만 보면 "좋아요"처럼 짧은 리뷰로 시작하는 페이지끼리 구분이 안 됨)
+TABLE_FINGERPRINT_FN = """
+    const tableFingerprint = () => Array.from(document.querySelectorAll("p.pdt_review_text")).map(p => {
+        const row = p.closest("tr");
+        const date = row ? row.querySelector(".product_review_info_right span") : null;
+        return (date ? date.textContent.trim() : "") + "|" + p.textContent.trim();
+    }).join("\\n");
+"""
+
+TABLE_FINGERPRINT_JS = TABLE_FINGERPRINT_FN + """
+    return tableFingerprint();
+"""
+
+CLICK_PAGE_JS = """
+    const btn = document.querySelector("#reviewPageNavigation a[title='" + arguments[0] + "']");
+    if (!btn) return false;
+    btn.click();
+    return true;
+"""
+
+# 리뷰 테이블이 바뀔 때까지 MutationObserver로 대기 (arguments: 이전 fingerprint, 제한시간 ms)
+WAIT_FOR_PAGE_CHANGE_JS = TABLE_FINGERPRINT_FN + """
+    const previous = arguments[0];
+    const timeoutMs = arguments[1];
+    const done = arguments[arguments.length - 1];
+    const current = tableFingerprint;
+    if (current() && current() !== previous) { done(true); return; }
+
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        const fingerprint = current();
+        if (fingerprint && fingerprint !== previous) {
+            observer.disconnect();
+            clearTimeout(timer);
+            done(true);
+        }
+    });
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+    timer = setTimeout(() => { observer.disconnect(); done(false); }, timeoutMs);
+"""
+
+def extract_wconcept_review_data(row) -> Dict:
+    """개별 리뷰 행(lxml 요소)에서 데이터 추출 (통일 형식)"""
     try:
         # 별점 (style="width:100%" 등 추출)
         rating = 5
-        try:
-            star_strong = review_element.find_element(By.CSS_SELECTOR, ".star-grade strong")
-            style_str = star_strong.get_attribute('style')
-            width_match = re.search(r'width:\s*(\d+)%', style_str)
+        stars = row.xpath(STAR_XPATH)
+        if stars:
+            width_match = re.search(r'width:\s*(\d+)%', stars[0].get('style') or '')
             if width_match:
                 width_val = int(width_match.group(1))
                 rating = int(width_val / 20.0)  # 100 -> 5, 80 -> 4
-        except: 
-            pass
 
         # 작성일
-        review_date = ""
-        try:
-            info_right = review_element.find_element(By.CLASS_NAME, "product_review_info_right")
-            review_date = info_right.find_element(By.TAG_NAME, "span").text.strip()
-            review_date = normalize_date(review_date)  # 날짜 형식 통일
-        except: 
-            pass
+        dates = row.xpath(DATE_XPATH)
+        review_date = normalize_date(html_snapshot.element_text(dates[0])) if dates else ""  # 날짜 형식 통일
 
         # 리뷰 내용
-        content = ""
-        try:
-            content = review_element.find_element(By.CLASS_NAME, "pdt_review_text").text.strip()
-        except: 
-            pass
+        contents = row.xpath(CONTENT_XPATH)
+        content = html_snapshot.element_text(contents[0]) if contents else ""
         
         # 이미지
-        images = []
-        try:
-            imgs = review_element.find_elements(By.CSS_SELECTOR, ".pdt_review_photo img")
-            images = [img.get_attribute('src') for img in imgs if img.get_attribute('src')]
-        except: 
-            pass
+        images = [img.get('src') for img in row.xpath(IMAGE_XPATH) if img.get('src')]
+        images = ["https:" + src if src.startswith('//') else src for src in images]
         
         # 옵션 및 체형 정보
-        option_text = ""
-        user_height = None
-        user_weight = None
+        info_texts = [html_snapshot.element_text(p) for p in row.xpath(OPTION_XPATH)]
+        option_text = " | ".join([text for text in info_texts if text])
         
-        try:
-            info_elements = review_element.find_elements(By.CSS_SELECTOR, ".pdt_review_option p")
-            combined_option = " | ".join([el.text.strip() for el in info_elements if el.text.strip()])
-            option_text = combined_option
-            
-            # 체형 정보에서 키/몸무게 추출 시도
-            user_height, user_weight = parse_height_weight(combined_option)
-        except: 
-            pass
+        # 체형 정보에서 키/몸무게 추출 시도
+        user_height, user_weight = parse_height_weight(option_text)
         
         # 통일 형식으로 반환
         return {
@@ -129,9 +155,25 @@ def extract_wconcept_review_data(review_element) -> Dict:
         print(f"[DEBUG] 파싱 에러: {e}")
         return None
 
-def collect_wconcept_reviews(url: str, target_total: int = 20) -> List[Dict]:
+def parse_review_rows(page_html: str) -> List[Dict]:
+    """리뷰 테이블 HTML에서 내용이 있는 리뷰만 추출"""
+    if not page_html or not page_html.strip():
+        return []
+    tree = html_snapshot.parse_html(page_html)
+    reviews = []
+    for row in tree.xpath(REVIEW_ROW_XPATH):
+        item = extract_wconcept_review_data(row)
+        if item and item['content']:
+            reviews.append(item)
+    return reviews
+
+def collect_wconcept_reviews(url: str, target_total: int = 20,
+                             is_known: Optional[Callable[[Dict], bool]] = None,
+                             on_review: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
     """
     W컨셉 리뷰 수집 (통일 형식)
+    is_known이 있으면 새 리뷰만 수집 (증분 크롤링)
+    on_review가 있으면 리뷰를 모을 때마다 넘김 (스트리밍 저장, False를 반환하면 중단)
     
     Returns:
         [
@@ -146,14 +188,22 @@ def collect_wconcept_reviews(url: str, target_total: int = 20) -> List[Dict]:
             }
         ]
     """
-    driver = setup_driver()
+    return collect_wconcept_reviews_from_browser(url, target_total, is_known, on_review)
+
+def collect_wconcept_reviews_from_browser(url: str, target_total: int = 20,
+                                          is_known: Optional[Callable[[Dict], bool]] = None,
+                                          on_review: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+    """브라우저로 리뷰 탭을 열고 페이지 번호를 눌러가며 수집"""
+    driver = acquire_driver('wconcept_review')
+    tracker = KnownReviewTracker(is_known)
     all_reviews = []
     current_page = 1
     
     try:
         target_url = url if "#review" in url else f"{url}#review"
         driver.get(target_url)
-        time.sleep(3)
+        wait_for_page_ready(driver, 'wconcept_review')
+        driver.set_script_timeout(PAGE_CHANGE_TIMEOUT_MS / 1000 + 5)
 
         while len(all_reviews) < target_total:
             try:
@@ -161,37 +211,32 @@ def collect_wconcept_reviews(url: str, target_total: int = 20) -> List[Dict]:
                     EC.presence_of_element_located((By.CLASS_NAME, "pdt_review_text"))
                 )
                 
-                rows = driver.find_elements(By.XPATH, "//tr[descendant::p[@class='pdt_review_text']]")
-                
-                for row in rows:
+                for item in parse_review_rows(driver.execute_script(REVIEW_TABLE_HTML_JS)):
                     if len(all_reviews) >= target_total: 
                         break
-                    
-                    item = extract_wconcept_review_data(row)
-                    if item and item['content']:
-                        all_reviews.append(item)
+                    if tracker.check(item):
+                        if tracker.stopped:
+                            break
+                        continue
+                    all_reviews.append(item)
+                    if on_review is not None and not on_review(item):
+                        return all_reviews
 
-                if len(all_reviews) >= target_total: 
+                if len(all_reviews) >= target_total or tracker.stopped: 
                     break
 
-                # 다음 페이지
+                # 다음 페이지: 클릭 후 리뷰 테이블이 실제로 바뀔 때까지만 대기
                 current_page += 1
-                try:
-                    pagination_id = "reviewPageNavigation"
-                    next_page_xpath = f"//*[@id='{pagination_id}']//a[@title='{current_page}']"
-                    next_page_btn = driver.find_element(By.XPATH, next_page_xpath)
-                    
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_page_btn)
-                    time.sleep(0.5)
-                    driver.execute_script("arguments[0].click();", next_page_btn)
-                    
-                    #print(f"[INFO] {current_page}페이지 클릭 완료")
-                    time.sleep(2.5)
-                    
-                except NoSuchElementException:
+                fingerprint = driver.execute_script(TABLE_FINGERPRINT_JS)
+                if not driver.execute_script(CLICK_PAGE_JS, str(current_page)):
                     print(f"[INFO] {current_page}페이지 버튼을 찾을 수 없어 종료합니다.")
                     break
 
+                if not driver.execute_async_script(WAIT_FOR_PAGE_CHANGE_JS, fingerprint, PAGE_CHANGE_TIMEOUT_MS):
+                    print(f"[INFO] {current_page}페이지 로딩 대기 시간 초과, 수집한 리뷰까지만 반환합니다.")
+                    break
+                #print(f"[INFO] {current_page}페이지 로딩 완료")
+
             except TimeoutException:
                 print("[ERROR] 리뷰 로딩 시간 초과")
                 break
@@ -204,4 +249,4 @@ def collect_wconcept_reviews(url: str, target_total: int = 20) -> List[Dict]:
         return all_reviews
         
     finally:
-        driver.quit()
\ No newline at end of file
+        release_driver(driver)
@@ -2,99 +2,252 @@
 ### 지그재그 상품 상세 페이지 크롤링 ###
 ######################################
 
-from selenium import webdriver
+from driver_pool import acquire_driver, release_driver
+from selector_wait import extract_by_xpath_with_fallback, wait_for_fields
+from page_ready import wait_for_page_ready
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import time
+import os
 import re
-import requests
-from zigzag_category_ai import classify_category_with_gemini
+import json
+import html_snapshot
+from product_key import canonicalize
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from category_classifier import classify_product_category, predict_category
 
-# Chrome WebDriver 설정
-def setup_driver():
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+# 카테고리 분류는 상품명을 읽자마자 별도 스레드로 시작하고, 나머지 필드 추출이 끝난 뒤 합류
+CLASSIFY_JOIN_TIMEOUT = float(os.getenv('ZIGZAG_CLASSIFY_JOIN_TIMEOUT', '12'))
+_classify_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='zigzag-classify')
 
-    driver = webdriver.Chrome(options=options)
-    return driver
+# 상품 URL에서 product_num 추출
+def extract_product_num(url):
+    # 단축 URL 해석, 모바일 도메인/쿼리스트링 정규화, 15자리 변환은 product_key에서 처리
+    key = canonicalize(url, default_mall='zigzag')
+    return key.product_num if key and key.mall == 'zigzag' else None
+
+
+# 상품 정보 XPath 후보 (라이브 추출/스냅샷 파싱 공용)
+IMAGE_XPATHS = [
+    "//picture/img[1]",
+    "//*[@id='__next']/div[1]/div[1]/div/div[1]/div[1]/div/div/div[1]/div[1]/div/div/picture/img",
+]
+PRODUCT_NAME_XPATHS = [
+    "//*[@id='__next']/div[1]/div[1]/div/div[4]/h1",
+    "//*[@id='__next']/div[1]/div[1]/div/div[3]/h1",
+    "//h1[contains(@class, 'product') or contains(@class, 'title')] | //div[contains(@class, 'product')]//h1",
+]
+BRAND_XPATHS = [
+    "//*[@id='__next']/div[1]/div[1]/div/div[2]/button[1]/span",
+    "//button[contains(@class, 'brand') or contains(@class, 'Brand')]/span | //div[contains(@class, 'brand')]//span[1]",
+]
+PRICE_XPATHS = [
+    "//*[@id='__next']/div[1]/div[1]/div/div[5]/div/div[1]/div[1]/div[2]/div[1]",
+    "//*[@id='__next']/div[1]/div[1]/div/div[6]/div/div[1]/div[1]/div[2]/div[1]",
+    "//div[contains(@class, 'price')]//div[contains(text(), ',') or contains(text(), '원')] | //div[contains(@class, 'Price')]//div[1]",
+    "//*[@id='__next']/div[1]/div[1]/div/div[4]/div/div[1]/div/div[1]/div[2]",
+    "//*[@id='__next']/div[1]/div[1]/div/div[5]/div/div[1]/div/div[1]/div[2]",
+    "//*[@id='__next']/div[1]/div[1]/div/div[4]/div/div[1]/div/div[2]/div[1]",
+]
+STARPOINT_XPATHS = [
+    "//*[@id='__next']/div[1]/div[1]/div/div[4]/div",
+    "//*[@id='__next']/div[1]/div[1]/div/div[5]/div",
+    "//div[contains(@class, 'rating') or contains(@class, 'star') or contains(@class, 'review')]//div[contains(text(), '.') or contains(text(), '점')]",
+]
+
+
+# 가격 텍스트를 "12,345원" 형태로 정리
+def normalize_price(price):
+    if price and price != "-":
+        price = price.strip()
+        if not price.endswith('원'):
+            numbers = re.findall(r'[\d,]+', price)
+            if numbers:
+                price = numbers[0] + '원'
+            else:
+                price = price + '원'
+        return price
+    return "-"
 
 
-# 여러 XPath를 순차적으로 시도하여 요소 추출 (fallback 처리)
-def extract_by_xpath_with_fallback(driver, xpath_list, wait_time=10, is_attribute=False, attribute_name='src'):
-    for xpath in xpath_list:
-        try:
-            element = WebDriverWait(driver, wait_time).until(
-                EC.presence_of_element_located((By.XPATH, xpath))
-            )
-            if is_attribute:
-                value = element.get_dom_attribute(attribute_name)
-            else:
-                value = element.text.strip()
+# 별점이 "-"이거나 없으면 None, 있으면 float로 변환 시도
+def parse_starpoint(starpoint):
+    if not starpoint or starpoint == "-":
+        return None
+    try:
+        # 숫자 문자열인 경우 float로 변환
+        return float(starpoint)
+    except (ValueError, TypeError):
+        return None
 
-            if value:
-                return value
-        except (TimeoutException, NoSuchElementException):
-            continue
 
-    return "-"
+# 상품명으로 카테고리 분류 (로컬 분류기 -> 확신도 부족 시 Gemini)
+def classify_category(product_name):
+    try:
+        return classify_product_category(product_name)
+    except Exception as e:
+        print(f"카테고리 분류 중 오류 발생: {str(e)}, 기본값 '기타' 사용")
+        return "기타"
 
 
-def extract_by_xpath(driver, xpath, wait_time=10, is_attribute=False, attribute_name='src'):
+def submit_classify_category(product_name):
+    """카테고리 분류를 백그라운드로 시작 (결과는 join_classify_category로 받음)"""
+    return _classify_executor.submit(classify_category, product_name)
+
+
+def join_classify_category(future, product_name):
+    """
+    백그라운드 분류 결과 대기
+    제한시간을 넘기면 로컬 분류기 결과로 대신함 (분류 자체는 끝까지 진행되어 캐시에 저장됨)
+    """
     try:
-        element = WebDriverWait(driver, wait_time).until(
-            EC.presence_of_element_located((By.XPATH, xpath))
-        )
-        if is_attribute:
-            value = element.get_dom_attribute(attribute_name)
-            return value if value is not None else "-"
-        else:
-            return element.text.strip()
-    except (TimeoutException, NoSuchElementException):
-        return "-"
+        return future.result(timeout=CLASSIFY_JOIN_TIMEOUT)
+    except FutureTimeoutError:
+        print(f"[WARN] 카테고리 분류 대기 시간 초과, 로컬 분류 결과 사용: {product_name}")
+        return predict_category(product_name).category
+
+
+# 지그재그 자체 카테고리명 -> 서비스 카테고리
+ZIGZAG_CATEGORY_MAP = {
+    "아우터": "아우터",
+    "상의": "상의",
+    "티셔츠": "상의",
+    "셔츠/블라우스": "상의",
+    "블라우스": "상의",
+    "니트": "상의",
+    "니트/카디건": "상의",
+    "바지": "하의",
+    "팬츠": "하의",
+    "하의": "하의",
+    "원피스": "원피스",
+    "스커트": "원피스",
+    "원피스/스커트": "원피스",
+}
+
+NEXT_DATA_PATTERN = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+
+# JSON 트리에서 상품 객체(상품명 + 가격 정보 포함) 찾기
+def _find_product_object(node):
+    if isinstance(node, dict):
+        if 'name' in node and ('product_price' in node or 'final_price' in node):
+            return node
+        for value in node.values():
+            found = _find_product_object(value)
+            if found is not None:
+                return found
+    elif isinstance(node, list):
+        for value in node:
+            found = _find_product_object(value)
+            if found is not None:
+                return found
+    return None
 
 
-# 상품 URL에서 product_num 추출
-def extract_product_num(url):
-    # s.zigzag.kr 단축 URL 리다이렉트 처리
-    if 's.zigzag.kr' in url or 'zigzag.link' in url:
-        try:
-            response = requests.head(url, allow_redirects=True, timeout=10)
-            url = response.url
-        except:
-            pass
-
-    # URL에서 /catalog/products/ 다음의 숫자 추출
-    match = re.search(r'/catalog/products/(\d+)', url)
-    if match:
-        product_num = match.group(1)
-        # 총 15자리로 포맷팅: 맨 앞에 2, 중간은 0으로 채움, 끝에 추출한 상품 번호
-        total_length = 15
-        prefix = "2"
-        zeros_needed = total_length - len(prefix) - len(product_num)
-        if zeros_needed < 0:
-            # 상품 번호가 너무 길면 그대로 반환 (예외 처리)
-            try:
-                return int(product_num)
-            except ValueError:
-                return None
-        formatted_num = prefix + "0" * zeros_needed + product_num
-        try:
-            return int(formatted_num)
-        except ValueError:
-            return None
-    
+# 중첩 dict에서 경로 후보 중 처음으로 값이 있는 것 반환
+def _first_value(node, paths):
+    for path in paths:
+        value = node
+        for key in path:
+            if isinstance(value, dict):
+                value = value.get(key)
+            elif isinstance(value, list) and isinstance(key, int) and len(value) > key:
+                value = value[key]
+            else:
+                value = None
+                break
+        if value not in (None, "", []):
+            return value
     return None
 
 
+# 지그재그 카테고리 목록을 서비스 카테고리로 매핑 (매핑 불가 시 None)
+def map_site_category(category_list):
+    for category in category_list or []:
+        name = (category.get('value') or category.get('name')) if isinstance(category, dict) else category
+        if name in ZIGZAG_CATEGORY_MAP:
+            return ZIGZAG_CATEGORY_MAP[name]
+    return None
+
+
+# __NEXT_DATA__ JSON에서 상품 필드 추출 (찾은 필드만 반환)
+def parse_next_data(page_source):
+    match = NEXT_DATA_PATTERN.search(page_source)
+    if not match:
+        return {}
+    try:
+        product = _find_product_object(json.loads(match.group(1)))
+    except ValueError:
+        return {}
+    if product is None:
+        return {}
+
+    fields = {}
+
+    name = product.get('name')
+    if name:
+        fields['product_name'] = name.strip()
+
+    brand_name = _first_value(product, [('shop_name',), ('shop', 'name'), ('brand_name',)])
+    if brand_name:
+        fields['brand_name'] = str(brand_name).strip()
+
+    price = _first_value(product, [
+        ('product_price', 'final_discount_info', 'discount_price'),
+        ('product_price', 'final_price'),
+        ('product_price', 'max_price_info', 'price'),
+        ('final_price',),
+    ])
+    if isinstance(price, (int, float)):
+        fields['price'] = f"{int(price):,}원"
+
+    image_url = _first_value(product, [('product_image_list', 0, 'url'), ('image_url',), ('main_image_url',)])
+    if image_url:
+        fields['product_img_url'] = image_url
+
+    rating = _first_value(product, [('review_summary', 'rating'), ('review_score',), ('rating',)])
+    try:
+        if rating is not None and 0 <= float(rating) <= 5:
+            fields['star_point'] = float(rating)
+    except (TypeError, ValueError):
+        pass
+
+    category = map_site_category(_first_value(product, [('managed_category_list',), ('category_list',)]))
+    if category:
+        fields['category'] = category
+
+    return fields
+
+
+# HTML 스냅샷에서 상품 필드 추출 (워커 프로세스에서 실행)
+# __NEXT_DATA__를 우선 사용하고, 없는 필드만 XPath로 보충
+def parse_product_snapshot(page_source):
+    fields = parse_next_data(page_source)
+    tree = html_snapshot.parse_html(page_source)
+
+    if 'product_img_url' not in fields:
+        image_url = html_snapshot.extract_by_xpath_with_fallback(tree, IMAGE_XPATHS, is_attribute=True, attribute_name='src')
+        fields['product_img_url'] = image_url if image_url else "-"
+
+    if 'product_name' not in fields:
+        product_name = html_snapshot.extract_by_xpath_with_fallback(tree, PRODUCT_NAME_XPATHS)
+        fields['product_name'] = product_name if product_name else "-"
+
+    if 'brand_name' not in fields:
+        brand_name = html_snapshot.extract_by_xpath_with_fallback(tree, BRAND_XPATHS)
+        fields['brand_name'] = brand_name if brand_name else "-"
+
+    if 'price' not in fields:
+        fields['price'] = normalize_price(html_snapshot.extract_by_xpath_with_fallback(tree, PRICE_XPATHS))
+
+    if 'star_point' not in fields:
+        fields['star_point'] = parse_starpoint(html_snapshot.extract_by_xpath_with_fallback(tree, STARPOINT_XPATHS))
+    return fields
+
+
 # 지그재그 상품 상세 페이지에서 모든 정보 크롤링
 def crawl_product_details(url):
-    driver = setup_driver()
+    driver = acquire_driver('zigzag')
 
     try:
         #print(f"페이지 로딩 중: {url}")
@@ -105,8 +258,8 @@ def crawl_product_details(url):
             EC.presence_of_element_located((By.XPATH, "//*[@id='__next']"))
         )
 
-        # 추가 대기 (동적 콘텐츠 로딩)
-        time.sleep(2)
+        # 동적 콘텐츠 로딩 대기 (네트워크 유휴 + DOM 안정, 준비되면 바로 진행)
+        wait_for_page_ready(driver, 'zigzag')
 
         result = {}
 
@@ -121,96 +274,74 @@ def crawl_product_details(url):
         product_num = extract_product_num(final_url)
         result['product_num'] = product_num
 
+        # 스냅샷 모드: HTML만 받아두고 드라이버는 바로 반납
+        if html_snapshot.SNAPSHOT_MODE:
+            # 상품명/가격이 렌더링된 뒤에 스냅샷 (페이지 준비 신호만으로는 필드가 비어 있을 수 있음)
+            if not wait_for_fields(driver, [PRODUCT_NAME_XPATHS, PRICE_XPATHS]):
+                print("[WARN] 상품명/가격 대기 시간 초과 - 현재 페이지로 스냅샷")
+            page_source = driver.page_source
+            release_driver(driver)
+            driver = None
+            # __NEXT_DATA__에서 상품명을 먼저 읽어 분류를 스냅샷 파싱과 동시에 진행
+            early = parse_next_data(page_source)
+            category_future = None
+            if 'category' not in early and early.get('product_name'):
+                category_future = submit_classify_category(early['product_name'])
+            result.update(html_snapshot.run_parser(parse_product_snapshot, page_source))
+            # 사이트 카테고리로 매핑이 안 된 경우에만 분류
+            if 'category' not in result:
+                if category_future is not None:
+                    result['category'] = join_classify_category(category_future, early['product_name'])
+                else:
+                    result['category'] = classify_category(result['product_name'])
+            result['AI_review'] = None
+            return result
+
+        # __NEXT_DATA__에 있는 필드는 XPath 탐색 없이 사용
+        result.update(parse_next_data(driver.page_source))
+
         # 4. 대표 이미지 추출
-        image_xpath_absolute = "//*[@id='__next']/div[1]/div[1]/div/div[1]/div[1]/div/div/div[1]/div[1]/div/div/picture/img"
-        image_xpath_relative = "//picture/img[1]"
-
-        image_url = extract_by_xpath_with_fallback(
-            driver,
-            [image_xpath_relative, image_xpath_absolute],
-            is_attribute=True,
-            attribute_name='src'
-        )
-        result['product_img_url'] = image_url if image_url else "-"
+        if 'product_img_url' not in result:
+            image_url = extract_by_xpath_with_fallback(
+                driver,
+                IMAGE_XPATHS,
+                is_attribute=True,
+                attribute_name='src'
+            )
+            result['product_img_url'] = image_url if image_url else "-"
 
         # 5. 상품명 추출 (두 가지 케이스)
-        product_name_xpath_case1 = "//*[@id='__next']/div[1]/div[1]/div/div[4]/h1"
-        product_name_xpath_case2 = "//*[@id='__next']/div[1]/div[1]/div/div[3]/h1"
-        product_name_xpath_relative = "//h1[contains(@class, 'product') or contains(@class, 'title')] | //div[contains(@class, 'product')]//h1"
+        if 'product_name' not in result:
+            product_name = extract_by_xpath_with_fallback(driver, PRODUCT_NAME_XPATHS)
+            result['product_name'] = product_name if product_name else "-"
 
-        product_name = extract_by_xpath_with_fallback(
-            driver,
-            [product_name_xpath_case1, product_name_xpath_case2, product_name_xpath_relative]
-        )
-        result['product_name'] = product_name if product_name else "-"
-
-        # 5. 카테고리 분류 (상품명 추출 후 해야 해서 여기에 있음)
-        try:
-            category = classify_category_with_gemini(result['product_name'])
-            result['category'] = category
-        except Exception as e:
-            print(f"카테고리 분류 중 오류 발생: {str(e)}, 기본값 '기타' 사용")
-            result['category'] = "기타"
+        # 5. 카테고리 분류 (상품명 추출 직후 백그라운드로 시작, 나머지 필드 추출과 동시에 진행)
+        category_future = None
+        if 'category' not in result:
+            category_future = submit_classify_category(result['product_name'])
 
         # 6. 브랜드명 추출
-        brand_xpath_absolute = "//*[@id='__next']/div[1]/div[1]/div/div[2]/button[1]/span"
-        brand_xpath_relative = "//button[contains(@class, 'brand') or contains(@class, 'Brand')]/span | //div[contains(@class, 'brand')]//span[1]"
-
-        brand_name = extract_by_xpath_with_fallback(
-            driver,
-            [brand_xpath_absolute, brand_xpath_relative]
-        )
-        result['brand_name'] = brand_name if brand_name else "-"
+        if 'brand_name' not in result:
+            brand_name = extract_by_xpath_with_fallback(driver, BRAND_XPATHS)
+            result['brand_name'] = brand_name if brand_name else "-"
 
         # 7. 가격 추출
-        price_xpath_case1 = "//*[@id='__next']/div[1]/div[1]/div/div[5]/div/div[1]/div[1]/div[2]/div[1]"
-        price_xpath_case2 = "//*[@id='__next']/div[1]/div[1]/div/div[6]/div/div[1]/div[1]/div[2]/div[1]"
-        price_xpath_relative = "//div[contains(@class, 'price')]//div[contains(text(), ',') or contains(text(), '원')] | //div[contains(@class, 'Price')]//div[1]"
-        price_xpath_case3 = "//*[@id='__next']/div[1]/div[1]/div/div[4]/div/div[1]/div/div[1]/div[2]"
-        price_xpath_case4 = "//*[@id='__next']/div[1]/div[1]/div/div[5]/div/div[1]/div/div[1]/div[2]"
-        price_xpath_case5 = "//*[@id='__next']/div[1]/div[1]/div/div[4]/div/div[1]/div/div[2]/div[1]"
-
-        price = extract_by_xpath_with_fallback(
-            driver,
-            [price_xpath_case1, price_xpath_case2, price_xpath_relative, price_xpath_case3, price_xpath_case4, price_xpath_case5]
-        )
-
-        if price and price != "-":
-            price = price.strip()
-            if not price.endswith('원'):
-                import re
-                numbers = re.findall(r'[\d,]+', price)
-                if numbers:
-                    price = numbers[0] + '원'
-                else:
-                    price = price + '원'
-        else:
-            price = "-"
-
-        result['price'] = price
+        if 'price' not in result:
+            price = extract_by_xpath_with_fallback(driver, PRICE_XPATHS)
+            result['price'] = normalize_price(price)
 
         # 8. 별점 추출 (두 가지 케이스)
-        starpoint_xpath_case1 = "//*[@id='__next']/div[1]/div[1]/div/div[4]/div"
-        starpoint_xpath_case2 = "//*[@id='__next']/div[1]/div[1]/div/div[5]/div"
-        starpoint_xpath_relative = "//div[contains(@class, 'rating') or contains(@class, 'star') or contains(@class, 'review')]//div[contains(text(), '.') or contains(text(), '점')]"
-
-        starpoint = extract_by_xpath_with_fallback(
-            driver,
-            [starpoint_xpath_case1, starpoint_xpath_case2, starpoint_xpath_relative]
-        )
-        # 별점이 "-"이거나 없으면 None, 있으면 float로 변환 시도
-        if not starpoint or starpoint == "-":
-            result['star_point'] = None
-        else:
-            try:
-                # 숫자 문자열인 경우 float로 변환
-                result['star_point'] = float(starpoint)
-            except (ValueError, TypeError):
-                result['star_point'] = None
+        if 'star_point' not in result:
+            starpoint = extract_by_xpath_with_fallback(driver, STARPOINT_XPATHS)
+            result['star_point'] = parse_starpoint(starpoint)
 
         # 9. AI 리뷰
         result['AI_review'] = None
 
+        # 카테고리 분류 결과 합류
+        if category_future is not None:
+            result['category'] = join_classify_category(category_future, result['product_name'])
+
         return result
 
     except Exception as e:
@@ -226,5 +357,4 @@ def crawl_product_details(url):
         return {"shoppingmall_name": "지그재그", "product_url": fallback_url, "product_num": product_num, "category": "-", "product_img_url": "-", "product_name": "-", "brand_name": "-", "price": "-", "star_point": None, "AI_review": None}
 
     finally:
-        driver.quit()
-
+        release_driver(driver)
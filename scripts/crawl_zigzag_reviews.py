@@ -8,31 +8,15 @@
 import random
 import time
 import re
-from typing import List, Dict, Optional
-from selenium import webdriver
+from typing import Callable, List, Dict, Optional
+from driver_pool import acquire_driver, release_driver
+from review_watermark import KnownReviewTracker
+from page_ready import wait_for_page_ready
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import StaleElementReferenceException, NoSuchElementException
 
-def setup_driver():
-    """Chrome WebDriver 설정 (봇 감지 우회 및 최적화)"""
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
-    
-    driver = webdriver.Chrome(options=options)
-    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-        'source': 'Object.defineProperty(navigator, "webdriver", {get: () => undefined})'
-    })
-    return driver
-
 def normalize_date(date_str: str) -> str:
     """날짜 형식 통일 (25.10.12 -> 2025.10.12)"""
     if not date_str: return ""
@@ -52,12 +36,86 @@ def parse_height_weight(text: str) -> tuple:
     if wm: w = int(wm.group(1))
     return h, w
 
-def crawl_zigzag_reviews(product_url: str, max_reviews: int = 20) -> List[Dict]:
-    """지그재그 리뷰 수집 (통일 형식)"""
-    driver = setup_driver()
+# 수집하지 않은 리뷰 카드들을 한 번에 JSON으로 추출 (arguments[0]: 이미 수집한 리뷰 id 목록)
+EXTRACT_NEW_REVIEWS_JS = """
+    const seen = new Set(arguments[0]);
+    const text = el => el ? el.textContent.trim() : "";
+    const reviews = [];
+    document.querySelectorAll("div[data-review-feed-index]").forEach(item => {
+        const id = item.getAttribute("data-review-feed-index");
+        if (!id || seen.has(id)) return;
+
+        // 내용 (더보기 버튼 텍스트 제거)
+        const contentEl = item.querySelector("span.zds4_s96ru81z");
+        if (!contentEl) return;
+        const clone = contentEl.cloneNode(true);
+        const moreBtn = clone.querySelector("p.zds4_s96ru82b");
+        if (moreBtn) moreBtn.remove();
+
+        // 옵션/체형 정보 섹션
+        const sections = [];
+        item.querySelectorAll("div.css-1y13n9").forEach(sec => {
+            const label = sec.querySelector("div.zds4_s96ru82b[style*='quaternary']");
+            const value = sec.querySelector("div.zds4_s96ru82b[style*='tertiary']");
+            if (label && value) sections.push({label: text(label), value: text(value)});
+        });
+
+        reviews.push({
+            id: id,
+            content: clone.textContent.trim(),
+            stars: item.querySelectorAll("svg[data-zds-icon='IconStarSolid']").length,
+            date: text(item.querySelector("p.zds4_s96ru82j")),
+            images: Array.from(item.querySelectorAll("img[src*='zigzag.kr']")).map(img => img.getAttribute("src")),
+            sections: sections
+        });
+    });
+    return reviews;
+"""
+
+SCROLL_TO_LAST_REVIEW_JS = """
+    const items = document.querySelectorAll("div[data-review-feed-index]");
+    if (items.length) items[items.length - 1].scrollIntoView({block: 'center'});
+    else window.scrollBy(0, 1000);
+"""
+
+def _normalize_review(raw: dict) -> Optional[Dict]:
+    """스크립트가 반환한 리뷰 JSON을 통일 형식으로 변환"""
+    try:
+        opt_text, h, w = "", None, None
+        for sec in raw.get('sections') or []:
+            if "옵션" in sec['label']:
+                opt_text = sec['value'].replace('\n', ' ')
+            elif "정보" in sec['label']:
+                h, w = parse_height_weight(sec['value'])
+
+        return {
+            'rating': raw.get('stars') or 5,
+            'content': raw['content'],
+            'review_date': normalize_date(raw.get('date') or ""),
+            'images': raw.get('images') or [],
+            'user_height': h,
+            'user_weight': w,
+            'option_text': opt_text
+        }
+    except (KeyError, TypeError):
+        return None
+
+def crawl_zigzag_reviews(product_url: str, max_reviews: int = 20,
+                         is_known: Optional[Callable[[Dict], bool]] = None,
+                         on_review: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+    """
+    지그재그 리뷰 수집 (통일 형식)
+    is_known이 있으면 이미 저장된 리뷰는 건너뜀
+    (리뷰 탭 정렬을 URL로 지정할 수 없어 중간에 멈추지는 않고 걸러내기만 함,
+     다만 지금까지 본 리뷰가 전부 저장된 것이고 스크롤해도 새 카드가 없으면 바로 종료)
+    on_review가 있으면 리뷰를 모을 때마다 넘김 (False를 반환하면 중단)
+    """
+    driver = acquire_driver('zigzag_review')
+    tracker = KnownReviewTracker(is_known, stop_streak=None)
     # 리뷰 탭으로 강제 이동
     review_url = f"{product_url}?tab=review" if '?' not in product_url else f"{product_url}&tab=review"
     collected_reviews = {} # 중복 방지용
+    known_ids = []  # 이미 저장된 리뷰 카드 (다시 추출하지 않도록)
     
     try:
         print(f"[정보] 지그재그 상품 리뷰 수집 시작: {review_url}")
@@ -66,7 +124,7 @@ def crawl_zigzag_reviews(product_url: str, max_reviews: int = 20) -> List[Dict]:
             WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-review-feed-index]")))
         except: pass
         
-        time.sleep(2.0)
+        wait_for_page_ready(driver, 'zigzag_review')
 
         scroll_attempts = 0
         no_new_review_count = 0
@@ -83,69 +141,28 @@ def crawl_zigzag_reviews(product_url: str, max_reviews: int = 20) -> List[Dict]:
             """)
             time.sleep(0.5)
 
-            # 2. 리뷰 아이템 탐색
-            items = driver.find_elements(By.CSS_SELECTOR, "div[data-review-feed-index]")
+            # 2. 아직 수집하지 않은 리뷰를 한 번의 스크립트 호출로 일괄 추출
+            batch = driver.execute_script(EXTRACT_NEW_REVIEWS_JS, list(collected_reviews.keys()) + known_ids) or []
             new_found_this_round = 0
 
-            for item in items:
-                try:
-                    review_id = item.get_dom_attribute("data-review-feed-index")
-                    if not review_id or review_id in collected_reviews:
-                        continue
-
-                    # 내용 추출
-                    content_element = item.find_element(By.CSS_SELECTOR, "span.zds4_s96ru81z")
-                    full_content = driver.execute_script("""
-                        var el = arguments[0];
-                        var clone = el.cloneNode(true);
-                        var moreBtn = clone.querySelector("p.zds4_s96ru82b");
-                        if(moreBtn) moreBtn.remove();
-                        return clone.textContent.trim();
-                    """, content_element)
-
-                    # 별점
-                    try:
-                        stars = item.find_elements(By.CSS_SELECTOR, "svg[data-zds-icon='IconStarSolid']")
-                        rating = len(stars) if stars else 5
-                    except: rating = 5
-                    
-                    # 날짜
-                    try:
-                        date_raw = item.find_element(By.CSS_SELECTOR, "p.zds4_s96ru82j").get_attribute('textContent').strip()
-                        review_date = normalize_date(date_raw)
-                    except: review_date = ""
-
-                    # 이미지
-                    images = [img.get_dom_attribute("src") for img in item.find_elements(By.CSS_SELECTOR, "img[src*='zigzag.kr']")]
-
-                    # 옵션/체형 정보
-                    opt_text, h, w = "", None, None
-                    sections = item.find_elements(By.CSS_SELECTOR, "div.css-1y13n9")
-                    for sec in sections:
-                        try:
-                            label = sec.find_element(By.CSS_SELECTOR, "div.zds4_s96ru82b[style*='quaternary']").get_attribute('textContent').strip()
-                            value = sec.find_element(By.CSS_SELECTOR, "div.zds4_s96ru82b[style*='tertiary']").get_attribute('textContent').strip()
-                            
-                            if "옵션" in label:
-                                opt_text = value.replace('\n', ' ')
-                            elif "정보" in label:
-                                h, w = parse_height_weight(value)
-                        except: continue
-
-                    collected_reviews[review_id] = {
-                        'rating': rating,
-                        'content': full_content,
-                        'review_date': review_date,
-                        'images': images,
-                        'user_height': h,
-                        'user_weight': w,
-                        'option_text': opt_text
-                    }
-                    new_found_this_round += 1
-                    if len(collected_reviews) >= max_reviews: break
-                except: continue
+            for raw in batch:
+                review = _normalize_review(raw)
+                if review is None:
+                    continue
+                if tracker.check(review):
+                    known_ids.append(raw['id'])
+                    continue
+                collected_reviews[raw['id']] = review
+                new_found_this_round += 1
+                if on_review is not None and not on_review(review):
+                    return list(collected_reviews.values())[:max_reviews]
+                if len(collected_reviews) >= max_reviews: break
 
             print(f"   -> 지그재그 현재 {len(collected_reviews)}개 확보 중... (신규: {new_found_this_round})")
+            if not batch and tracker.all_known:
+                # 전부 저장된 상품: 새 카드가 더 나오지 않으면 빈 스크롤을 반복하지 않음
+                print("[정보] 모든 리뷰가 이미 저장됨, 수집 종료")
+                break
 
             # 조기 종료 로직
             current_count = len(collected_reviews)
@@ -164,15 +181,12 @@ def crawl_zigzag_reviews(product_url: str, max_reviews: int = 20) -> List[Dict]:
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                 time.sleep(1.5)
             else:
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", items[-1])
-                    time.sleep(0.8)
-                except:
-                    driver.execute_script("window.scrollBy(0, 1000);")
+                driver.execute_script(SCROLL_TO_LAST_REVIEW_JS)
+                time.sleep(0.8)
 
             scroll_attempts += 1
 
         return list(collected_reviews.values())[:max_reviews]
 
     finally:
-        driver.quit()
\ No newline at end of file
+        release_driver(driver)
\ No newline at end of file
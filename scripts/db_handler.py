@@ -7,12 +7,98 @@
 
 import pymysql
 import os
+import time
+import asyncio
+import threading
+import functools
+import hashlib
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 import json
 
 
+# 커넥션 풀 설정 (환경변수로 조정 가능)
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))              # 시작 시 미리 열어둘 커넥션 수
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '5'))              # 동시에 열 수 있는 최대 커넥션 수
+DB_POOL_IDLE_RECYCLE = float(os.getenv('DB_POOL_IDLE_RECYCLE', '300'))  # 이 시간(초) 이상 놀던 커넥션은 새로 연결
+DB_POOL_PING_AFTER = float(os.getenv('DB_POOL_PING_AFTER', '30'))       # 이 시간(초) 이상 놀던 커넥션은 ping으로 확인 후 사용
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', '30'))
+
+
+# 리뷰 INSERT 한 번에 넣을 최대 행 수 (max_allowed_packet 고려)
+REVIEW_INSERT_CHUNK_SIZE = int(os.getenv('REVIEW_INSERT_CHUNK_SIZE', '200'))
+REVIEW_HASH_BACKFILL_BATCH = int(os.getenv('REVIEW_HASH_BACKFILL_BATCH', '1000'))
+
+REVIEW_HASH_INDEX = 'uk_review_product_hash'
+
+# 증분 크롤링 시 불러올 최근 리뷰 해시 수 (이보다 오래된 리뷰는 작성일로 판단)
+REVIEW_WATERMARK_HASH_LIMIT = int(os.getenv('REVIEW_WATERMARK_HASH_LIMIT', '1000'))
+
+# 스트리밍 저장 시 한 번에 DB에 쓰는 리뷰 수
+REVIEW_STREAM_CHUNK_SIZE = int(os.getenv('REVIEW_STREAM_CHUNK_SIZE', '50'))
+
+# 상품별 리뷰 수집 기준점 (마지막으로 본 리뷰 총 개수 / 가장 최근 작성일 / 마지막 크롤링 결과)
+REVIEW_WATERMARK_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS review_crawl_watermark (
+        product_id BIGINT NOT NULL PRIMARY KEY,
+        review_total INT NULL,
+        latest_review_date VARCHAR(20) NULL,
+        last_crawl_status VARCHAR(20) NULL,
+        last_review_count INT NULL,
+        last_crawled_at DATETIME NULL,
+        last_checked_at DATETIME NULL
+    )
+"""
+
+REVIEW_WATERMARK_UPSERT_SQL = """
+    INSERT INTO review_crawl_watermark (
+        product_id, review_total, latest_review_date, last_crawl_status, last_review_count,
+        last_crawled_at, last_checked_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        review_total = COALESCE(VALUES(review_total), review_total),
+        latest_review_date = GREATEST(COALESCE(latest_review_date, ''), COALESCE(VALUES(latest_review_date), '')),
+        last_crawl_status = VALUES(last_crawl_status),
+        last_review_count = VALUES(last_review_count),
+        last_crawled_at = VALUES(last_crawled_at),
+        last_checked_at = VALUES(last_checked_at)
+"""
+
+# (product_id, review_hash) 유니크 인덱스로 같은 리뷰는 한 행만 유지
+# 이미 있는 리뷰는 바뀐 값이 있을 때만 UPDATE (updated_at을 먼저 비교해야 하므로 맨 앞에 둠)
+# 변경 없는 행은 affected rows가 0이라 재크롤링해도 쓰기가 거의 없음
+REVIEW_UPSERT_SQL = """
+    INSERT INTO review (
+        product_id,
+        rating,
+        content,
+        review_date,
+        images,
+        user_height,
+        user_weight,
+        option_text,
+        review_hash,
+        created_at,
+        updated_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        updated_at = IF(
+            rating <=> VALUES(rating)
+            AND images <=> VALUES(images)
+            AND user_height <=> VALUES(user_height)
+            AND user_weight <=> VALUES(user_weight),
+            updated_at, VALUES(updated_at)
+        ),
+        rating = VALUES(rating),
+        images = VALUES(images),
+        user_height = VALUES(user_height),
+        user_weight = VALUES(user_weight)
+"""
+
+
 def get_db_connection():
     """
     MySQL DB 연결 생성
@@ -61,6 +147,291 @@ def get_db_connection():
     return connection
 
 
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """
+    PyMySQL 커넥션 풀 (작업마다 TCP/TLS/인증 핸드셰이크를 다시 하지 않도록)
+
+    - 대여 시 일정 시간 이상 놀던 커넥션은 ping으로 확인, 죽었으면 새로 연결
+    - idle_recycle 이상 놀던 커넥션은 서버 쪽 wait_timeout 전에 닫고 새로 연결
+    - max_size까지 열고 그 이상이면 반납될 때까지 대기
+    """
+
+    def __init__(self, min_size: int = DB_POOL_MIN_SIZE, max_size: int = DB_POOL_MAX_SIZE,
+                 idle_recycle: float = DB_POOL_IDLE_RECYCLE, ping_after: float = DB_POOL_PING_AFTER,
+                 acquire_timeout: float = DB_POOL_ACQUIRE_TIMEOUT):
+        self.min_size = min_size
+        self.max_size = max(min_size, max_size)
+        self.idle_recycle = idle_recycle
+        self.ping_after = ping_after
+        self.acquire_timeout = acquire_timeout
+        self._idle = []  # (마지막 반납 시각, 커넥션)
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def start(self):
+        """min_size 개수만큼 미리 연결 (실패해도 대여 시점에 다시 시도)"""
+        for _ in range(self.min_size):
+            try:
+                connection = get_db_connection()
+            except Exception as e:
+                print(f"[WARN] DB 커넥션 미리 열기 실패: {e}")
+                break
+            with self._cond:
+                self._total += 1
+                self._idle.append((time.monotonic(), connection))
+        print(f"[INFO] DB 커넥션 풀 준비 완료: {len(self._idle)}/{self.max_size}개")
+
+    def _is_usable(self, connection, idle_for: float) -> bool:
+        if idle_for >= self.idle_recycle:
+            return False
+        if idle_for < self.ping_after:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("DB 커넥션 풀이 종료되었습니다.")
+                    if self._idle:
+                        released_at, connection = self._idle.pop()
+                        break
+                    if self._total < self.max_size:
+                        self._total += 1
+                        connection = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("사용 가능한 DB 커넥션이 없습니다. (대여 대기 시간 초과)")
+                    self._cond.wait(remaining)
+
+            if connection is None:
+                try:
+                    return get_db_connection()
+                except Exception:
+                    self._forget()
+                    raise
+
+            if self._is_usable(connection, time.monotonic() - released_at):
+                return connection
+            # 오래됐거나 끊긴 커넥션은 닫고 다시 빌림
+            _close_quietly(connection)
+            self._forget()
+
+    def release(self, connection, discard: bool = False):
+        if not discard:
+            try:
+                # 커밋하지 않은 트랜잭션이 다음 사용자에게 넘어가지 않도록
+                connection.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            if discard or self._closed:
+                self._total -= 1
+                self._cond.notify()
+            else:
+                self._idle.append((time.monotonic(), connection))
+                self._cond.notify()
+                return
+        _close_quietly(connection)
+
+    def _forget(self):
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for _, connection in idle:
+            _close_quietly(connection)
+        print("[INFO] DB 커넥션 풀 종료")
+
+
+_pool: Optional[ConnectionPool] = None
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+
+def init_db_pool(**kwargs) -> ConnectionPool:
+    """FastAPI lifespan에서 호출: 커넥션 풀과 DB 전용 스레드 풀 생성"""
+    global _pool, _db_executor
+    if _pool is None:
+        _pool = ConnectionPool(**kwargs)
+        _pool.start()
+        # DB 작업 전용 스레드 (크롤링용 기본 스레드 풀과 분리, 풀 크기만큼만 동시 실행)
+        _db_executor = ThreadPoolExecutor(max_workers=_pool.max_size, thread_name_prefix='db')
+    return _pool
+
+
+def close_db_pool():
+    global _pool, _db_executor
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=True)
+        _db_executor = None
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+@contextmanager
+def db_connection():
+    """
+    커넥션 대여 컨텍스트 (풀이 없으면 1회용 커넥션을 열고 닫음)
+    예외가 나면 커넥션을 폐기해서 상태가 꼬인 커넥션이 재사용되지 않도록 함
+    """
+    if _pool is None:
+        connection = get_db_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+        return
+
+    connection = _pool.acquire()
+    try:
+        yield connection
+    except Exception:
+        _pool.release(connection, discard=True)
+        raise
+    else:
+        _pool.release(connection)
+
+
+async def run_db(fn, *args, **kwargs):
+    """
+    블로킹 DB 함수를 DB 전용 스레드에서 실행 (이벤트 루프를 막지 않음)
+    풀이 없으면 기본 스레드 풀 사용
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(fn, *args, **kwargs))
+
+
+def update_review_crawl_status(product_id: int, status: str):
+    """product.review_crawl_status 업데이트 (PROCESSING / COMPLETED / PARTIAL / FAILED)"""
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE product SET review_crawl_status=%s WHERE product_id=%s",
+                (status, product_id)
+            )
+        connection.commit()
+
+
+class ReviewStreamWriter:
+    """
+    수집기가 on_review로 넘기는 리뷰를 chunk 단위로 바로 DB에 저장
+    (수집과 저장이 겹쳐서 진행되고, 타임아웃으로 중단돼도 이미 넘어온 리뷰는 남음)
+
+    - add(): 수집 스레드에서 호출, chunk가 차면 DB 전용 스레드에 저장을 맡기고 바로 반환
+    - close(): 더 받지 않음 (이후 add()는 False를 반환해 수집기가 멈춤)
+    - finish(): 남은 리뷰 저장 + 기준점/상태 갱신을 한 트랜잭션으로 (블로킹, DB 전용 스레드 밖에서 호출)
+    """
+
+    def __init__(self, product_id: int, chunk_size: int = REVIEW_STREAM_CHUNK_SIZE):
+        self.product_id = product_id
+        self.chunk_size = chunk_size
+        self.received = 0
+        self.saved = 0
+        self._buffer = []
+        self._pending = []
+        self._latest_date = ''
+        self._closed = False
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # 같은 상품의 chunk는 순서대로 하나씩 저장
+
+    def add(self, review: dict) -> bool:
+        with self._lock:
+            if self._closed:
+                return False
+            self._buffer.append(review)
+            self.received += 1
+            self._latest_date = max(self._latest_date, review.get('review_date') or '')
+            if len(self._buffer) >= self.chunk_size:
+                chunk, self._buffer = self._buffer, []
+                # close() 이후에는 제출되지 않도록 락 안에서 제출
+                if _db_executor is not None:
+                    self._pending.append(_db_executor.submit(self._write_chunk, chunk))
+                else:
+                    self._write_chunk(chunk)
+        return True
+
+    def _write_chunk(self, chunk: List[dict]):
+        with self._write_lock:
+            with db_connection() as connection:
+                with connection.cursor() as cursor:
+                    upsert_reviews(cursor, self.product_id, chunk)
+                connection.commit()
+            self.saved += len(chunk)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+
+    def finish(self, status: str = 'COMPLETED', review_total: Optional[int] = None) -> int:
+        """
+        Args:
+            status: COMPLETED / PARTIAL
+            review_total: 다음 크롤링 변경 확인용 리뷰 총 개수 (PARTIAL이면 저장하지 않음)
+
+        Returns:
+            이번 크롤링에서 저장한 리뷰 수
+        """
+        self.close()
+        with self._lock:
+            pending, self._pending = self._pending, []
+            remaining, self._buffer = self._buffer, []
+        # 먼저 제출된 chunk 저장이 끝날 때까지 대기 (실패하면 예외 전달)
+        for future in pending:
+            future.result()
+
+        with self._write_lock:
+            with db_connection() as connection:
+                with connection.cursor() as cursor:
+                    upsert_reviews(cursor, self.product_id, remaining)
+                    review_count = self.saved + len(remaining)
+                    _save_review_watermark(cursor, self.product_id, self._latest_date or None,
+                                           review_total if status == 'COMPLETED' else None, status, review_count)
+                    cursor.execute(
+                        "UPDATE product SET review_crawl_status=%s WHERE product_id=%s",
+                        (status, self.product_id)
+                    )
+                connection.commit()
+            self.saved = review_count
+        return review_count
+
+
+def complete_unchanged_review_crawl(product_id: int):
+    """리뷰 수가 그대로라 크롤링을 건너뛴 경우: 확인 시각만 남기고 COMPLETED"""
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE review_crawl_watermark SET last_checked_at=%s WHERE product_id=%s",
+                (datetime.now(), product_id)
+            )
+            cursor.execute(
+                "UPDATE product SET review_crawl_status='COMPLETED' WHERE product_id=%s",
+                (product_id,)
+            )
+        connection.commit()
+
+
 def save_reviews_only(product_id: int, reviews_data: List[dict]) -> dict:
     """
     리뷰 데이터만 DB에 저장 (통일된 형식)
@@ -86,50 +457,12 @@ def save_reviews_only(product_id: int, reviews_data: List[dict]) -> dict:
             "review_count": int
         }
     """
-    connection = get_db_connection()
-    
-    try:
-        with connection.cursor() as cursor:
-            review_count = 0
-            
-            if reviews_data:
-                # Review 테이블 INSERT (통일된 7개 필드)
-                review_sql = """
-                    INSERT INTO review (
-                        product_id,
-                        rating,
-                        content,
-                        review_date,
-                        images,
-                        user_height,
-                        user_weight,
-                        option_text,
-                        created_at,
-                        updated_at
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                
-                for review in reviews_data:
-                    # images는 List[str]를 JSON 문자열로 변환
-                    images_json = json.dumps(review.get('images', []), ensure_ascii=False)
-                    
-                    review_values = (
-                        product_id,
-                        review.get('rating', 5),
-                        review.get('content', ''),
-                        review.get('review_date', ''),
-                        images_json,
-                        review.get('user_height'),  # None 허용
-                        review.get('user_weight'),  # None 허용
-                        review.get('option_text'),  # None 허용
-                        datetime.now(),
-                        datetime.now()
-                    )
-                    
-                    cursor.execute(review_sql, review_values)
-                    review_count += 1
-                
-                print(f"✅ Review 저장 완료: {review_count}개")
+    with db_connection() as connection:
+        try:
+            with connection.cursor() as cursor:
+                review_count = upsert_reviews(cursor, product_id, reviews_data)
+                if review_count:
+                    print(f"✅ Review 저장 완료: {review_count}개")
             
             # 커밋
             connection.commit()
@@ -140,13 +473,263 @@ def save_reviews_only(product_id: int, reviews_data: List[dict]) -> dict:
                 "review_count": review_count
             }
             
-    except Exception as e:
-        connection.rollback()
-        print(f"❌ DB 저장 실패: {str(e)}")
-        raise
-        
-    finally:
-        connection.close()
+        except Exception as e:
+            connection.rollback()
+            print(f"❌ DB 저장 실패: {str(e)}")
+            raise
+
+
+def _normalize_review_date(review_date) -> str:
+    """'2025.01.22' / '2025-01-22' / date 객체 모두 '20250122'로 (컬럼 타입과 무관하게 같은 해시)"""
+    if hasattr(review_date, 'strftime'):
+        return review_date.strftime('%Y%m%d')
+    return ''.join(ch for ch in str(review_date or '') if ch.isdigit())
+
+
+def review_hash(product_id: int, content: str, review_date, option_text: str) -> str:
+    """리뷰 중복 판별용 해시 (product_id, 본문, 작성일, 옵션)"""
+    key = '\x1f'.join((
+        str(product_id),
+        (content or '').strip(),
+        _normalize_review_date(review_date),
+        (option_text or '').strip(),
+    ))
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def build_review_rows(product_id: int, reviews_data: List[dict], now: Optional[datetime] = None) -> List[tuple]:
+    """
+    통일된 리뷰 dict 목록을 REVIEW_UPSERT_SQL 파라미터 튜플로 변환
+    created_at/updated_at은 배치 전체에 같은 시각 사용
+    같은 해시의 리뷰가 한 배치에 여러 번 있으면 마지막 것만 사용
+    """
+    now = now or datetime.now()
+    rows = {}
+    for review in reviews_data:
+        content = review.get('content', '')
+        review_date = review.get('review_date', '')
+        option_text = review.get('option_text', '')
+        digest = review_hash(product_id, content, review_date, option_text)
+        rows[digest] = (
+            product_id,
+            review.get('rating', 5),
+            content,
+            review_date,
+            # images는 List[str]를 JSON 문자열로 변환
+            json.dumps(review.get('images', []), ensure_ascii=False),
+            review.get('user_height'),  # None 허용
+            review.get('user_weight'),  # None 허용
+            option_text,
+            digest,
+            now,
+            now
+        )
+    return list(rows.values())
+
+
+def upsert_reviews(cursor, product_id: int, reviews_data: List[dict],
+                   chunk_size: int = REVIEW_INSERT_CHUNK_SIZE) -> int:
+    """
+    리뷰를 chunk_size 단위 multi-row INSERT ... ON DUPLICATE KEY UPDATE로 저장 (커밋은 호출한 쪽에서)
+    PyMySQL executemany는 VALUES가 플레이스홀더로만 되어 있으면
+    여러 행을 INSERT ... VALUES (...), (...) 한 문장으로 묶어서 보냄
+
+    Returns:
+        저장 대상 리뷰 수 (중복 제거 후, 변경 없이 건너뛴 행 포함)
+    """
+    rows = build_review_rows(product_id, reviews_data)
+    affected = 0
+    for start in range(0, len(rows), chunk_size):
+        affected += cursor.executemany(REVIEW_UPSERT_SQL, rows[start:start + chunk_size]) or 0
+    if rows:
+        # affected rows: 새 행 1, 변경된 행 2, 변경 없는 행 0
+        print(f"[INFO] 리뷰 upsert: {len(rows)}개 (affected rows {affected})")
+    return len(rows)
+
+
+class ReviewWatermark:
+    """상품별 리뷰 수집 기준점 (증분 크롤링에서 이미 저장된 리뷰 판별)"""
+
+    def __init__(self, product_id: int, review_total: Optional[int],
+                 latest_review_date: Optional[str], hashes: set, oldest_hashed_date: str = '',
+                 last_crawl_status: Optional[str] = None):
+        self.product_id = product_id
+        self.review_total = review_total
+        self.latest_review_date = latest_review_date
+        self.hashes = hashes
+        self.last_crawl_status = last_crawl_status
+        # 해시를 불러온 리뷰 중 가장 오래된 작성일 (이보다 오래된 리뷰는 해시 없이도 이미 저장된 것으로 봄)
+        self._older_than = _normalize_review_date(oldest_hashed_date)
+
+    @property
+    def has_reviews(self) -> bool:
+        return bool(self.hashes)
+
+    @property
+    def stored_count(self) -> int:
+        """저장된 리뷰 수 (해시를 불러온 개수라 hash_limit을 넘으면 적게 셈 - 적게 세면 다시 수집할 뿐)"""
+        return len(self.hashes)
+
+    @property
+    def resume_partial(self) -> bool:
+        """지난 크롤링이 PARTIAL이면 저장된 최신 리뷰 뒤쪽이 비어 있으므로 멈추지 않고 이어서 수집"""
+        return self.last_crawl_status == 'PARTIAL'
+
+    def is_known(self, review: dict) -> bool:
+        digest = review_hash(self.product_id, review.get('content', ''),
+                             review.get('review_date', ''), review.get('option_text', ''))
+        if digest in self.hashes:
+            return True
+        if self.resume_partial:
+            return False
+        review_date = _normalize_review_date(review.get('review_date', ''))
+        return bool(review_date and self._older_than and review_date < self._older_than)
+
+
+def load_review_watermark(product_id: int, hash_limit: int = REVIEW_WATERMARK_HASH_LIMIT) -> ReviewWatermark:
+    """저장된 리뷰 총 개수, 가장 최근 작성일, 최근 리뷰 해시 조회"""
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT review_total, latest_review_date, last_crawl_status "
+                "FROM review_crawl_watermark WHERE product_id = %s",
+                (product_id,)
+            )
+            mark = cursor.fetchone() or {}
+            cursor.execute(
+                "SELECT review_hash, review_date FROM review "
+                "WHERE product_id = %s AND review_hash IS NOT NULL "
+                "ORDER BY review_date DESC LIMIT %s",
+                (product_id, hash_limit)
+            )
+            rows = cursor.fetchall()
+
+    latest = mark.get('latest_review_date') or (str(rows[0]['review_date']) if rows else None)
+    # 해시를 전부 불러왔으면 날짜 기준 판별은 필요 없음
+    oldest = rows[-1]['review_date'] if len(rows) >= hash_limit else ''
+    return ReviewWatermark(product_id, mark.get('review_total'), latest,
+                           {row['review_hash'] for row in rows}, oldest, mark.get('last_crawl_status'))
+
+
+def _save_review_watermark(cursor, product_id: int, latest_review_date: Optional[str],
+                           review_total: Optional[int], status: str, review_count: int):
+    now = datetime.now()
+    cursor.execute(REVIEW_WATERMARK_UPSERT_SQL,
+                   (product_id, review_total, latest_review_date, status, review_count, now, now))
+
+
+def _review_primary_key(cursor) -> str:
+    cursor.execute("SHOW KEYS FROM review WHERE Key_name = 'PRIMARY'")
+    row = cursor.fetchone()
+    return row['Column_name'] if row else 'review_id'
+
+
+def _backfill_review_hashes(connection, pk: str) -> int:
+    """review_hash가 없는 기존 리뷰에 해시 채우기 (pk 순서로 배치 처리)"""
+    filled = 0
+    last_id = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT `{pk}` AS pk, product_id, content, review_date, option_text FROM review "
+                f"WHERE review_hash IS NULL AND `{pk}` > %s ORDER BY `{pk}` LIMIT %s",
+                (last_id, REVIEW_HASH_BACKFILL_BATCH)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return filled
+            cursor.executemany(
+                f"UPDATE review SET review_hash = %s WHERE `{pk}` = %s",
+                [(review_hash(row['product_id'], row['content'], row['review_date'], row['option_text']), row['pk'])
+                 for row in rows]
+            )
+        connection.commit()
+        filled += len(rows)
+        last_id = rows[-1]['pk']
+
+
+REVIEW_SCHEMA_LOCK = 'everywear_review_schema'
+
+
+def _review_schema_state(cursor) -> Tuple[bool, bool]:
+    """(review_hash 컬럼 있음, 유니크 인덱스 있음) - information_schema 조회만 함"""
+    cursor.execute(
+        "SELECT COUNT(*) AS count FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'review' AND COLUMN_NAME = 'review_hash'"
+    )
+    has_column = cursor.fetchone()['count'] > 0
+    cursor.execute(
+        "SELECT COUNT(*) AS count FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'review' AND INDEX_NAME = %s",
+        (REVIEW_HASH_INDEX,)
+    )
+    has_index = cursor.fetchone()['count'] > 0
+    return has_column, has_index
+
+
+def check_review_schema() -> bool:
+    """
+    서버 시작 시 호출: 가벼운 확인만 (ALTER/백필은 scripts/migrate_review_schema.py에서)
+    review_crawl_watermark 테이블은 없을 때만 생성
+
+    Returns:
+        review_hash 컬럼과 유니크 인덱스가 모두 준비되어 있는지
+    """
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(REVIEW_WATERMARK_TABLE_SQL)
+            has_column, has_index = _review_schema_state(cursor)
+        connection.commit()
+    return has_column and has_index
+
+
+def migrate_review_schema(lock_timeout: int = 10) -> bool:
+    """
+    review_hash 컬럼과 (product_id, review_hash) 유니크 인덱스 준비 (1회성 마이그레이션)
+    기존 리뷰는 해시가 없는 행만 채우고, 이미 중복 저장된 행은 가장 오래된 것만 해시를 남김
+    (중복 행은 삭제하지 않고 review_hash NULL로 둠)
+    여러 곳에서 동시에 실행해도 GET_LOCK으로 한 번에 하나만 진행, 이미 끝났으면 바로 반환
+
+    Returns:
+        실행 여부 (다른 세션이 잠금을 잡고 있어 건너뛰면 False)
+    """
+    with db_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (REVIEW_SCHEMA_LOCK, lock_timeout))
+            if cursor.fetchone()['locked'] != 1:
+                print("[WARN] review 스키마 마이그레이션이 다른 곳에서 진행 중이라 건너뜀")
+                return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(REVIEW_WATERMARK_TABLE_SQL)
+                has_column, has_index = _review_schema_state(cursor)
+                # 인덱스까지 있으면 완료된 상태 (남은 NULL은 일부러 비워둔 중복 행이라 다시 채우지 않음)
+                if has_index:
+                    print("[INFO] review 스키마 이미 준비됨")
+                    return True
+                if not has_column:
+                    cursor.execute("ALTER TABLE review ADD COLUMN review_hash CHAR(64) NULL")
+                    print("[INFO] review.review_hash 컬럼 추가")
+                pk = _review_primary_key(cursor)
+            connection.commit()
+
+            # 중간에 끊겼다 다시 실행해도 review_hash IS NULL인 행만 이어서 채움
+            filled = _backfill_review_hashes(connection, pk)
+            with connection.cursor() as cursor:
+                duplicates = cursor.execute(
+                    f"UPDATE review r JOIN ("
+                    f"    SELECT product_id, review_hash, MIN(`{pk}`) AS keep_id FROM review "
+                    f"    WHERE review_hash IS NOT NULL GROUP BY product_id, review_hash HAVING COUNT(*) > 1"
+                    f") d ON r.product_id = d.product_id AND r.review_hash = d.review_hash AND r.`{pk}` <> d.keep_id "
+                    f"SET r.review_hash = NULL"
+                )
+                connection.commit()
+                cursor.execute(f"ALTER TABLE review ADD UNIQUE INDEX {REVIEW_HASH_INDEX} (product_id, review_hash)")
+            print(f"[INFO] review 유니크 인덱스 생성 완료 (해시 채움 {filled}개, 기존 중복 {duplicates}개)")
+            return True
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (REVIEW_SCHEMA_LOCK,))
 
 
 def check_reviews_exist(product_id: int) -> bool:
@@ -159,15 +742,11 @@ def check_reviews_exist(product_id: int) -> bool:
     Returns:
         True: 리뷰 있음, False: 리뷰 없음
     """
-    connection = get_db_connection()
-    
-    try:
+    with db_connection() as connection:
         with connection.cursor() as cursor:
-            sql = "SELECT COUNT(*) as count FROM review WHERE product_id = %s"
+            # (product_id, review_hash) 인덱스로 첫 행만 확인
+            sql = "SELECT EXISTS(SELECT 1 FROM review WHERE product_id = %s LIMIT 1) AS found"
             cursor.execute(sql, (product_id,))
             result = cursor.fetchone()
-            
-            return result['count'] > 0
-            
-    finally:
-        connection.close()
\ No newline at end of file
+
+            return bool(result['found'])
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+####################################
+### Chrome WebDriver 풀 (공용) ###
+####################################
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+
+UA_WINDOWS_120 = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+UA_WINDOWS_122 = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
+UA_MAC = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+# 크롤링에 필요 없는 리소스 차단 패턴 (CDP Network.setBlockedURLs, * 와일드카드)
+# 필드 추출은 DOM 속성/텍스트만 읽으므로 이미지 파일 자체는 받을 필요가 없음
+# 스타일시트는 레이아웃/표시 여부(innerText, 별점 width)에 영향을 주므로 차단하지 않음
+BLOCK_PATTERNS: Dict[str, List[str]] = {
+    'images': ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.ico', '*.bmp'],
+    'media': ['*.mp4', '*.webm', '*.m3u8', '*.mp3'],
+    'fonts': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'trackers': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+        '*googlesyndication.com*', '*googleadservices.com*', '*connect.facebook.net*',
+        '*facebook.com/tr*', '*criteo.com*', '*criteo.net*', '*analytics.tiktok.com*',
+        '*clarity.ms*', '*hotjar.com*', '*branch.io*', '*appsflyer.com*', '*amplitude.com*',
+        '*braze.com*', '*channel.io*', '*kakaopixel*', '*wcs.naver.net*',
+    ],
+}
+ALL_BLOCK_GROUPS = ('images', 'media', 'fonts', 'trackers')
+
+# 리소스 차단 전체 on/off (문제 발생 시 false로 끄고 확인)
+CRAWL_BLOCK_RESOURCES = os.getenv('CRAWL_BLOCK_RESOURCES', 'true').lower() == 'true'
+
+# 쇼핑몰별 옵션 프로필 (드라이버를 빌려줄 때마다 적용)
+# block: 차단할 리소스 그룹 (BLOCK_PATTERNS의 키)
+DRIVER_PROFILES: Dict[str, dict] = {
+    'default': {'user_agent': UA_WINDOWS_120, 'block': ()},
+    'musinsa': {'user_agent': UA_WINDOWS_120, 'block': ALL_BLOCK_GROUPS},
+    'musinsa_review': {'user_agent': UA_WINDOWS_122, 'block': ALL_BLOCK_GROUPS},
+    'zigzag': {'user_agent': UA_WINDOWS_120, 'block': ALL_BLOCK_GROUPS},
+    'zigzag_review': {'user_agent': UA_WINDOWS_122, 'block': ALL_BLOCK_GROUPS},
+    '29cm': {'user_agent': UA_WINDOWS_120, 'block': ALL_BLOCK_GROUPS},
+    '29cm_review': {'user_agent': UA_MAC, 'block': ALL_BLOCK_GROUPS},
+    'wconcept': {'user_agent': UA_WINDOWS_120, 'block': ALL_BLOCK_GROUPS},
+    'wconcept_review': {'user_agent': UA_MAC, 'block': ALL_BLOCK_GROUPS},
+}
+
+# 풀 설정 (환경변수로 조정 가능)
+DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '2'))            # 미리 띄워둘 브라우저 수
+DRIVER_POOL_MAX_SIZE = int(os.getenv('DRIVER_POOL_MAX_SIZE', '4'))    # 동시에 존재할 수 있는 최대 브라우저 수
+DRIVER_MAX_USES = int(os.getenv('DRIVER_MAX_USES', '30'))             # 이 횟수만큼 쓰면 브라우저 재생성
+DRIVER_LEASE_TIMEOUT = float(os.getenv('DRIVER_LEASE_TIMEOUT', '60')) # 대여 대기 최대 시간(초)
+
+
+# Chrome WebDriver 생성 (모든 크롤러 공통 옵션)
+def create_driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    # DOMContentLoaded에서 driver.get 반환 (이후 대기는 요소 대기/page_ready가 담당)
+    options.page_load_strategy = 'eager'
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument(f"user-agent={DRIVER_PROFILES['default']['user_agent']}")
+    # 페이지 준비 대기(page_ready)가 CDP lifecycle 이벤트를 읽을 수 있도록 performance 로그 활성화
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': False, 'enablePage': True})
+
+    driver = webdriver.Chrome(options=options)
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+        'source': 'Object.defineProperty(navigator, "webdriver", {get: () => undefined})'
+    })
+    driver.execute_cdp_cmd('Page.enable', {})
+    # Network.setBlockedURLs는 Network 도메인이 켜져 있어야 동작
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Page.setLifecycleEventsEnabled', {'enabled': True})
+    return driver
+
+
+def blocked_urls_for(settings: dict) -> List[str]:
+    if not CRAWL_BLOCK_RESOURCES:
+        return []
+    return [pattern for group in settings.get('block', ()) for pattern in BLOCK_PATTERNS[group]]
+
+
+def apply_profile(driver, profile: str):
+    """쇼핑몰별 프로필(User-Agent, 리소스 차단)을 대여 시점에 적용"""
+    settings = DRIVER_PROFILES.get(profile, DRIVER_PROFILES['default'])
+    driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': settings['user_agent']})
+    # 이전 대여자의 차단 목록이 남지 않도록 항상 덮어씀 (빈 목록이면 해제)
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_urls_for(settings)})
+
+
+def reset_driver(driver) -> bool:
+    """
+    반납된 드라이버 상태 초기화 (탭, 쿠키, 스토리지)
+
+    Returns:
+        True: 재사용 가능, False: 브라우저가 죽었거나 초기화 실패
+    """
+    try:
+        handles = driver.window_handles
+        # 크롤링 중 열린 추가 탭 정리
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        # 현재 origin의 스토리지 비우기 (about:blank로 이동하기 전에 해야 함)
+        driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        driver.get('about:blank')
+        # 이전 페이지의 lifecycle 이벤트가 다음 대여자에게 남지 않도록 비움
+        driver.get_log('performance')
+        return True
+    except WebDriverException as e:
+        print(f"[WARN] 드라이버 초기화 실패, 폐기합니다: {e}")
+        return False
+
+
+def _quit_quietly(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPool:
+    """
+    미리 띄워둔 Chrome 인스턴스를 크롤링 함수에 빌려주는 풀
+
+    - start(): size 개수만큼 브라우저를 미리 실행
+    - acquire(): 유휴 브라우저를 빌려줌 (없으면 max_size까지 새로 생성, 그 이상이면 대기)
+    - release(): 상태 초기화 후 반납, max_uses 초과 또는 크래시 시 폐기 후 재생성
+    """
+
+    def __init__(self, size: int = DRIVER_POOL_SIZE, max_size: int = DRIVER_POOL_MAX_SIZE,
+                 max_uses: int = DRIVER_MAX_USES, lease_timeout: float = DRIVER_LEASE_TIMEOUT):
+        self.size = size
+        self.max_size = max(size, max_size)
+        self.max_uses = max_uses
+        self.lease_timeout = lease_timeout
+        self._idle = []
+        self._uses: Dict[int, int] = {}
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def start(self):
+        """size 개수만큼 브라우저 미리 실행"""
+        for _ in range(self.size):
+            self._replenish()
+        print(f"[INFO] 드라이버 풀 준비 완료: {len(self._idle)}/{self.size}개")
+
+    def _replenish(self):
+        """풀에 새 브라우저 하나를 추가 (size 미만일 때만)"""
+        with self._cond:
+            if self._closed or self._total >= self.size:
+                return
+            self._total += 1
+        try:
+            driver = create_driver()
+        except Exception as e:
+            print(f"[ERROR] 드라이버 생성 실패: {e}")
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._uses[id(driver)] = 0
+            self._idle.append(driver)
+            self._cond.notify()
+
+    def acquire(self, profile: str = 'default'):
+        deadline = time.monotonic() + self.lease_timeout
+        driver = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("드라이버 풀이 종료되었습니다.")
+                if self._idle:
+                    driver = self._idle.pop()
+                    break
+                if self._total < self.max_size:
+                    self._total += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("사용 가능한 드라이버가 없습니다. (대여 대기 시간 초과)")
+                self._cond.wait(remaining)
+
+        if driver is None:
+            try:
+                driver = create_driver()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._uses[id(driver)] = 0
+
+        try:
+            apply_profile(driver, profile)
+        except WebDriverException:
+            # 유휴 중에 죽은 브라우저라면 폐기하고 새로 빌림
+            self._discard(driver)
+            return self.acquire(profile)
+        return driver
+
+    def owns(self, driver) -> bool:
+        with self._cond:
+            return id(driver) in self._uses
+
+    def release(self, driver):
+        with self._cond:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+            closed = self._closed
+
+        if closed or uses >= self.max_uses or not reset_driver(driver):
+            self._discard(driver)
+            # 재생성은 백그라운드에서 (크롤링 응답을 지연시키지 않도록)
+            threading.Thread(target=self._replenish, daemon=True).start()
+            return
+
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    def _discard(self, driver):
+        with self._cond:
+            self._uses.pop(id(driver), None)
+            self._total -= 1
+            self._cond.notify()
+        _quit_quietly(driver)
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for driver in idle:
+            with self._cond:
+                self._uses.pop(id(driver), None)
+                self._total -= 1
+            _quit_quietly(driver)
+        print("[INFO] 드라이버 풀 종료")
+
+
+_pool: Optional[DriverPool] = None
+
+
+def init_driver_pool(**kwargs) -> DriverPool:
+    """FastAPI lifespan에서 호출: 풀 생성 및 브라우저 예열"""
+    global _pool
+    if _pool is None:
+        _pool = DriverPool(**kwargs)
+        _pool.start()
+    return _pool
+
+
+def shutdown_driver_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def acquire_driver(profile: str = 'default'):
+    """
+    크롤링용 드라이버 대여
+    풀이 없으면(스크립트 단독 실행 등) 1회용 드라이버를 생성
+    """
+    if _pool is not None:
+        return _pool.acquire(profile)
+    driver = create_driver()
+    apply_profile(driver, profile)
+    return driver
+
+
+def release_driver(driver):
+    """드라이버 반납 (풀 소유가 아니면 종료)"""
+    if driver is None:
+        return
+    if _pool is not None and _pool.owns(driver):
+        _pool.release(driver)
+    else:
+        _quit_quietly(driver)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+##############################################
+### 로컬 Gemini 스텁 서버 (분류 API 테스트용) ###
+##############################################
+# 사용법:
+#   python scripts/gemini_stub_server.py --port 8787
+#   GEMINI_API_BASE=http://127.0.0.1:8787 GEMINI_API_KEY=stub uvicorn main:app --port 8001
+#
+# generateContent 요청의 프롬프트에서 상품명을 꺼내 키워드로 분류해 응답
+# (단건 프롬프트는 카테고리 이름, 배치 프롬프트는 JSON 배열)
+
+import re
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+KEYWORDS = [
+    ("아우터", ("자켓", "재킷", "코트", "패딩", "점퍼", "가디건", "카디건", "베스트", "바람막이")),
+    ("원피스", ("원피스", "스커트", "드레스")),
+    ("하의", ("팬츠", "바지", "슬랙스", "청바지", "데님", "쇼츠", "레깅스", "조거")),
+    ("상의", ("티셔츠", "셔츠", "블라우스", "니트", "맨투맨", "후드", "스웨터", "탑", "나시")),
+]
+
+stats = {'requests': 0, 'items': 0}
+stats_lock = threading.Lock()
+
+
+def classify(name: str) -> str:
+    for category, words in KEYWORDS:
+        if any(word in name for word in words):
+            return category
+    return "기타"
+
+
+def answer(prompt: str) -> str:
+    if "상품명 목록:" in prompt:
+        block = prompt.split("상품명 목록:", 1)[1]
+        names = re.findall(r'^\s*\d+\.\s*(.+)$', block, re.M)
+        with stats_lock:
+            stats['items'] += len(names)
+        return json.dumps([classify(name) for name in names], ensure_ascii=False)
+
+    match = re.search(r'상품명:\s*(.+)', prompt)
+    with stats_lock:
+        stats['items'] += 1
+    return classify(match.group(1)) if match else "기타"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    # 테스트에서 응답 내용을 바꿀 때 하위 클래스에서 교체
+    answer = staticmethod(answer)
+
+    def do_POST(self):
+        if ':generateContent' not in self.path:
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        prompt = body["contents"][0]["parts"][0]["text"]
+        with stats_lock:
+            stats['requests'] += 1
+        if self.delay:
+            time.sleep(self.delay)
+
+        data = json.dumps({
+            "candidates": [{"content": {"parts": [{"text": self.answer(prompt)}]}}]
+        }, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        # 호출 횟수 확인용 (배치가 제대로 묶이는지 확인)
+        with stats_lock:
+            data = json.dumps(stats).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 Gemini generateContent 스텁 서버")
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--delay-ms', type=int, default=0, help="응답 지연 (실제 API 지연 흉내)")
+    args = parser.parse_args()
+
+    StubHandler.delay = args.delay_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), StubHandler)
+    print(f"[INFO] Gemini 스텁 서버 실행: http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
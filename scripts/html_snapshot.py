@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+##########################################
+### 페이지 스냅샷(HTML) 파싱 유틸 (lxml) ###
+##########################################
+
+import os
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+from lxml import html as lxml_html
+
+
+# 스냅샷 모드: 페이지 로딩 후 page_source만 받아 드라이버를 바로 반납하고,
+# 필드 추출은 HTML 스냅샷에 대해 워커 프로세스에서 수행
+# 스냅샷 텍스트는 CSS 클래스로 숨긴 요소나 블록 요소 사이 줄바꿈을 Selenium .text와 똑같이 다루지 못해
+# 쇼핑몰별로 라이브 추출 결과와 같은지 확인하기 전까지는 기본 꺼둠 (CRAWL_SNAPSHOT_MODE=true로 사용)
+SNAPSHOT_MODE = os.getenv('CRAWL_SNAPSHOT_MODE', 'false').lower() == 'true'
+SNAPSHOT_PARSER_WORKERS = int(os.getenv('SNAPSHOT_PARSER_WORKERS', '2'))
+
+_parser_pool: Optional[ProcessPoolExecutor] = None
+_parser_pool_lock = threading.Lock()
+
+
+def _get_parser_pool() -> ProcessPoolExecutor:
+    global _parser_pool
+    with _parser_pool_lock:
+        if _parser_pool is None:
+            # 드라이버 풀 스레드가 떠 있는 프로세스를 fork하지 않도록 spawn 사용
+            _parser_pool = ProcessPoolExecutor(
+                max_workers=SNAPSHOT_PARSER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _parser_pool
+
+
+def run_parser(parse_fn, *args):
+    """
+    스냅샷 파서를 워커 프로세스에서 실행
+    parse_fn은 모듈 최상위 함수여야 함 (pickle 가능)
+    """
+    return _get_parser_pool().submit(parse_fn, *args).result()
+
+
+def shutdown_parser_pool():
+    global _parser_pool
+    with _parser_pool_lock:
+        if _parser_pool is not None:
+            _parser_pool.shutdown(wait=False, cancel_futures=True)
+            _parser_pool = None
+
+
+def parse_html(page_source: str):
+    return lxml_html.fromstring(page_source)
+
+
+# Selenium의 element.text는 화면에 보이는 텍스트만 주므로 스냅샷에서도 숨김 요소는 제외
+# (CSS 클래스로 숨긴 요소는 스냅샷만으로 알 수 없어 인라인 스타일/속성 기준으로만 판단)
+_HIDDEN_TAGS = {'script', 'style', 'noscript', 'template'}
+
+
+def _is_hidden(element) -> bool:
+    if not isinstance(element.tag, str) or element.tag.lower() in _HIDDEN_TAGS:
+        return True
+    if element.get('hidden') is not None or element.get('aria-hidden') == 'true':
+        return True
+    style = (element.get('style') or '').replace(' ', '').lower()
+    return 'display:none' in style or 'visibility:hidden' in style
+
+
+def _visible_text_parts(element, parts: List[str]):
+    if _is_hidden(element):
+        return
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        _visible_text_parts(child, parts)
+        # 숨김 요소 뒤에 이어지는 텍스트(tail)는 부모 소속이라 보임
+        if child.tail:
+            parts.append(child.tail)
+
+
+def element_text(element) -> str:
+    """Selenium의 element.text와 비슷하게 보이는 텍스트만 공백을 정리해 반환"""
+    parts: List[str] = []
+    _visible_text_parts(element, parts)
+    return " ".join("".join(parts).split())
+
+
+def find_all(tree, xpath: str) -> list:
+    """XPath 결과 중 요소만 반환 (잘못된 XPath는 빈 리스트)"""
+    try:
+        nodes = tree.xpath(xpath)
+    except Exception:
+        return []
+    return [node for node in nodes if hasattr(node, 'text_content')]
+
+
+def texts_by_xpath(tree, xpath: str) -> List[str]:
+    """XPath에 걸리는 모든 요소의 비어있지 않은 텍스트 목록"""
+    return [text for text in (element_text(el) for el in find_all(tree, xpath)) if text]
+
+
+def extract_by_xpath(tree, xpath, is_attribute=False, attribute_name='src'):
+    """스냅샷에서 단일 XPath로 요소 추출 (라이브 extract_by_xpath와 동일한 반환 규칙)"""
+    elements = find_all(tree, xpath)
+    if not elements:
+        return "-"
+    element = elements[0]
+    if is_attribute:
+        value = element.get(attribute_name)
+        return value if value is not None else "-"
+    return element_text(element)
+
+
+def extract_by_xpath_with_fallback(tree, xpath_list, is_attribute=False, attribute_name='src'):
+    """스냅샷에서 여러 XPath를 순서대로 시도 (첫 번째로 값이 있는 후보 사용)"""
+    for xpath in xpath_list:
+        elements = find_all(tree, xpath)
+        if not elements:
+            continue
+        element = elements[0]
+        value = element.get(attribute_name) if is_attribute else element_text(element)
+        if value:
+            return value
+    return "-"
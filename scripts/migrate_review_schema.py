@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+##############################################
+### review 스키마 마이그레이션 (1회성 실행) ###
+##############################################
+# review_hash 컬럼 추가 -> 기존 리뷰 해시 채움 -> 중복 정리 -> (product_id, review_hash) 유니크 인덱스
+# 서버 시작과 분리해서 배포 전에 한 번 실행 (DB_HOST/DB_USER/DB_PASSWORD/DB_NAME 또는 DATABASE_URL)
+#   python scripts/migrate_review_schema.py
+# 이미 끝난 DB에서는 information_schema만 확인하고 종료, 동시에 실행해도 GET_LOCK으로 하나만 진행
+
+import sys
+import argparse
+from db_handler import migrate_review_schema
+
+
+def main():
+    parser = argparse.ArgumentParser(description="review_hash 컬럼/유니크 인덱스 마이그레이션")
+    parser.add_argument('--lock-timeout', type=int, default=10, help="다른 세션의 마이그레이션 잠금 대기(초)")
+    args = parser.parse_args()
+
+    if not migrate_review_schema(lock_timeout=args.lock_timeout):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#########################################
+### 페이지 준비 상태 대기 (고정 sleep 대체) ###
+#########################################
+
+import json
+import time
+from selenium.common.exceptions import WebDriverException
+
+
+# 쇼핑몰별 준비 대기 최대 시간(초) - 준비되면 그보다 빨리 반환
+READY_DEADLINES = {
+    'musinsa': 5.0,
+    'musinsa_review': 5.0,
+    'zigzag': 5.0,
+    'zigzag_review': 5.0,
+    '29cm': 6.0,
+    '29cm_review': 6.0,
+    'wconcept': 5.0,
+    'wconcept_review': 6.0,
+}
+DEFAULT_DEADLINE = 5.0
+
+# DOM 변경/리소스 로딩이 이 시간(ms) 동안 없으면 안정된 것으로 판단
+DOM_QUIET_MS = 300
+
+# 네트워크 유휴로 인정할 CDP lifecycle 이벤트
+NETWORK_IDLE_EVENTS = ('networkAlmostIdle', 'networkIdle')
+
+# 단계별로 쓸 수 있는 최대 비율 (deadline 대비)
+# long-polling/분석 스크립트로 networkIdle이 안 와도 lazy-load/DOM 안정 대기 시간이 남도록
+NETWORK_IDLE_SHARE = 0.5
+LAZY_LOAD_SHARE = 0.3
+
+
+# DOM 안정 대기: MutationObserver + 리소스 타이밍 개수 변화 감시
+# arguments: 안정 판단 시간(ms), 제한시간(ms)
+DOM_QUIET_JS = """
+    const quietMs = arguments[0];
+    const timeoutMs = arguments[1];
+    const done = arguments[arguments.length - 1];
+    const start = performance.now();
+    let lastChange = start;
+    let resourceCount = performance.getEntriesByType('resource').length;
+
+    const observer = new MutationObserver(() => { lastChange = performance.now(); });
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+
+    const tick = () => {
+        const now = performance.now();
+        const count = performance.getEntriesByType('resource').length;
+        if (count !== resourceCount) {
+            resourceCount = count;
+            lastChange = now;
+        }
+        if (document.readyState !== 'loading' && now - lastChange >= quietMs) {
+            observer.disconnect();
+            done(true);
+            return;
+        }
+        if (now - start >= timeoutMs) {
+            observer.disconnect();
+            done(false);
+            return;
+        }
+        setTimeout(tick, 50);
+    };
+    tick();
+"""
+
+# lazy-load 강제: 화면 단위로 스크롤하며 IntersectionObserver 콜백을 발생시키고
+# 화면에 들어온 이미지 로딩이 끝날 때까지 대기
+# arguments: 제한시간(ms), 끝나고 맨 위로 돌아갈지 여부
+LAZY_LOAD_JS = """
+    const timeoutMs = arguments[0];
+    const restoreScroll = arguments[1];
+    const done = arguments[arguments.length - 1];
+    const start = performance.now();
+    const step = Math.max(window.innerHeight * 0.8, 300);
+    let y = 0;
+
+    const waitImages = () => {
+        const pending = Array.from(document.images).filter(img => img.getAttribute('src') && !img.complete);
+        if (!pending.length || performance.now() - start >= timeoutMs) {
+            done(pending.length === 0);
+            return;
+        }
+        setTimeout(waitImages, 50);
+    };
+    const scrollStep = () => {
+        const maxY = document.documentElement.scrollHeight - window.innerHeight;
+        if (y >= maxY || performance.now() - start >= timeoutMs / 2) {
+            if (restoreScroll) window.scrollTo(0, 0);
+            requestAnimationFrame(waitImages);
+            return;
+        }
+        y = Math.min(y + step, maxY);
+        window.scrollTo(0, y);
+        // 한 프레임 넘겨서 IntersectionObserver 콜백이 실행되도록
+        requestAnimationFrame(() => setTimeout(scrollStep, 16));
+    };
+    scrollStep();
+"""
+
+
+def _run_async(driver, script, timeout, *args) -> bool:
+    if timeout <= 0:
+        return False
+    try:
+        driver.set_script_timeout(timeout + 5)
+        return bool(driver.execute_async_script(script, *args))
+    except WebDriverException as e:
+        print(f"[WARN] 페이지 준비 대기 스크립트 실패: {e}")
+        return False
+
+
+def wait_for_dom_quiet(driver, timeout: float, quiet_ms: int = DOM_QUIET_MS) -> bool:
+    """DOM 변경과 리소스 로딩이 quiet_ms 동안 없을 때까지 대기"""
+    return _run_async(driver, DOM_QUIET_JS, timeout, quiet_ms, int(timeout * 1000))
+
+
+def trigger_lazy_load(driver, timeout: float, restore_scroll: bool = True) -> bool:
+    """페이지를 훑어 lazy-load 요소를 모두 로딩시키고 이미지 로딩 완료까지 대기"""
+    return _run_async(driver, LAZY_LOAD_JS, timeout, int(timeout * 1000), restore_scroll)
+
+
+def wait_for_network_idle(driver, timeout: float) -> bool:
+    """
+    CDP lifecycle 이벤트(networkAlmostIdle/networkIdle)로 네트워크 유휴 대기
+    performance 로그에서 현재 메인 프레임 문서(loaderId)의 이벤트만 인정
+    """
+    deadline = time.monotonic() + timeout
+    try:
+        frame = driver.execute_cdp_cmd('Page.getFrameTree', {})['frameTree']['frame']
+        frame_id, loader_id = frame['id'], frame.get('loaderId')
+        while True:
+            for entry in driver.get_log('performance'):
+                message = json.loads(entry['message']).get('message', {})
+                if message.get('method') != 'Page.lifecycleEvent':
+                    continue
+                params = message.get('params', {})
+                if (params.get('name') in NETWORK_IDLE_EVENTS and params.get('frameId') == frame_id
+                        and (loader_id is None or params.get('loaderId') == loader_id)):
+                    return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+    except (WebDriverException, KeyError, ValueError) as e:
+        # performance 로그를 쓸 수 없는 드라이버면 DOM 안정 대기에 맡김
+        print(f"[WARN] 네트워크 유휴 이벤트를 읽을 수 없습니다: {e}")
+        return False
+
+
+def wait_for_page_ready(driver, profile: str = 'default', lazy_load: bool = False,
+                        restore_scroll: bool = True, deadline: float = None) -> bool:
+    """
+    driver.get 이후 페이지가 실제로 준비될 때까지 대기 (고정 sleep 대신 사용)
+    1. 네트워크 유휴 (CDP lifecycle 이벤트)
+    2. (선택) lazy-load 강제 로딩
+    3. DOM 안정
+
+    모든 단계는 쇼핑몰별 deadline 하나를 나눠 쓰고, 네트워크 유휴/lazy-load는 각자 비율만큼만 사용
+    (앞 단계가 끝나지 않아도 DOM 안정 대기에는 항상 남은 시간이 있음)
+
+    Returns:
+        True: 모든 신호 확인, False: deadline 도달 (그래도 크롤링은 계속 진행)
+    """
+    budget = deadline if deadline is not None else READY_DEADLINES.get(profile, DEFAULT_DEADLINE)
+    end = time.monotonic() + budget
+
+    ready = wait_for_network_idle(driver, min(end - time.monotonic(), budget * NETWORK_IDLE_SHARE))
+    if lazy_load:
+        ready = trigger_lazy_load(driver, min(end - time.monotonic(), budget * LAZY_LOAD_SHARE), restore_scroll) and ready
+    ready = wait_for_dom_quiet(driver, end - time.monotonic()) and ready
+    return ready
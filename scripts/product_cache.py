@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#########################################
+### 상품 크롤링 결과 캐시 (TTL + LRU) ###
+#########################################
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+
+# 캐시 설정 (환경변수로 조정 가능)
+PRODUCT_CACHE_TTL = float(os.getenv('PRODUCT_CACHE_TTL', '600'))                # 결과 유지 시간(초)
+PRODUCT_CACHE_MAX_ENTRIES = int(os.getenv('PRODUCT_CACHE_MAX_ENTRIES', '1000'))  # 메모리에 둘 최대 상품 수
+PRODUCT_CACHE_DB_PATH = os.getenv('PRODUCT_CACHE_DB_PATH', '')                   # 지정하면 sqlite 디스크 캐시 사용 (재시작 후에도 유지)
+
+
+def is_cacheable(result: dict) -> bool:
+    """크롤링에 성공한 결과만 캐시 (실패 시 모든 필드가 '-')"""
+    return result.get('product_name', '-') != '-' and result.get('price', '-') != '-'
+
+
+class DiskCache:
+    """sqlite 기반 2차 캐시"""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS product_cache ("
+                "cache_key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[tuple]:
+        """(만료 시각, 값) 반환, 없거나 만료되었으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM product_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                self._conn.execute("DELETE FROM product_cache WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                return None
+        return row[1], json.loads(row[0])
+
+    def set(self, key: str, value: dict, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO product_cache (cache_key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at)
+            )
+            self._conn.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM product_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ProductCache:
+    """
+    (쇼핑몰, 상품번호) 단위 크롤링 결과 캐시
+
+    - 메모리: OrderedDict 기반 LRU + TTL
+    - 디스크: sqlite (PRODUCT_CACHE_DB_PATH 지정 시), 메모리에서 밀려나거나 재시작해도 유지
+    - single-flight: 같은 상품을 동시에 요청하면 크롤링은 한 번만 하고 결과를 공유
+    """
+
+    def __init__(self, ttl: float = PRODUCT_CACHE_TTL, max_entries: int = PRODUCT_CACHE_MAX_ENTRIES,
+                 db_path: str = PRODUCT_CACHE_DB_PATH):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = DiskCache(db_path) if db_path else None
+        if self._disk:
+            self._disk.purge_expired()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'coalesced': 0, 'stores': 0}
+
+    @staticmethod
+    def make_key(mall: str, product_num) -> str:
+        return f"{mall}:{product_num}"
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.time():
+                    self._memory.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                del self._memory[key]
+
+        if self._disk:
+            entry = self._disk.get(key)
+            if entry is not None:
+                # 디스크에서 찾으면 남은 TTL 그대로 메모리로 다시 올림
+                expires_at, value = entry
+                self._put_memory(key, value, expires_at)
+                self._count('disk_hits')
+                return value
+
+        self._count('misses')
+        return None
+
+    def _put_memory(self, key: str, value: dict, expires_at: float):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def set(self, key: str, value: dict):
+        expires_at = time.time() + self.ttl
+        self._put_memory(key, value, expires_at)
+        if self._disk:
+            self._disk.set(key, value, expires_at)
+        self._count('stores')
+
+    async def get_or_crawl(self, key: Optional[str], crawl: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        캐시에 있으면 반환, 없으면 crawl()을 실행하여 성공한 결과만 저장
+        같은 key의 크롤링이 진행 중이면 새로 크롤링하지 않고 그 결과를 기다림
+        key가 None이면(상품번호 추출 실패) 캐시 없이 바로 크롤링
+        """
+        if key is None:
+            return await crawl()
+
+        cached = await asyncio.to_thread(self.get, key) if self._disk else self.get(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._count('coalesced')
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await crawl()
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 요청이 없으면 "exception was never retrieved" 경고가 나지 않도록 소비
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            expires_at = time.time() + self.ttl
+            if is_cacheable(result):
+                # in-flight 항목을 지우기 전에 메모리에 먼저 넣어 그 사이 요청이 다시 크롤링하지 않도록 함
+                self._put_memory(key, result, expires_at)
+                self._count('stores')
+            future.set_result(result)
+        finally:
+            self._inflight.pop(key, None)
+
+        if self._disk and is_cacheable(result):
+            await asyncio.to_thread(self._disk.set, key, result, expires_at)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._memory)
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        stats['inflight'] = len(self._inflight)
+        stats['ttl'] = self.ttl
+        stats['max_entries'] = self.max_entries
+        stats['disk_enabled'] = self._disk is not None
+        return stats
+
+    def close(self):
+        if self._disk:
+            self._disk.close()
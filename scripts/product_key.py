@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+############################################
+### 상품 URL -> 정규화된 상품 키 (공용) ###
+############################################
+# m./www. 도메인, 추적용 쿼리스트링, ?tab=review, 앱 단축 URL 등
+# 같은 상품의 여러 URL 변형을 하나의 (쇼핑몰, 원본 상품번호, product_num) 키로 통일
+
+import re
+from typing import NamedTuple, Optional
+from urllib.parse import urlparse
+from url_resolver import resolve_url
+
+
+class ProductKey(NamedTuple):
+    mall: str            # 'musinsa' | 'zigzag' | '29cm' | 'wconcept'
+    native_id: str       # 쇼핑몰 원본 상품번호
+    product_num: int     # 서비스 공용 15자리 상품번호 (쇼핑몰 prefix + 0 채움 + 원본 번호)
+
+
+# 쇼핑몰별 product_num prefix
+MALL_PREFIXES = {
+    'musinsa': "1",
+    'zigzag': "2",
+    '29cm': "3",
+    'wconcept': "4",
+}
+
+# 쇼핑몰별 상품 경로 패턴 (미리 컴파일)
+MALL_PATH_PATTERNS = {
+    'musinsa': re.compile(r'/(?:products|goods)/(\d+)'),
+    'zigzag': re.compile(r'/catalog/products/(\d+)'),
+    '29cm': re.compile(r'/products?/(\d+)'),
+    'wconcept': re.compile(r'/Product/(\d+)', re.I),
+}
+
+# 도메인 -> 쇼핑몰 (하위 도메인 m./www./store. 등은 상위 도메인으로 찾음)
+HOST_DISPATCH = {
+    'musinsa.com': 'musinsa',
+    'zigzag.kr': 'zigzag',
+    '29cm.co.kr': '29cm',
+    'wconcept.co.kr': 'wconcept',
+}
+
+CANONICAL_URLS = {
+    'musinsa': "https://www.musinsa.com/products/{}",
+    'zigzag': "https://zigzag.kr/catalog/products/{}",
+    '29cm': "https://www.29cm.co.kr/products/{}",
+    'wconcept': "https://www.wconcept.co.kr/Product/{}",
+}
+
+PRODUCT_NUM_LENGTH = 15
+
+
+def mall_for_host(host: str) -> Optional[str]:
+    host = (host or '').lower()
+    while host:
+        mall = HOST_DISPATCH.get(host)
+        if mall:
+            return mall
+        _, _, host = host.partition('.')
+    return None
+
+
+def format_product_num(mall: str, native_id: str) -> Optional[int]:
+    """
+    원본 상품번호를 15자리 product_num으로 변환
+    맨 앞에 쇼핑몰 prefix, 중간은 0으로 채움, 끝에 원본 상품번호
+    """
+    prefix = MALL_PREFIXES[mall]
+    zeros_needed = PRODUCT_NUM_LENGTH - len(prefix) - len(native_id)
+    if zeros_needed < 0:
+        # 상품 번호가 너무 길면 그대로 반환 (예외 처리)
+        try:
+            return int(native_id)
+        except ValueError:
+            return None
+    try:
+        return int(prefix + "0" * zeros_needed + native_id)
+    except ValueError:
+        return None
+
+
+def canonicalize(url: str, default_mall: Optional[str] = None) -> Optional[ProductKey]:
+    """
+    상품 URL을 정규화된 상품 키로 변환 (단축 URL은 리다이렉트 해석 후)
+
+    Args:
+        url: 상품 URL (단축/모바일/쿼리스트링 포함 가능)
+        default_mall: 도메인으로 쇼핑몰을 알 수 없을 때 사용할 쇼핑몰
+
+    Returns:
+        ProductKey / 상품 URL이 아니면 None
+    """
+    if not url:
+        return None
+    # 단축 URL 해석에 실패해도 원래 URL에 상품번호가 있을 수 있으므로 그대로 파싱
+    resolved = resolve_url(url) or url
+
+    parsed = urlparse(resolved)
+    mall = mall_for_host(parsed.hostname) or default_mall
+    if mall is None:
+        return None
+
+    match = MALL_PATH_PATTERNS[mall].search(parsed.path)
+    if not match:
+        return None
+
+    native_id = match.group(1)
+    product_num = format_product_num(mall, native_id)
+    if product_num is None:
+        return None
+    return ProductKey(mall, native_id, product_num)
+
+
+def canonical_url(key: ProductKey) -> str:
+    """추적용 파라미터 등을 제거한 쇼핑몰 PC 상품 URL"""
+    return CANONICAL_URLS[key.mall].format(key.native_id)
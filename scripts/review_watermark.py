@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#############################################
+### 리뷰 수집기 공용 콜백 (증분 수집 / 스트리밍 저장) ###
+#############################################
+# 리뷰 수집기는 DB를 모르고 콜백만 받음 (main.py에서 전달)
+#   is_known(review) -> bool: 이미 저장된 리뷰인지 (db_handler.ReviewWatermark.is_known)
+#   on_review(review) -> bool: 수집한 리뷰를 바로 넘김, False면 수집 중단 (db_handler.ReviewStreamWriter.add)
+
+import os
+from typing import Callable, Dict, Optional
+
+
+# 최신순 목록에서 이미 저장된 리뷰가 이 개수만큼 연속되면 수집 중단
+# (상단에 고정/베스트 리뷰가 섞여 있어도 바로 멈추지 않도록 1보다 크게)
+KNOWN_REVIEW_STOP_STREAK = int(os.getenv('KNOWN_REVIEW_STOP_STREAK', '3'))
+
+
+class FilterOnly:
+    """
+    is_known 콜백을 감싸서 이미 저장된 리뷰를 만나도 멈추지 않고 걸러내기만 하도록
+    (지난 크롤링이 PARTIAL로 끝나 최신 리뷰 뒤쪽이 비어 있을 때 이어서 수집)
+    """
+    stop_early = False
+
+    def __init__(self, is_known: Callable[[Dict], bool]):
+        self.is_known = is_known
+
+    def __call__(self, review: Dict) -> bool:
+        return self.is_known(review)
+
+
+class KnownReviewTracker:
+    """
+    수집 중 이미 저장된 리뷰를 걸러내고, 최신순 목록이면 언제 멈출지 판단
+
+    Args:
+        is_known: 리뷰 dict -> 이미 저장된 리뷰인지 (None이면 전체 수집)
+        stop_streak: 연속으로 이만큼 이미 있는 리뷰가 나오면 stopped=True
+                     (최신순 정렬을 지원하지 않는 쇼핑몰은 None으로 걸러내기만 함)
+    """
+
+    def __init__(self, is_known: Optional[Callable[[Dict], bool]] = None,
+                 stop_streak: Optional[int] = KNOWN_REVIEW_STOP_STREAK):
+        self.is_known = is_known
+        self.stop_streak = stop_streak if getattr(is_known, 'stop_early', True) else None
+        self.streak = 0
+        self.seen = 0
+        self.known = 0
+        self.stopped = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.is_known is not None
+
+    @property
+    def all_known(self) -> bool:
+        """확인한 리뷰가 있고 전부 이미 저장된 리뷰였는지 (새 리뷰가 없다고 확신할 수 있는 경우)"""
+        return self.seen > 0 and self.known == self.seen
+
+    def check(self, review: Dict) -> bool:
+        """이미 저장된 리뷰면 True (수집 대상에서 제외)"""
+        self.seen += 1
+        if self.is_known is None or not self.is_known(review):
+            self.streak = 0
+            return False
+        self.known += 1
+        self.streak += 1
+        if self.stop_streak and self.streak >= self.stop_streak:
+            self.stopped = True
+        return True
+
+
+class StreamedOnce:
+    """
+    on_review 콜백을 감싸서 같은 리뷰는 한 번만 넘기도록
+    (요청 방식으로 일부 넘긴 뒤 실패해 브라우저로 다시 수집할 때 중복 전송 방지)
+    """
+
+    def __init__(self, on_review: Callable[[Dict], bool]):
+        self.on_review = on_review
+        self.sent = set()
+
+    def __call__(self, review: Dict) -> bool:
+        key = (review.get('content'), review.get('review_date'), review.get('option_text'))
+        if key in self.sent:
+            return True
+        self.sent.add(key)
+        return self.on_review(review)
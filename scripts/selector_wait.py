@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+##############################################
+### XPath 후보 동시 대기 (브라우저 내 레이스) ###
+##############################################
+
+import time
+from typing import List, Optional, Tuple
+from selenium.common.exceptions import WebDriverException
+
+
+# 모든 XPath 후보를 한 번에 페이지로 보내 MutationObserver로 대기
+# arguments: XPath 목록, 모드('text' | 'attribute' | 'presence'), 속성명, 제한시간(ms)
+# 여러 후보가 동시에 잡히면 목록 순서가 앞선 후보를 우선
+RACE_XPATHS_JS = """
+    const xpaths = arguments[0];
+    const mode = arguments[1];
+    const attributeName = arguments[2];
+    const timeoutMs = arguments[3];
+    const done = arguments[arguments.length - 1];
+
+    const valueOf = el => {
+        if (mode === 'presence') return '1';
+        if (mode === 'attribute') return el.getAttribute(attributeName);
+        return (el.innerText || el.textContent || '').trim();
+    };
+    const check = () => {
+        for (let i = 0; i < xpaths.length; i++) {
+            let el = null;
+            try {
+                el = document.evaluate(xpaths[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            } catch (e) {
+                continue;
+            }
+            if (!el) continue;
+            const value = valueOf(el);
+            if (value) return {index: i, value: value};
+        }
+        return null;
+    };
+
+    const first = check();
+    if (first) { done(first); return; }
+
+    let finished = false;
+    let scheduled = false;
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        // 변경이 몰릴 때 매번 평가하지 않도록 묶어서 확인
+        if (scheduled || finished) return;
+        scheduled = true;
+        setTimeout(() => {
+            scheduled = false;
+            const found = check();
+            if (found) finish(found);
+        }, 30);
+    });
+    const finish = result => {
+        if (finished) return;
+        finished = true;
+        observer.disconnect();
+        clearTimeout(timer);
+        done(result);
+    };
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    timer = setTimeout(() => finish(check()), timeoutMs);
+"""
+
+
+def wait_for_any(driver, xpath_list: List[str], wait_time: float = 10, mode: str = 'text',
+                 attribute_name: Optional[str] = None) -> Tuple[Optional[int], Optional[str]]:
+    """
+    XPath 후보 중 하나라도 값이 생기는 즉시 반환 (전체 제한시간 하나)
+
+    Returns:
+        (이긴 후보의 인덱스, 값) / 제한시간 내에 없으면 (None, None)
+    """
+    try:
+        driver.set_script_timeout(wait_time + 5)
+        result = driver.execute_async_script(RACE_XPATHS_JS, list(xpath_list), mode, attribute_name, int(wait_time * 1000))
+    except WebDriverException as e:
+        print(f"[WARN] XPath 대기 스크립트 실패: {e}")
+        return None, None
+
+    if not result:
+        return None, None
+    return result['index'], result['value']
+
+
+def wait_for_fields(driver, field_xpaths: List[List[str]], wait_time: float = 10) -> bool:
+    """
+    필드별 XPath 후보 목록마다 값이 생길 때까지 대기 (전체 제한시간 하나를 나눠 씀)
+    스냅샷 모드에서 page_source를 받기 전에 핵심 필드(상품명/가격)가 렌더링됐는지 확인하는 용도
+
+    Returns:
+        모든 필드가 제한시간 내에 준비되었는지
+    """
+    deadline = time.monotonic() + wait_time
+    ready = True
+    for xpath_list in field_xpaths:
+        remaining = max(deadline - time.monotonic(), 0)
+        index, _ = wait_for_any(driver, xpath_list, remaining)
+        if index is None:
+            ready = False
+    return ready
+
+
+# 여러 XPath를 동시에 대기하여 요소 추출 (fallback 처리)
+def extract_by_xpath_with_fallback(driver, xpath_list, wait_time=10, is_attribute=False, attribute_name='src'):
+    mode = 'attribute' if is_attribute else 'text'
+    _, value = wait_for_any(driver, xpath_list, wait_time, mode, attribute_name)
+    return value if value else "-"
+
+
+# 단일 XPath로 요소 추출
+def extract_by_xpath(driver, xpath, wait_time=10, is_attribute=False, attribute_name='src'):
+    return extract_by_xpath_with_fallback(driver, [xpath], wait_time, is_attribute, attribute_name)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#######################################
+### 앱/단축 URL 리다이렉트 해석 (공용) ###
+#######################################
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urlparse
+import requests
+from http_client import get_session
+
+
+# 리다이렉트 해석이 필요한 단축 URL 호스트 (하위 도메인 포함)
+SHORT_LINK_HOSTS = ('onelink.me', 'musinsa.link', '29cm.link', 's.zigzag.kr', 'zigzag.link')
+
+RESOLVE_TIMEOUT = float(os.getenv('URL_RESOLVE_TIMEOUT', '10'))
+RESOLVE_CACHE_TTL = float(os.getenv('URL_RESOLVE_CACHE_TTL', str(24 * 3600)))
+RESOLVE_CACHE_MAX_ENTRIES = int(os.getenv('URL_RESOLVE_CACHE_MAX_ENTRIES', '5000'))
+
+_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def is_short_link(url: str) -> bool:
+    host = (urlparse(url).hostname or '').lower()
+    return any(host == short or host.endswith('.' + short) for short in SHORT_LINK_HOSTS)
+
+
+def _cache_get(url: str) -> Optional[str]:
+    with _cache_lock:
+        entry = _cache.get(url)
+        if entry is None:
+            return None
+        expires_at, resolved = entry
+        if expires_at <= time.time():
+            del _cache[url]
+            return None
+        _cache.move_to_end(url)
+        return resolved
+
+
+def _cache_set(url: str, resolved: str):
+    with _cache_lock:
+        _cache[url] = (time.time() + RESOLVE_CACHE_TTL, resolved)
+        _cache.move_to_end(url)
+        while len(_cache) > RESOLVE_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def _follow_redirects(url: str) -> str:
+    session = get_session()
+    # 1. HEAD로 리다이렉트만 따라감 (본문 다운로드 없음)
+    try:
+        response = session.head(url, allow_redirects=True, timeout=RESOLVE_TIMEOUT)
+        response.close()
+        if response.status_code < 400 and not is_short_link(response.url):
+            return response.url
+    except requests.exceptions.RequestException as e:
+        print(f"[WARN] HEAD 리다이렉트 실패, GET으로 재시도: {e}")
+
+    # 2. HEAD를 막는 서버는 GET(stream)으로 헤더만 받고 본문은 읽지 않고 닫음
+    response = session.get(url, allow_redirects=True, timeout=RESOLVE_TIMEOUT, stream=True)
+    response.close()
+    return response.url
+
+
+def resolve_url(url: str) -> Optional[str]:
+    """
+    단축 URL이면 최종 상품 URL로 해석 (일반 URL은 그대로 반환)
+    해석 결과는 LRU/TTL 캐시에 저장되어 상품/리뷰 모듈이 함께 재사용
+
+    Returns:
+        최종 URL / 리다이렉트 실패 시 None
+    """
+    if not url or not is_short_link(url):
+        return url
+
+    cached = _cache_get(url)
+    if cached:
+        return cached
+
+    try:
+        resolved = _follow_redirects(url)
+    except requests.exceptions.RequestException as e:
+        print(f"[오류] URL 리다이렉트 실패: {e}")
+        return None
+
+    _cache_set(url, resolved)
+    return resolved
@@ -3,23 +3,71 @@
 ######################################
 
 import os
+import re
+import time
+import queue
+import threading
 import requests
 import json
-from typing import Optional
+from concurrent.futures import Future
+from typing import List, Optional
+from category_cache import VALID_CATEGORIES, get_cached_category, set_cached_category, set_cached_categories
+from http_client import get_session
 
 
-def classify_category_with_gemini(product_name: str) -> str:
+# Gemini API 설정 (GEMINI_API_BASE를 로컬 스텁 서버 주소로 바꾸면 실제 API 없이 테스트 가능)
+GEMINI_API_BASE = os.getenv('GEMINI_API_BASE', 'https://generativelanguage.googleapis.com').rstrip('/')
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
+# (연결, 응답) 제한시간(초) - 크롤링 응답을 오래 붙잡지 않도록 짧게
+GEMINI_TIMEOUT = (float(os.getenv('GEMINI_CONNECT_TIMEOUT', '3')), float(os.getenv('GEMINI_READ_TIMEOUT', '10')))
+
+# 배치 분류 설정
+GEMINI_BATCH_SIZE = int(os.getenv('GEMINI_BATCH_SIZE', '40'))                    # 프롬프트 하나에 넣을 최대 상품명 수
+GEMINI_BATCH_WINDOW = float(os.getenv('GEMINI_BATCH_WINDOW_MS', '50')) / 1000     # 동시 요청을 모으는 시간(초)
+GEMINI_RETRY_BUDGET = float(os.getenv('GEMINI_RETRY_BUDGET', '15'))               # 배치에서 빠진 항목을 1건씩 다시 요청하는 총 시간(초)
+
+
+def _gemini_url(api_key: str) -> str:
+    return f"{GEMINI_API_BASE}/v1/models/{GEMINI_MODEL}:generateContent?key={api_key}"
+
+
+def classify_category_with_gemini(product_name: str) -> Optional[str]:
+    """
+    Returns:
+        카테고리 / API 호출 실패 시 None (호출한 쪽에서 로컬 분류 결과 등으로 대체)
+    """
+    # 상품명이 없거나 "-"인 경우 "기타" 반환
+    if not product_name or product_name == "-":
+        return "기타"
+
+    # 이전에 분류한 상품명이면 Gemini 호출 없이 반환
+    cached = get_cached_category(product_name)
+    if cached:
+        return cached
+
+    # 동시에 들어온 다른 크롤링의 상품명과 묶어서 한 번에 호출
+    category = _batcher.submit(product_name).result()
+    if category is None:
+        # API 오류는 캐시하지 않음 (다음 요청에서 다시 시도)
+        return None
+    set_cached_category(product_name, category, source='gemini')
+    return category
+
+
+def request_gemini_category(product_name: str) -> Optional[str]:
+    """
+    Gemini API로 상품명 1건 분류 (캐시 없이)
+
+    Returns:
+        카테고리 / API 호출 실패 시 None
+    """
     # 환경변수에서 API 키 가져오기
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
     
-    # 상품명이 없거나 "-"인 경우 "기타" 반환
-    if not product_name or product_name == "-":
-        return "기타"
-    
     # Gemini API 엔드포인트
-    url = f"https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash:generateContent?key={api_key}"
+    url = _gemini_url(api_key)
     
     # 요청 페이로드 구성
     prompt = f"""다음 상품명을 보고 이 상품이 다음 다섯 가지 카테고리 중 어느 것에 해당하는지 분류해주세요.
@@ -50,7 +98,8 @@ def classify_category_with_gemini(product_name: str) -> str:
     
     try:
         # API 호출
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        # keep-alive 커넥션을 재사용하는 공용 세션으로 호출
+        response = get_session().post(url, headers=headers, json=payload, timeout=GEMINI_TIMEOUT)
         response.raise_for_status()
         
         # 응답 파싱
@@ -84,10 +133,206 @@ def classify_category_with_gemini(product_name: str) -> str:
         
     except requests.exceptions.RequestException as e:
         print(f"Gemini API 호출 중 오류 발생: {str(e)}")
-        return "기타"
+        return None
     except (KeyError, ValueError, json.JSONDecodeError) as e:
         print(f"Gemini API 응답 파싱 중 오류 발생: {str(e)}")
-        return "기타"
+        return None
     except Exception as e:
         print(f"카테고리 분류 중 예상치 못한 오류 발생: {str(e)}")
-        return "기타"
+        return None
+
+
+def submit_gemini_category(product_name: str) -> Future:
+    """
+    캐시를 확인하지 않고 배치 큐에 분류 요청만 넣음 (기다리지 않음)
+    결과는 분류 캐시에 저장되며, Future 결과는 카테고리 또는 None(API 실패)
+    """
+    future = _batcher.submit(product_name)
+
+    def _store(done: Future):
+        if not done.exception() and done.result() is not None:
+            set_cached_category(product_name, done.result(), source='gemini')
+
+    future.add_done_callback(_store)
+    return future
+
+
+def classify_categories_with_gemini(product_names: List[str]) -> List[str]:
+    """
+    여러 상품명을 한 번에 분류 (백필/일괄 크롤링용)
+    캐시에 있는 상품명은 제외하고 나머지만 배치 프롬프트로 분류
+
+    Returns:
+        입력 순서대로의 카테고리 목록 (실패한 항목은 '기타')
+    """
+    results = {}
+    pending = []
+    for name in dict.fromkeys(product_names):
+        if not name or name == "-":
+            results[name] = "기타"
+            continue
+        cached = get_cached_category(name)
+        if cached:
+            results[name] = cached
+        else:
+            pending.append(name)
+
+    if pending:
+        categories = request_gemini_categories(pending)
+        set_cached_categories(
+            ((name, category) for name, category in zip(pending, categories) if category is not None),
+            source='gemini'
+        )
+        for name, category in zip(pending, categories):
+            results[name] = category if category is not None else "기타"
+
+    return [results[name] for name in product_names]
+
+
+def _build_batch_prompt(product_names: List[str]) -> str:
+    numbered = "\n".join(f"{i + 1}. {name}" for i, name in enumerate(product_names))
+    return f"""다음 상품명 목록의 각 상품이 다음 다섯 가지 카테고리 중 어느 것에 해당하는지 분류해주세요.
+
+카테고리: 상의, 하의, 아우터, 원피스, 기타
+
+상품명 목록:
+{numbered}
+
+각 상품마다 정확히 하나의 카테고리만 선택하여, 목록 순서대로 카테고리 이름만 담은 JSON 배열 하나로 응답해주세요.
+배열의 길이는 반드시 {len(product_names)}이어야 합니다.
+응답 예시: ["상의", "하의", "기타"]
+다른 설명이나 추가 텍스트 없이 JSON 배열만 출력해주세요."""
+
+
+def parse_batch_response(text: str, expected: int) -> List[Optional[str]]:
+    """
+    배치 응답(JSON 배열)을 카테고리 목록으로 변환
+    배열 길이가 다르면 순서를 믿을 수 없으므로 전부 None, 유효하지 않은 항목은 None
+    """
+    match = re.search(r'\[.*\]', text or '', re.S)
+    if not match:
+        return [None] * expected
+    try:
+        values = json.loads(match.group(0))
+    except ValueError:
+        return [None] * expected
+    if not isinstance(values, list) or len(values) != expected:
+        return [None] * expected
+
+    categories = []
+    for value in values:
+        value = value.strip() if isinstance(value, str) else None
+        categories.append(value if value in VALID_CATEGORIES else None)
+    return categories
+
+
+def _request_batch(api_key: str, product_names: List[str]) -> Optional[List[Optional[str]]]:
+    """
+    Returns:
+        카테고리 목록 (응답에서 빠진 항목은 None) / 호출 자체가 실패(연결/HTTP 오류)하면 None
+    """
+    payload = {"contents": [{"parts": [{"text": _build_batch_prompt(product_names)}]}]}
+    try:
+        response = get_session().post(_gemini_url(api_key), headers={"Content-Type": "application/json"}, json=payload, timeout=GEMINI_TIMEOUT)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Gemini 배치 API 호출 중 오류 발생: {str(e)}")
+        return None
+    try:
+        result = response.json()
+        text = result["candidates"][0]["content"]["parts"][0].get("text", "")
+    except (KeyError, IndexError, ValueError) as e:
+        print(f"Gemini 배치 API 응답 파싱 중 오류 발생: {str(e)}")
+        return [None] * len(product_names)
+    return parse_batch_response(text, len(product_names))
+
+
+def request_gemini_categories(product_names: List[str]) -> List[Optional[str]]:
+    """
+    Gemini API로 여러 상품명 분류 (캐시 없이)
+    GEMINI_BATCH_SIZE 단위로 묶어 호출하고, 응답은 받았지만 빠진 항목(파싱 실패/길이 불일치)만 1건씩 다시 요청
+    연결/HTTP 오류는 1건씩 보내도 같은 오류라 다시 요청하지 않고, 재요청은 GEMINI_RETRY_BUDGET 안에서만
+
+    Returns:
+        입력 순서대로의 카테고리 목록 (끝내 실패한 항목은 None)
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
+
+    categories: List[Optional[str]] = [None] * len(product_names)
+    single = []  # 1건씩 요청할 항목의 인덱스
+    for start in range(0, len(product_names), GEMINI_BATCH_SIZE):
+        chunk = product_names[start:start + GEMINI_BATCH_SIZE]
+        # 1건이면 기존 단건 프롬프트가 더 정확하고 응답도 짧음
+        if len(chunk) == 1:
+            single.append(start)
+            continue
+        result = _request_batch(api_key, chunk)
+        if result is None:
+            continue
+        categories[start:start + len(chunk)] = result
+        single.extend(start + i for i, category in enumerate(result) if category is None)
+
+    deadline = time.monotonic() + GEMINI_RETRY_BUDGET
+    for done, i in enumerate(single):
+        if time.monotonic() >= deadline:
+            print(f"Gemini 재요청 시간 초과, 남은 {len(single) - done}건은 분류 실패로 처리")
+            break
+        categories[i] = request_gemini_category(product_names[i])
+        if categories[i] is None:
+            # 단건 호출도 연결/HTTP 오류면 나머지도 같은 결과라 중단
+            break
+    return categories
+
+
+class _GeminiBatcher:
+    """
+    동시에 들어온 단건 분류 요청을 짧은 시간(GEMINI_BATCH_WINDOW) 동안 모아
+    배치 프롬프트 한 번으로 처리하는 백그라운드 큐
+    """
+
+    def __init__(self, window: float = GEMINI_BATCH_WINDOW, max_batch: int = GEMINI_BATCH_SIZE):
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, product_name: str) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='gemini-batcher', daemon=True)
+                self._thread.start()
+        self._queue.put((product_name, future))
+        return future
+
+    def _collect(self) -> list:
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(items) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            names = list(dict.fromkeys(name for name, _ in items))
+            try:
+                results = dict(zip(names, request_gemini_categories(names)))
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            for name, future in items:
+                future.set_result(results.get(name))
+
+
+_batcher = _GeminiBatcher()
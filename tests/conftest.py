@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# main.py와 같이 scripts/ 모듈을 최상위 이름으로 import
+import os
+import sys
+
+scripts_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+if scripts_path not in sys.path:
+    sys.path.insert(0, scripts_path)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# scripts/gemini_stub_server.py를 로컬에 띄워 Gemini 배치 분류/재요청 동작 확인 (실제 API 호출 없음)
+
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import gemini_stub_server
+import zigzag_category_ai
+
+
+NAMES = ["오버핏 코튼 셔츠", "와이드 데님 팬츠", "울 블렌드 코트", "플리츠 롱 스커트", "캔버스 에코백"]
+EXPECTED = ["상의", "하의", "아우터", "원피스", "기타"]
+
+
+def _short_answer(prompt):
+    text = gemini_stub_server.answer(prompt)
+    if "상품명 목록:" in prompt:
+        return json.dumps(json.loads(text)[:-1], ensure_ascii=False)
+    return text
+
+
+class WrongLengthHandler(gemini_stub_server.StubHandler):
+    """배치 응답 배열 길이를 하나 줄여서 응답 (단건 프롬프트는 정상 응답)"""
+    answer = staticmethod(_short_answer)
+
+
+class ErrorHandler(gemini_stub_server.StubHandler):
+    """모든 요청에 503"""
+
+    def do_POST(self):
+        with gemini_stub_server.stats_lock:
+            gemini_stub_server.stats['requests'] += 1
+        self.send_error(503)
+
+
+def _serve(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """핸들러를 받아 스텁 서버를 띄우고 zigzag_category_ai가 그 주소로 호출하도록"""
+    servers = []
+
+    def start(handler=gemini_stub_server.StubHandler):
+        server = _serve(handler)
+        servers.append(server)
+        monkeypatch.setattr(zigzag_category_ai, 'GEMINI_API_BASE', f"http://127.0.0.1:{server.server_address[1]}")
+        return server
+
+    monkeypatch.setenv('GEMINI_API_KEY', 'stub')
+    monkeypatch.setitem(gemini_stub_server.stats, 'requests', 0)
+    monkeypatch.setitem(gemini_stub_server.stats, 'items', 0)
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_batches_by_batch_size(stub, monkeypatch):
+    stub()
+    monkeypatch.setattr(zigzag_category_ai, 'GEMINI_BATCH_SIZE', 2)
+
+    assert zigzag_category_ai.request_gemini_categories(NAMES) == EXPECTED
+    # 2 + 2 + 1건 -> 배치 2번 + 마지막 1건은 단건 프롬프트
+    assert gemini_stub_server.stats['requests'] == 3
+
+
+def test_retries_items_missing_from_batch_response(stub):
+    stub(WrongLengthHandler)
+
+    assert zigzag_category_ai.request_gemini_categories(NAMES) == EXPECTED
+    # 길이가 다른 배치 응답은 전부 버리고 1건씩 다시 요청
+    assert gemini_stub_server.stats['requests'] == 1 + len(NAMES)
+
+
+def test_retry_budget_limits_single_requests(stub, monkeypatch):
+    stub(WrongLengthHandler)
+    monkeypatch.setattr(zigzag_category_ai, 'GEMINI_RETRY_BUDGET', 0)
+
+    assert zigzag_category_ai.request_gemini_categories(NAMES) == [None] * len(NAMES)
+    assert gemini_stub_server.stats['requests'] == 1
+
+
+def test_http_error_is_not_retried_per_item(stub, monkeypatch):
+    stub(ErrorHandler)
+    monkeypatch.setattr(zigzag_category_ai, 'GEMINI_BATCH_SIZE', 2)
+
+    assert zigzag_category_ai.request_gemini_categories(NAMES) == [None] * len(NAMES)
+    # 배치 2번 + 마지막 단건 1번, 실패한 배치 항목을 1건씩 다시 보내지 않음
+    assert gemini_stub_server.stats['requests'] == 3
+
+
+def test_batcher_groups_concurrent_requests(stub):
+    stub()
+    batcher = zigzag_category_ai._GeminiBatcher(window=0.2)
+
+    futures = [batcher.submit(name) for name in NAMES]
+
+    assert [future.result(timeout=10) for future in futures] == EXPECTED
+    assert gemini_stub_server.stats['requests'] == 1
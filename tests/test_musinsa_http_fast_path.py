@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# 저장해 둔 무신사 상품 페이지 HTML을 로컬 HTTP 서버로 띄워 HTTP 빠른 경로(브라우저 없음) 필드 추출 확인
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import crawl_musinsa
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 요청 경로 -> 응답할 fixture 파일
+PAGES = {
+    '/products/3456789': 'musinsa_product_next_data.html',
+    '/products/1234567': 'musinsa_product_mss_state.html',
+    '/products/7654321': 'musinsa_product_client_rendered.html',
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/goods/3456789':
+            # 예전 상품 경로는 새 경로로 리다이렉트 (최종 URL 기준으로 product_num을 만드는지 확인)
+            self.send_response(301)
+            self.send_header('Location', '/products/3456789')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if path not in PAGES:
+            self.send_error(404)
+            return
+        with open(os.path.join(FIXTURES_DIR, PAGES[path]), 'rb') as f:
+            data = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_next_data_page(base_url):
+    result = crawl_musinsa.crawl_product_details_via_http(f"{base_url}/products/3456789")
+
+    assert result == {
+        'shoppingmall_name': "무신사",
+        'product_url': f"{base_url}/products/3456789",
+        'product_num': 100000003456789,
+        'category': "상의",
+        'product_img_url': "https://image.msscdn.net/images/goods_img/20250101/3456789/3456789_17000000000000_500.jpg",
+        'product_name': "베이직 오버핏 코튼 셔츠",
+        'brand_name': "에브리웨어랩",
+        'price': "39,900원",
+        'star_point': 4.8,
+        'AI_review': None,
+    }
+
+
+def test_mss_state_page(base_url):
+    result = crawl_musinsa.crawl_product_details_via_http(f"{base_url}/products/1234567?utm_source=test")
+
+    assert result['product_num'] == 100000001234567
+    assert result['category'] == "하의"
+    assert result['product_img_url'] == "https://image.msscdn.net/images/goods_img/20241120/1234567/1234567_16000000000000_500.jpg"
+    assert result['product_name'] == "와이드 데님 팬츠"
+    assert result['brand_name'] == "데님하우스"
+    # 할인가가 없으면 정상가
+    assert result['price'] == "45,000원"
+    assert result['star_point'] == 4.5
+
+
+def test_redirect_uses_final_url(base_url):
+    result = crawl_musinsa.crawl_product_details_via_http(f"{base_url}/goods/3456789")
+
+    assert result['product_url'] == f"{base_url}/products/3456789"
+    assert result['product_num'] == 100000003456789
+
+
+@pytest.mark.parametrize('path', ['/products/7654321', '/products/404'])
+def test_falls_back_when_page_has_no_state(base_url, path):
+    # 상품 JSON이 없는 페이지나 HTTP 오류는 None (브라우저 경로로 넘어감)
+    assert crawl_musinsa.crawl_product_details_via_http(f"{base_url}{path}") is None
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# 저장해 둔 지그재그 상품 페이지 HTML로 __NEXT_DATA__ 파서와 스냅샷 XPath 보충 확인
+
+import os
+
+import pytest
+
+import crawl_zigzag
+import html_snapshot
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def _load(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture(scope='module')
+def next_data_page():
+    return _load('zigzag_product_next_data.html')
+
+
+def test_parse_next_data(next_data_page):
+    assert crawl_zigzag.parse_next_data(next_data_page) == {
+        'product_name': "루즈핏 레터링 반팔 티셔츠",
+        'brand_name': "데일리룩샵",
+        # 할인가 우선
+        'price': "19,800원",
+        'product_img_url': "https://cf.image-farm.s.zigzag.kr/original/cms/2025/04/01/202504010000000001_000001.jpeg",
+        'star_point': 4.7,
+        'category': "상의",
+    }
+
+
+def test_next_data_agrees_with_xpath(next_data_page):
+    # 같은 페이지에서 __NEXT_DATA__ 값과 화면(XPath) 값이 같아야 빠른 경로로 바꿔도 결과가 그대로
+    fields = crawl_zigzag.parse_next_data(next_data_page)
+    tree = html_snapshot.parse_html(next_data_page)
+
+    assert fields['product_name'] == html_snapshot.extract_by_xpath_with_fallback(tree, crawl_zigzag.PRODUCT_NAME_XPATHS)
+    assert fields['brand_name'] == html_snapshot.extract_by_xpath_with_fallback(tree, crawl_zigzag.BRAND_XPATHS)
+    assert fields['price'] == crawl_zigzag.normalize_price(
+        html_snapshot.extract_by_xpath_with_fallback(tree, crawl_zigzag.PRICE_XPATHS)
+    )
+    assert fields['star_point'] == crawl_zigzag.parse_starpoint(
+        html_snapshot.extract_by_xpath_with_fallback(tree, crawl_zigzag.STARPOINT_XPATHS)
+    )
+
+
+def test_snapshot_falls_back_to_xpath_without_product_json():
+    page = _load('zigzag_product_dom_only.html')
+
+    # 상품 객체를 못 찾으면 빈 dict (일부 필드만 잘못 채우지 않음)
+    assert crawl_zigzag.parse_next_data(page) == {}
+    assert crawl_zigzag.parse_product_snapshot(page) == {
+        'product_img_url': "https://cf.image-farm.s.zigzag.kr/original/cms/2025/03/15/202503150000000002_000001.jpeg",
+        'product_name': "플리츠 롱 스커트",
+        'brand_name': "모던무드",
+        'price': "35,100원",
+        'star_point': 4.5,
+    }
+
+
+@pytest.mark.parametrize('page', [
+    "<html><body><div id='__next'></div></body></html>",
+    "<script id=\"__NEXT_DATA__\" type=\"application/json\">{not json</script>",
+])
+def test_parse_next_data_without_usable_json(page):
+    assert crawl_zigzag.parse_next_data(page) == {}